@@ -0,0 +1,76 @@
+"""Benchmark the batch evaluation of a simulation at many times against one `get_values` call per time.
+
+Usage:
+    python benchmarks/benchmark_get_values.py [n_times ...]
+
+Simulates a synthetic file once and reports the time to evaluate the velocity and position at the given numbers of
+random times, once with `simulation.get_values_batch` and once with a loop over `simulation.get_values`. The loop is
+timed on at most 100k times and extrapolated.
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+from synthetic_gcode import write_synthetic_gcode
+
+from pyGCodeDecode.gcode_interpreter import setup, simulation
+from pyGCodeDecode.helpers import set_verbosity_level
+
+
+def benchmark_times(sim: simulation, times: np.ndarray, n_loop: int = 100_000) -> dict:
+    """Benchmark both evaluations at the times.
+
+    Args:
+        sim: (simulation) simulated G-code
+        times: (np.ndarray) times to evaluate
+        n_loop: (int, default = 100_000) maximum number of times evaluated in the loop
+
+    Returns:
+        result: (dict) runtimes, the loop runtime extrapolated to all times, and whether both results are identical
+    """
+    start = time.perf_counter()
+    vel, pos = sim.get_values_batch(times=times)
+    batch_runtime = time.perf_counter() - start
+
+    loop_times = times[:n_loop]
+    start = time.perf_counter()
+    values = [sim.get_values(t=t) for t in loop_times.tolist()]
+    loop_runtime = (time.perf_counter() - start) * len(times) / len(loop_times)
+
+    return {
+        "loop": loop_runtime,
+        "batch": batch_runtime,
+        "identical": np.array_equal(vel[:n_loop], [value[0] for value in values])
+        and np.array_equal(pos[:n_loop], [value[1] for value in values]),
+    }
+
+
+def main(n_times: list, n_lines: int = 100_000):
+    """Run the benchmark and print a table."""
+    set_verbosity_level(0)
+    printer_setup = setup(
+        presets_file=pathlib.Path(__file__).parents[1] / "tests" / "data" / "test_printer_setups.yaml",
+        printer="prusa_mini",
+        layer_cue="LAYER_CHANGE",
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = write_synthetic_gcode(pathlib.Path(tmp_dir) / f"synthetic_{n_lines}.gcode", n_lines=n_lines)
+        sim = simulation(gcode_path=filepath, initial_machine_setup=printer_setup, verbosity_level=0)
+    rng = np.random.default_rng(0)
+    t_end = float(sim.segment_table.t_end[-1])
+
+    print(f"{'segments':>10}{'times':>12}{'loop [s]':>12}{'batch [s]':>12}{'speedup':>10}")
+    for n in n_times:
+        result = benchmark_times(sim=sim, times=rng.uniform(0, t_end, n))
+        assert result["identical"], "batch values differ from get_values"
+        print(
+            f"{len(sim.segment_table):>10}{n:>12}{result['loop']:>12.3f}"
+            f"{result['batch']:>12.3f}{result['loop'] / result['batch']:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(n_times=[int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 10_000_000])
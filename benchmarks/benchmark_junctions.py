@@ -0,0 +1,80 @@
+"""Benchmark the batch junction velocities against one junction handler object per state.
+
+Usage:
+    python benchmarks/benchmark_junctions.py [n_lines ...]
+
+Reports the time to calculate the target and junction velocities of all states of synthetic files of the given sizes
+for every firmware, once with a junction handler object per state and once with `batch_junction_velocities`.
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+from synthetic_gcode import write_synthetic_gcode
+
+from pyGCodeDecode.gcode_interpreter import setup
+from pyGCodeDecode.helpers import set_verbosity_level
+from pyGCodeDecode.junction_handling import (
+    _get_handler_names,
+    batch_junction_velocities,
+    get_handler,
+)
+from pyGCodeDecode.state_generator import generate_states
+
+
+def benchmark_firmware(states: list, firmware: str) -> dict:
+    """Benchmark both junction velocity calculations for a firmware.
+
+    Args:
+        states: (list[state]) linked states
+        firmware: (str) firmware name
+
+    Returns:
+        result: (dict) runtimes and whether both results are identical
+    """
+    start = time.perf_counter()
+    handler = get_handler(firmware_name=firmware)
+    junction_vels = []
+    for i, this_state in enumerate(states):
+        junction = handler(state_A=this_state.prev_state if i > 0 else None, state_B=this_state)
+        junction_vels.append(junction.get_junction_vel())
+    object_runtime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, batch_vels = batch_junction_velocities(states=states, firmware=firmware)
+    batch_runtime = time.perf_counter() - start
+
+    return {
+        "object": object_runtime,
+        "batch": batch_runtime,
+        "identical": np.array_equal(np.asarray(junction_vels, dtype=float), batch_vels),
+    }
+
+
+def main(synthetic_sizes: list):
+    """Run the benchmark and print a table."""
+    set_verbosity_level(0)
+    printer_setup = setup(
+        presets_file=pathlib.Path(__file__).parents[1] / "tests" / "data" / "test_printer_setups.yaml",
+        printer="prusa_mini",
+        layer_cue="LAYER_CHANGE",
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'file':<28}{'firmware':>20}{'states':>10}{'object [s]':>12}{'batch [s]':>12}{'speedup':>10}")
+        for n_lines in synthetic_sizes:
+            filepath = write_synthetic_gcode(pathlib.Path(tmp_dir) / f"synthetic_{n_lines}.gcode", n_lines=n_lines)
+            states = generate_states(filepath=filepath, initial_machine_setup=printer_setup.get_dict())
+            for firmware in _get_handler_names():
+                result = benchmark_firmware(states=states, firmware=firmware)
+                assert result["identical"], f"batch junction velocities of {firmware} differ"
+                print(
+                    f"{filepath.name:<28}{firmware:>20}{len(states):>10}{result['object']:>12.3f}"
+                    f"{result['batch']:>12.3f}{result['object'] / result['batch']:>9.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main(synthetic_sizes=[int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,134 @@
+"""Benchmark the memory of the simulation stages with tracemalloc.
+
+Usage:
+    python benchmarks/benchmark_memory.py [n_lines ...] [--record history.csv]
+
+Simulates synthetic files of the given sizes stage by stage and reports the memory retained after every stage,
+the peak memory during the stage, and the retained bytes per state and per segment. With `--record`, one row per
+file is appended to a CSV file together with the date and the git revision, to track the memory over time.
+"""
+
+import argparse
+import csv
+import datetime
+import pathlib
+import subprocess
+import tempfile
+import tracemalloc
+
+from synthetic_gcode import write_synthetic_gcode
+
+from pyGCodeDecode.gcode_interpreter import (
+    generate_planner_blocks,
+    setup,
+    tabulate_blocklist,
+    update_timeline,
+)
+from pyGCodeDecode.helpers import set_verbosity_level
+from pyGCodeDecode.result import get_all_result_calculators
+from pyGCodeDecode.state_generator import generate_states
+
+
+def _self_correct(blocklist: list):
+    """Self correct all blocks, like `simulation.trajectory_self_correct`."""
+    for block in blocklist:
+        block.self_correction()
+    update_timeline(blocklist)
+
+
+def _calc_results(table, blocklist: list):
+    """Calculate all results, like `simulation.calc_results`."""
+    for calculator in get_all_result_calculators():
+        calculator.calc_table(table=table, blocklist=blocklist)
+
+
+def benchmark_memory(filepath: pathlib.Path, printer_setup: setup) -> dict:
+    """Simulate a file stage by stage and trace the memory of every stage.
+
+    Args:
+        filepath: (Path) G-code file
+        printer_setup: (setup) printer setup
+
+    Returns:
+        result: (dict) retained and peak bytes per stage, number of states and segments
+    """
+    tracemalloc.start()
+    stages = {}
+
+    def trace(name: str, func, *args):
+        tracemalloc.reset_peak()
+        value = func(*args)
+        stages[name] = tracemalloc.get_traced_memory()  # (retained, peak)
+        return value
+
+    states = trace("states", lambda: generate_states(filepath=filepath, initial_machine_setup=printer_setup.get_dict()))
+    blocklist = trace("planner blocks", lambda: generate_planner_blocks(states=states, firmware="prusa"))
+    trace("self correction", _self_correct, blocklist)
+    table = trace("segment table", tabulate_blocklist, blocklist)
+    trace("results", _calc_results, table, blocklist)
+    tracemalloc.stop()
+
+    return {"stages": stages, "states": len(states), "segments": len(table)}
+
+
+def _git_revision() -> str:
+    """Return the current git revision, or an empty string outside of a repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(synthetic_sizes: list, record: pathlib.Path = None):
+    """Run the benchmark, print a table and optionally append the results to a CSV file."""
+    set_verbosity_level(0)
+    printer_setup = setup(
+        presets_file=pathlib.Path(__file__).parents[1] / "tests" / "data" / "test_printer_setups.yaml",
+        printer="prusa_mini",
+        layer_cue="LAYER_CHANGE",
+    )
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'file':<28}{'stage':>18}{'retained [MB]':>15}{'peak [MB]':>12}")
+        for n_lines in synthetic_sizes:
+            filepath = write_synthetic_gcode(pathlib.Path(tmp_dir) / f"synthetic_{n_lines}.gcode", n_lines=n_lines)
+            result = benchmark_memory(filepath=filepath, printer_setup=printer_setup)
+            for stage, (retained, peak) in result["stages"].items():
+                print(f"{filepath.name:<28}{stage:>18}{retained / 1e6:>15.1f}{peak / 1e6:>12.1f}")
+
+            bytes_per_state = result["stages"]["states"][0] / result["states"]
+            bytes_per_segment = (result["stages"]["results"][0] - result["stages"]["states"][0]) / result["segments"]
+            print(
+                f"{filepath.name:<28}{result['states']:>10} states {bytes_per_state:>8.0f} B/state"
+                f"{result['segments']:>10} segments {bytes_per_segment:>8.0f} B/segment"
+            )
+            rows.append(
+                {
+                    "date": datetime.date.today().isoformat(),
+                    "revision": _git_revision(),
+                    "n_lines": n_lines,
+                    "states": result["states"],
+                    "segments": result["segments"],
+                    "bytes_per_state": round(bytes_per_state),
+                    "bytes_per_segment": round(bytes_per_segment),
+                    "peak_bytes": max(peak for _, peak in result["stages"].values()),
+                }
+            )
+
+    if record is not None:
+        new_file = not record.exists()
+        with open(record, "a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the memory of the simulation stages.")
+    parser.add_argument("n_lines", type=int, nargs="*", default=[100_000, 1_000_000], help="synthetic file sizes")
+    parser.add_argument("--record", type=pathlib.Path, default=None, help="CSV file to append the results to")
+    args = parser.parse_args()
+    main(synthetic_sizes=args.n_lines, record=args.record)
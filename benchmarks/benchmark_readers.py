@@ -0,0 +1,63 @@
+"""Benchmark the text and the memory mapped G-code readers of the state generator.
+
+Usage:
+    python benchmarks/benchmark_readers.py [n_lines ...]
+
+Reports the time to read and tokenize synthetic files of the given sizes and the number of line dicts created,
+using a single process and a process pool with one worker per CPU.
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+from synthetic_gcode import write_synthetic_gcode
+
+from pyGCodeDecode.helpers import set_verbosity_level
+from pyGCodeDecode.state_generator import (
+    _iter_gcode_lines,
+    _iter_gcode_lines_mmap,
+    _iter_gcode_lines_parallel,
+)
+
+READERS = {
+    "text": lambda filepath: _iter_gcode_lines(filepath=filepath),
+    "mmap": lambda filepath: _iter_gcode_lines_mmap(filepath=filepath, layer_cue="LAYER_CHANGE"),
+    f"text x{os.cpu_count()}": lambda filepath: _iter_gcode_lines_parallel(filepath=filepath, n_workers=os.cpu_count()),
+    f"mmap x{os.cpu_count()}": lambda filepath: _iter_gcode_lines_parallel(
+        filepath=filepath, n_workers=os.cpu_count(), reader="mmap", layer_cue="LAYER_CHANGE"
+    ),
+}
+
+
+def benchmark_reader(filepath: pathlib.Path, reader: str) -> dict:
+    """Benchmark a single reader on a file.
+
+    Args:
+        filepath: (Path) G-code file
+        reader: (str) name of the reader, see READERS
+
+    Returns:
+        result: (dict) runtime and number of line dicts
+    """
+    start = time.perf_counter()
+    n_dicts = sum(1 for _ in READERS[reader](filepath))
+    return {"reader": reader, "runtime": time.perf_counter() - start, "dicts": n_dicts}
+
+
+def main(synthetic_sizes: list):
+    """Run the benchmark and print a table."""
+    set_verbosity_level(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'file':<28}{'reader':>10}{'time [s]':>12}{'line dicts':>14}")
+        for n_lines in synthetic_sizes:
+            filepath = write_synthetic_gcode(pathlib.Path(tmp_dir) / f"synthetic_{n_lines}.gcode", n_lines=n_lines)
+            for reader in READERS:
+                result = benchmark_reader(filepath=filepath, reader=reader)
+                print(f"{filepath.name:<28}{reader:>10}{result['runtime']:>12.3f}{result['dicts']:>14}")
+
+
+if __name__ == "__main__":
+    main(synthetic_sizes=[int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
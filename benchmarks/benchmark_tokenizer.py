@@ -0,0 +1,81 @@
+"""Benchmark the single-pass G-code tokenizer against the regex based `_arg_extract`.
+
+Usage:
+    python benchmarks/benchmark_tokenizer.py [n_lines ...]
+
+Reports lines per second for the bundled example files and for synthetic files of the given sizes.
+"""
+
+import importlib.resources
+import pathlib
+import sys
+import tempfile
+import time
+
+from synthetic_gcode import write_synthetic_gcode
+
+from pyGCodeDecode.state_generator import _arg_extract, _tokenize_line, known_commands
+
+
+def _is_lfs_pointer(filepath: pathlib.Path) -> bool:
+    """Return True if the file is a git-lfs pointer instead of the actual G-code."""
+    with open(file=filepath, mode="rb") as file:
+        return file.read(40).startswith(b"version https://git-lfs")
+
+
+def _lines_per_second(lines: list, tokenize) -> float:
+    """Return the throughput of a tokenizer in lines per second."""
+    start = time.perf_counter()
+    for line in lines:
+        tokenize(line)
+    return len(lines) / max(time.perf_counter() - start, 1e-12)
+
+
+def benchmark_file(filepath: pathlib.Path) -> dict:
+    """Benchmark both tokenizers on a file.
+
+    Args:
+        filepath: (Path) G-code file
+
+    Returns:
+        result: (dict) lines, lines per second of both implementations and the speedup
+    """
+    with open(file=filepath) as file:
+        lines = file.readlines()
+
+    regex_lps = _lines_per_second(lines, lambda line: _arg_extract(string=line, key_dict=known_commands))
+    compiled_lps = _lines_per_second(lines, _tokenize_line)
+    return {
+        "file": filepath.name,
+        "lines": len(lines),
+        "regex_lps": regex_lps,
+        "compiled_lps": compiled_lps,
+        "speedup": compiled_lps / regex_lps,
+    }
+
+
+def main(synthetic_sizes: list):
+    """Run the benchmark and print a table."""
+    files = []
+    example_dir = importlib.resources.files("pyGCodeDecode").joinpath("examples/data")
+    for filepath in sorted(pathlib.Path(str(example_dir)).glob("*.gcode")):
+        if _is_lfs_pointer(filepath):
+            print(f"skipping {filepath.name}: git-lfs pointer, run 'git lfs pull' to benchmark it")
+        else:
+            files.append(filepath)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_lines in synthetic_sizes:
+            files.append(write_synthetic_gcode(pathlib.Path(tmp_dir) / f"synthetic_{n_lines}.gcode", n_lines=n_lines))
+
+        print(f"{'file':<28}{'lines':>12}{'regex lines/s':>16}{'compiled lines/s':>20}{'speedup':>10}")
+        for filepath in files:
+            result = benchmark_file(filepath)
+            print(
+                f"{result['file']:<28}{result['lines']:>12}{result['regex_lps']:>16.0f}"
+                f"{result['compiled_lps']:>20.0f}{result['speedup']:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(synthetic_sizes=[int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
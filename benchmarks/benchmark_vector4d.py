@@ -0,0 +1,56 @@
+"""Benchmark the fast paths of the scalar vector and time arithmetic against their implementation before.
+
+Usage:
+    python benchmarks/benchmark_vector4d.py [number]
+
+Times every operation of `operation_pairs` in tests/test_vector4d.py, once with the current fast path and once with
+the implementation before the fast paths, and reports the best time per call of three repeats. The references are
+plain functions, their call costs about the same as the operator dispatch of the fast paths.
+"""
+
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))  # the tests package holds the reference implementations
+
+from pyGCodeDecode.utils import (  # noqa: E402
+    position,
+    seconds,
+    segment,
+    velocity,
+)
+from tests.test_vector4d import operation_pairs  # noqa: E402
+
+
+def benchmark_operations(number: int = 20_000) -> dict:
+    """Time every fast path and its reference.
+
+    Args:
+        number: (int, default = 20_000) calls per repeat
+
+    Returns:
+        result: (dict) name -> (fast, reference) time per call in ns
+    """
+    pos_a, pos_b = position(1.0, 2.0, 3.0, 4.0), position(2.5, 1.5, 0.5, 4.5)
+    vel = velocity(10.0, 20.0, 0.0, 1.0)
+    segm = segment(t_begin=1.0, t_end=2.0, pos_begin=pos_a, vel_begin=vel, pos_end=pos_b, vel_end=vel * 0.5)
+    pairs = operation_pairs(pos_a=pos_a, pos_b=pos_b, vel=vel, scalar=0.25, dt=seconds(0.5), segm=segm, t=1.3)
+
+    result = {}
+    for name, (fast, reference) in pairs.items():
+        result[name] = tuple(
+            min(timeit.repeat(operation, number=number, repeat=3)) / number * 1e9 for operation in (fast, reference)
+        )
+    return result
+
+
+def main(number: int):
+    """Run the benchmark and print a table."""
+    print(f"{'operation':<26}{'fast [ns]':>12}{'reference [ns]':>16}{'speedup':>10}")
+    for name, (fast_time, reference_time) in benchmark_operations(number=number).items():
+        print(f"{name:<26}{fast_time:>12.0f}{reference_time:>16.0f}{reference_time / fast_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(number=int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,175 @@
+"""Synthetic slicer-like G-code for benchmarking pyGCodeDecode.
+
+The generated files mimic the structure of PrusaSlicer / OrcaSlicer output: a base64 thumbnail block,
+a start sequence with settings commands, many layers of perimeter and infill moves with feature comments,
+retractions, travel moves and a trailing config dump.
+"""
+
+import math
+import pathlib
+import random
+
+
+def _thumbnail(n_lines: int) -> list:
+    """Return a fake base64 thumbnail block."""
+    rng = random.Random(0)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+    lines = ["; thumbnail begin 313x173 " + str(n_lines * 78)]
+    for _ in range(n_lines):
+        lines.append("; " + "".join(rng.choice(alphabet) for _ in range(76)))
+    lines.append("; thumbnail end")
+    lines.append(";")
+    return lines
+
+
+def _start_sequence() -> list:
+    """Return a typical start sequence."""
+    return [
+        "M73 P0 R74",
+        "M201 X1250 Y1250 Z400 E5000 ; sets maximum accelerations, mm/sec^2",
+        "M203 X180 Y180 Z12 E80 ; sets maximum feedrates, mm / sec",
+        "M204 P1250 R1250 T1250 ; sets acceleration (P, T) and retract acceleration (R), mm/sec^2",
+        "M205 X8.00 Y8.00 Z2.00 E10.00 ; sets the jerk limits, mm/sec",
+        "M205 S0 T0 ; sets the minimum extruding and travel feed rate, mm/sec",
+        "G90 ; use absolute coordinates",
+        "M83 ; extruder relative mode",
+        "M104 S170 ; set extruder temp for bed leveling",
+        "M140 S60 ; set bed temp",
+        "M109 R170 ; wait for bed leveling temp",
+        "M190 S60 ; wait for bed temp",
+        "G28 ; home all without mesh bed level",
+        "G29 ; mesh bed leveling",
+        "G92 E0",
+        "G1 Z0.2 F720",
+        "G1 X2 Y-3 F1000",
+        "G1 E8 F900",
+        "G1 X60 E9 F1000 ; intro line",
+        "G1 X100 E12.5 ; intro line",
+        "G92 E0",
+        "M221 S95",
+        "G21 ; set units to millimeters",
+        "G90 ; use absolute coordinates",
+        "M83 ; use relative distances for extrusion",
+        "M900 K0.2 ; Filament gcode LA 1.5",
+        "M107",
+    ]
+
+
+def _layer(layer_nr: int, z: float, n_moves: int, rng: random.Random) -> list:
+    """Return the moves of a single layer."""
+    lines = [
+        ";LAYER_CHANGE",
+        f";Z:{z:.2f}",
+        ";HEIGHT:0.2",
+        ";BEFORE_LAYER_CHANGE",
+        "G92 E0.0",
+        f";{z:.2f}",
+        "",
+        "G1 E-.8 F2100",
+        f"G1 Z{z + 0.2:.3f} F720",
+        ";AFTER_LAYER_CHANGE",
+        f";{z:.2f}",
+        f"M73 P{layer_nr % 100} R{max(0, 74 - layer_nr)}",
+        f"G1 X{rng.uniform(50, 130):.3f} Y{rng.uniform(50, 130):.3f} F10800",
+        f"G1 Z{z:.3f} F720",
+        "G1 E.8 F2100",
+        ";TYPE:Perimeter",
+        ";WIDTH:0.449999",
+        "G1 F1200",
+    ]
+    center_x, center_y = 90.0, 90.0
+    radius = 20.0 + 5.0 * math.sin(layer_nr / 7.0)
+    n_perimeter = n_moves // 3
+    for i in range(n_perimeter):
+        angle = 2 * math.pi * i / max(n_perimeter, 1)
+        x = center_x + radius * math.cos(angle)
+        y = center_y + radius * math.sin(angle)
+        lines.append(f"G1 X{x:.3f} Y{y:.3f} E{rng.uniform(0.01, 0.06):.5f}")
+    lines += [
+        ";TYPE:Solid infill" if layer_nr % 10 == 0 else ";TYPE:Internal infill",
+        ";WIDTH:0.5",
+        "G1 E-.8 F2100",
+        "G1 X{:.3f} Y{:.3f} F10800".format(center_x - radius / 2, center_y - radius / 2),
+        "G1 E.8 F2100",
+        "G1 F2700",
+    ]
+    for i in range(n_moves - n_perimeter):
+        x = center_x + rng.uniform(-radius / 1.5, radius / 1.5)
+        y = center_y + rng.uniform(-radius / 1.5, radius / 1.5)
+        lines.append(f"G1 X{x:.3f} Y{y:.3f} E{rng.uniform(0.05, 0.9):.5f}")
+        if i % 25 == 24:
+            lines.append(f";WIDTH:{rng.uniform(0.4, 0.6):.6f}")
+    lines.append(";WIPE_START")
+    lines.append("G1 F8640")
+    lines.append("G1 X{:.3f} Y{:.3f} E-.76".format(center_x, center_y))
+    lines.append(";WIPE_END")
+    return lines
+
+
+def _config_dump(n_lines: int) -> list:
+    """Return a fake slicer configuration dump."""
+    lines = ["; prusaslicer_config = begin"]
+    for i in range(n_lines):
+        lines.append(f"; setting_{i:04d} = {i * 0.1:.1f}")
+    lines.append("; prusaslicer_config = end")
+    return lines
+
+
+def generate_lines(n_lines: int, seed: int = 0) -> list:
+    """Generate synthetic G-code lines.
+
+    Args:
+        n_lines: (int) approximate number of lines to generate
+        seed: (int, default = 0) seed for the random number generator
+
+    Returns:
+        lines: (list[str]) the G-code lines without line endings
+    """
+    rng = random.Random(seed)
+    lines = _thumbnail(n_lines=max(20, n_lines // 200))
+    lines += _start_sequence()
+    config = _config_dump(n_lines=max(20, n_lines // 100))
+
+    layer_nr = 0
+    moves_per_layer = 300
+    while len(lines) + len(config) < n_lines:
+        layer_nr += 1
+        lines += _layer(layer_nr=layer_nr, z=0.2 * layer_nr, n_moves=moves_per_layer, rng=rng)
+
+    lines += [
+        "G1 Z{:.3f} F720".format(0.2 * layer_nr + 10),
+        "M104 S0 ; turn off temperature",
+        "M140 S0 ; turn off heatbed",
+        "M107 ; turn off fan",
+        "G4 S1",
+        "M84 ; disable motors",
+        "M73 P100 R0",
+    ]
+    lines += config
+    return lines
+
+
+def write_synthetic_gcode(filepath: pathlib.Path, n_lines: int, seed: int = 0) -> pathlib.Path:
+    """Write a synthetic G-code file.
+
+    Args:
+        filepath: (Path) path of the file to write
+        n_lines: (int) approximate number of lines
+        seed: (int, default = 0) seed for the random number generator
+
+    Returns:
+        filepath: (Path) path of the written file
+    """
+    filepath = pathlib.Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(file=filepath, mode="w") as file:
+        file.write("\n".join(generate_lines(n_lines=n_lines, seed=seed)) + "\n")
+    return filepath
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    out = write_synthetic_gcode(pathlib.Path(sys.argv[1] if len(sys.argv) > 1 else "synthetic.gcode"), n_lines=n)
+    print(f"Wrote {out}")
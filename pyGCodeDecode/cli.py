@@ -7,6 +7,8 @@ Features:
 - Run built-in examples: `brace`, `benchy`
 - Plot GCode files with printer presets and output options
 - Save simulation summaries, metrics, screenshots, and VTK files
+- Compile GCode files to the binary .pgcd format to skip parsing when simulating them again
+- Sweep printer setup parameters for one GCode file and save the print times and summaries
 
 Usage Examples:
 
@@ -15,6 +17,8 @@ Usage Examples:
 - `pygcd plot -g myfile.gcode`
 - `pygcd plot -g myfile.gcode -p presets.yaml -pn my_printer`
 - `pygcd plot -g myfile.gcode -o ./outputs -lc ";LAYER"`
+- `pygcd compile myfile.gcode -c ./cache`
+- `pygcd sweep myfile.gcode -p presets.yaml -pn my_printer -s p_acc=500,1000 -s firmware=prusa,marlin`
 """
 
 import argparse
@@ -22,11 +26,13 @@ import importlib.resources
 import pathlib
 
 from pyGCodeDecode import __version__
+from pyGCodeDecode.compiled_gcode import compile_gcode
 from pyGCodeDecode.examples.benchy import benchy_example
 from pyGCodeDecode.examples.brace import brace_example
 from pyGCodeDecode.gcode_interpreter import setup, simulation
 from pyGCodeDecode.helpers import custom_print
 from pyGCodeDecode.plotter import plot_3d
+from pyGCodeDecode.sweep import save_sweep, simulation_sweep, variant_grid
 from pyGCodeDecode.tools import save_layer_metrics
 
 
@@ -38,6 +44,66 @@ def _run_example(args: argparse.Namespace):
         benchy_example()
 
 
+def _compile(args: argparse.Namespace):
+    """Compile a GCode file to the binary .pgcd format."""
+    if not args.gcode.is_file():
+        custom_print(f"❌ The specified G-code:\n{args.gcode.resolve()}\nis not valid.\n🛑 Exiting the program.", lvl=1)
+        exit()
+    setup_dict = None
+    if args.printer_name is not None:  # store the states of the virtual machine for this printer
+        presets_file = args.presets
+        if presets_file is None:
+            presets_file = importlib.resources.files("pyGCodeDecode").joinpath("data/default_printer_presets.yaml")
+        printer_setup = setup(presets_file=presets_file, printer=args.printer_name, layer_cue=args.layer_cue)
+        setup_dict = printer_setup.check_initial_setup()
+    pgcd_path = compile_gcode(
+        gcode_path=args.gcode, pgcd_path=args.output, cache_dir=args.cache_dir, initial_machine_setup=setup_dict
+    )
+    custom_print(f"✅ Compiled G-code saved to:\n{pgcd_path.resolve()}")
+
+
+def _sweep(args: argparse.Namespace):
+    """Simulate a GCode file with all combinations of the swept setup parameters."""
+
+    def _parse_value(text: str):
+        """Convert a parameter value to a number if possible."""
+        try:
+            return float(text) if any(char in text for char in ".eE") else int(text)
+        except ValueError:
+            return text
+
+    if not args.gcode.is_file():
+        custom_print(f"❌ The specified G-code:\n{args.gcode.resolve()}\nis not valid.\n🛑 Exiting the program.", lvl=1)
+        exit()
+    presets_file = args.presets
+    if presets_file is None:
+        custom_print("⚠️  No presets file specified. Using the default presets shipped with pyGCD.")
+        presets_file = importlib.resources.files("pyGCodeDecode").joinpath("data/default_printer_presets.yaml")
+
+    parameters = {}
+    for sweep_arg in args.sweep:
+        name, _, values = sweep_arg.partition("=")
+        if not values:
+            custom_print(f"❌ Invalid sweep parameter '{sweep_arg}', use <name>=<value>,<value>,...", lvl=1)
+            exit()
+        parameters[name.strip()] = [_parse_value(value.strip()) for value in values.split(",")]
+
+    printer_setup = setup(presets_file=presets_file, printer=args.printer_name, layer_cue=args.layer_cue)
+    rows = simulation_sweep(
+        gcode_path=args.gcode,
+        initial_machine_setup=printer_setup,
+        variants=variant_grid(parameters),
+        n_workers=args.workers,
+        lookahead=args.lookahead,
+    )
+    for row in rows:
+        variant = ", ".join(f"{name}={row[name]}" for name in parameters)
+        custom_print(f"{variant}: {row['t_end']:.2f} s")
+
+    output = args.output if args.output is not None else pathlib.Path.cwd() / f"{args.gcode.stem}_sweep.csv"
+    save_sweep(rows=rows, filepath=output)
+
+
 def _plot(args: argparse.Namespace):
     """Generate a plot from a GCode file."""
 
@@ -235,6 +301,134 @@ def _main(args=None):
         metavar="<cue>",
     )
 
+    # subparser to compile a GCode file
+    compile_parser = subparsers.add_parser("compile", help="Compile a GCode file to the binary .pgcd format.")
+    compile_parser.set_defaults(func=_compile)
+
+    compile_parser.add_argument(
+        "gcode",
+        help="The path to the G-code file.",
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    compile_parser.add_argument(
+        "-o",
+        "--output",
+        action="store",
+        help="The path of the compiled file. Defaults to the G-code path with the suffix .pgcd.",
+        default=None,
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    compile_parser.add_argument(
+        "-c",
+        "--cache_dir",
+        action="store",
+        help="Cache directory, the compiled file is named after the content hash and reused if it exists.",
+        default=None,
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    compile_parser.add_argument(
+        "-p",
+        "--presets",
+        action="store",
+        help="The path to the printer presets file. Default printers can be used if not specified.",
+        default=None,
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    compile_parser.add_argument(
+        "-pn",
+        "--printer_name",
+        action="store",
+        help="The name of a printer in the presets file. If specified, the states of the printer are stored too.",
+        default=None,
+        type=str,
+        metavar="<NAME>",
+    )
+    compile_parser.add_argument(
+        "-lc",
+        "--layer_cue",
+        action="store",
+        help="The cue indicating a layer switch in the GCode.",
+        default=None,
+        type=str,
+        metavar="<cue>",
+    )
+
+    # subparser to sweep setup parameters
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Simulate a GCode file with all combinations of the swept setup parameters."
+    )
+    sweep_parser.set_defaults(func=_sweep)
+
+    sweep_parser.add_argument(
+        "gcode",
+        help="The path to the G-code file.",
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    sweep_parser.add_argument(
+        "-p",
+        "--presets",
+        action="store",
+        help="The path to the printer presets file. Default printers can be used if not specified.",
+        default=None,
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    sweep_parser.add_argument(
+        "-pn",
+        "--printer_name",
+        action="store",
+        help="The name of the printer as specified in the presets file or the defaults if no presets were specified",
+        default=None,
+        type=str,
+        metavar="<NAME>",
+    )
+    sweep_parser.add_argument(
+        "-s",
+        "--sweep",
+        action="append",
+        help="A swept setup parameter with its values, e.g. p_acc=500,1000. Repeat it to sweep all combinations.",
+        default=[],
+        type=str,
+        metavar="<NAME>=<VALUES>",
+    )
+    sweep_parser.add_argument(
+        "-o",
+        "--output",
+        action="store",
+        help="The path of the csv file. Defaults to <G-code name>_sweep.csv in the current directory.",
+        default=None,
+        type=pathlib.Path,
+        metavar="<PATH>",
+    )
+    sweep_parser.add_argument(
+        "-j",
+        "--workers",
+        action="store",
+        help="The number of worker processes. Uses all CPUs if not specified.",
+        default=None,
+        type=int,
+        metavar="<N>",
+    )
+    sweep_parser.add_argument(
+        "-lc",
+        "--layer_cue",
+        action="store",
+        help="The cue indicating a layer switch in the GCode.",
+        default=None,
+        type=str,
+        metavar="<cue>",
+    )
+    sweep_parser.add_argument(
+        "--lookahead",
+        action="store_true",
+        help="Use the lookahead planner instead of the self correction of the planner blocks.",
+    )
+
     # parse the arguments
     parsed_args = global_parser.parse_args(args)
 
@@ -0,0 +1,393 @@
+"""Compiled binary intermediate format for parsed G-code (.pgcd).
+
+A .pgcd file stores the tokenized commands of a G-code file as NumPy arrays. It does not depend on a printer setup,
+so a G-code can be parsed once and simulated with many setups. The container is versioned, memory mappable and
+keyed by the SHA-256 hash of the source file. Optionally, the states resolved by the virtual machine are stored as
+well, so a `StateTable` is loaded from the columns without running the virtual machine, see `compile_gcode`.
+
+Layout:
+
+- 16 bytes: magic `PGCD`, format version (uint32) and header length (uint64), little endian
+- JSON header with the source hash, the command names and the offset, dtype and shape of every array
+- arrays, each aligned to 64 bytes:
+    - `commands`: uint32 (n,), bit mask of the commands in every line, bit i is `command_names[i]`
+    - `param_counts`: uint8 (n,), number of parameters of every line
+    - `param_codes`: uint16 (m,), command index * 26 + parameter letter index
+    - `param_values`: float64 (m,), parameter values
+    - `comment_index`: int32 (n,), index of the stripped comment of every line, -1 for no comment
+    - `comment_offsets`: int64 (n_comments + 1,) and `comment_data`: uint8, UTF-8 encoded unique comments
+- optional state arrays, the columns of a `StateTable` prefixed with `state_`, if the header has the key `states`:
+    - `state_position`, `state_settings_index`, `state_line_number`, `state_layer`, `state_pause` and
+      `state_comment_index`, with the comments in `state_comment_offsets` and `state_comment_data`
+    - `state_settings`: float64 (n_settings, 7), NaN for settings which are not set by the G-code. They are filled
+      in from the setup when loading, like the units, which the header lists per settings row, null for the setup's.
+    - the header stores the setup values the states depend on besides these settings, see `_state_setup`
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import pathlib
+import struct
+import traceback
+import uuid
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from pyGCodeDecode.helpers import ProgressBar, custom_print
+
+from .state import StateTable
+from .state_generator import (
+    _count_encoded_unsupported_commands,
+    _decode_lines,
+    _decode_strings,
+    _encode_lines,
+    _encode_strings,
+    _iter_gcode_lines,
+    _machine_traveler,
+    default_virtual_machine,
+)
+
+PGCD_MAGIC = b"PGCD"
+PGCD_VERSION = 1
+_preamble = struct.Struct("<4sIQ")  # magic, version, header length
+_alignment = 64
+_state_setup_keys = (  # setup values the positions of the states depend on
+    "absolute_position",
+    "absolute_extrusion",
+    "volumetric_extrusion",
+    "filament_diam",
+    "mm_per_arc_segment",
+    "X",
+    "Y",
+    "Z",
+    "E",
+)
+_state_settings_keys = ("p_acc", "jerk", "vX", "vY", "vZ", "vE", "p_vel", "units")  # like `state.p_settings`
+
+
+def hash_file(filepath: pathlib.Path) -> str:
+    """Return the SHA-256 hash of a file's content.
+
+    Args:
+        filepath: (Path) file to hash
+
+    Returns:
+        hash: (str) hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file=filepath, mode="rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _state_setup(initial_machine_setup: dict) -> dict:
+    """Return the setup values the stored states depend on, apart from the printing settings.
+
+    Args:
+        initial_machine_setup: (dict) dictionary with machine setup
+
+    Returns:
+        values: (dict) values of `_state_setup_keys`, with the defaults of the virtual machine, and the layer cue
+            if one is used
+    """
+    values = {key: initial_machine_setup.get(key, default_virtual_machine[key]) for key in _state_setup_keys}
+    if "layer_cue" in initial_machine_setup:
+        values["layer_cue"] = initial_machine_setup["layer_cue"]
+    return values
+
+
+def compile_gcode(
+    gcode_path: pathlib.Path,
+    pgcd_path: pathlib.Path = None,
+    cache_dir: pathlib.Path = None,
+    initial_machine_setup: dict = None,
+) -> pathlib.Path:
+    """Parse a G-code file once and save it as compiled .pgcd file.
+
+    Args:
+        gcode_path: (Path) G-code file
+        pgcd_path: (Path, default = None) output file, defaults to the G-code path with the suffix .pgcd
+        cache_dir: (Path, default = None) if specified, the file is saved as `<cache_dir>/<content hash>.pgcd`
+            and an existing, valid file with the same hash is reused without parsing again
+        initial_machine_setup: (dict, default = None) if specified, the states of the virtual machine are stored as
+            well. A `StateTable` is then loaded from the file without running the virtual machine, for every setup
+            with the same initial position, positioning and extrusion modes, see `compiled_gcode.get_state_table`.
+            The printing settings of the setup are not stored, they are filled in when loading.
+
+    Returns:
+        pgcd_path: (Path) path of the compiled file
+
+    Example:
+    ```python
+    pgcd_path = compiled_gcode.compile_gcode(gcode_path=Path("part.gcode"), cache_dir=Path("cache"))
+    simulation(gcode_path=pgcd_path, initial_machine_setup=printer_setup)
+    ```
+    """
+    gcode_path = pathlib.Path(gcode_path)
+    source_hash = hash_file(gcode_path)
+    state_setup = None if initial_machine_setup is None else _state_setup(initial_machine_setup)
+
+    if cache_dir is not None:
+        pgcd_path = pathlib.Path(cache_dir) / f"{source_hash}.pgcd"
+        if pgcd_path.exists():
+            try:
+                with load_compiled_gcode(pgcd_path) as compiled:
+                    if compiled.source_hash == source_hash and (
+                        state_setup is None or compiled.state_setup == state_setup
+                    ):
+                        custom_print(f"Using the compiled G-code {pgcd_path}.")
+                        return pgcd_path
+            except ValueError:
+                pass  # outdated or broken file, compile again
+    elif pgcd_path is None:
+        pgcd_path = gcode_path.with_suffix(".pgcd")
+    pgcd_path = pathlib.Path(pgcd_path)
+
+    arrays = {}
+    line_dicts = _encode_lines(line_dicts=_iter_gcode_lines(filepath=gcode_path), arrays=arrays)
+    states = None
+    if initial_machine_setup is None:
+        for _ in line_dicts:
+            pass
+    else:
+        # the settings are left undefined, so the stored states are valid for any printing settings
+        marker_setup = {**initial_machine_setup, **dict.fromkeys(_state_settings_keys)}
+        table = StateTable.from_rows(_machine_traveler(line_dicts=line_dicts, initial_machine_setup=marker_setup))
+        comment_offsets, comment_data = _encode_strings(table.comments)
+        arrays.update(
+            {
+                "state_position": table.position,
+                "state_settings_index": table.settings_index,
+                "state_settings": table.settings,
+                "state_line_number": table.line_number,
+                "state_layer": table.layer,
+                "state_pause": table.pause,
+                "state_comment_index": table.comment_index,
+                "state_comment_offsets": comment_offsets,
+                "state_comment_data": comment_data,
+            }
+        )
+        states = {"setup": state_setup, "units": table.settings_units}
+    command_names = arrays.pop("command_names")
+    del arrays["line_number"]  # all lines are stored
+
+    # header with the array layout, the arrays start after the aligned header
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+        offset += -(-values.nbytes // _alignment) * _alignment
+    header = {
+        "source_hash": source_hash,
+        "source_name": gcode_path.name,
+        "n_lines": len(arrays["commands"]),
+        "command_names": command_names,
+        "arrays": layout,
+    }
+    if states is not None:
+        header["states"] = states
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(_preamble.size + len(header_bytes)) // _alignment) * _alignment
+
+    # write a temporary file next to the target and replace the target at once, other processes may have mapped it
+    pgcd_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pgcd_path.with_name(f"{pgcd_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(file=tmp_path, mode="xb") as file:
+            file.write(_preamble.pack(PGCD_MAGIC, PGCD_VERSION, len(header_bytes)))
+            file.write(header_bytes)
+            for name, values in arrays.items():
+                file.seek(data_start + layout[name]["offset"])
+                file.write(values.tobytes())
+            file.truncate(data_start + offset)
+        os.replace(tmp_path, pgcd_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    custom_print(f"Compiled {gcode_path.name} with {header['n_lines']} lines to {pgcd_path}.")
+    return pgcd_path
+
+
+class compiled_gcode:
+    """Memory mapped, compiled G-code loaded from a .pgcd file.
+
+    The arrays are views into the mapped file until `close` is called, which also happens when it is used as a
+    context manager:
+
+    ```python
+    with compiled_gcode.load_compiled_gcode(pgcd_path=Path("part.pgcd")) as compiled:
+        n_lines = len(compiled)
+    ```
+    """
+
+    def __init__(self, pgcd_path: pathlib.Path):
+        """Load a .pgcd file by memory mapping it, the arrays are views into the file.
+
+        Args:
+            pgcd_path: (Path) path of the compiled file
+
+        Raises:
+            ValueError: if the file is no .pgcd file or was written with another format version
+        """
+        self.filepath = pathlib.Path(pgcd_path)
+        with open(file=self.filepath, mode="rb") as file:
+            preamble = file.read(_preamble.size)
+            if len(preamble) < _preamble.size or preamble[:4] != PGCD_MAGIC:
+                raise ValueError(f"{self.filepath} is no compiled G-code file.")
+            _, version, header_length = _preamble.unpack(preamble)
+            if version != PGCD_VERSION:
+                raise ValueError(
+                    f"{self.filepath} has format version {version}, but version {PGCD_VERSION} is required. "
+                    "Compile the G-code again."
+                )
+            header = json.loads(file.read(header_length))
+            self._buffer = mmap.mmap(file.fileno(), length=0, access=mmap.ACCESS_READ)
+
+        self.source_hash = header["source_hash"]
+        self.source_name = header["source_name"]
+        self.n_lines = header["n_lines"]
+        self.command_names = header["command_names"]
+        self._states = header.get("states")  # setup and units of the stored states
+
+        data_start = -(-(_preamble.size + header_length) // _alignment) * _alignment
+        self._array_names = list(header["arrays"])
+        for name, layout in header["arrays"].items():
+            dtype = np.dtype(layout["dtype"])
+            count = int(np.prod(layout["shape"]))
+            values = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=data_start + layout["offset"])
+            setattr(self, name, values.reshape(layout["shape"]))
+        self._comments = None
+
+    def __len__(self) -> int:
+        """Return the number of lines."""
+        return self.n_lines
+
+    def __enter__(self) -> "compiled_gcode":
+        """Return the compiled G-code, it is closed when the context is left."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Close the compiled G-code, the finished frames of a raised exception may still hold views of the arrays."""
+        if exc_traceback is not None:
+            traceback.clear_frames(exc_traceback)
+        self.close()
+
+    def close(self):
+        """Release the arrays and close the memory map of the file.
+
+        Views of the arrays must not be kept, the file cannot be unmapped while they exist.
+        """
+        for name in self._array_names:
+            setattr(self, name, None)
+        self._buffer.close()
+
+    @property
+    def comments(self) -> list:
+        """Return the unique comments, decoded on first access."""
+        if self._comments is None:
+            self._comments = _decode_strings(offsets=self.comment_offsets, data=self.comment_data)
+        return self._comments
+
+    @property
+    def state_setup(self) -> Optional[dict]:
+        """Return the setup values the stored states were resolved with, None if no states are stored."""
+        return None if self._states is None else self._states["setup"]
+
+    def get_state_table(self, initial_machine_setup: dict) -> Optional[StateTable]:
+        """Return the stored states as state table, completed with the printing settings of a setup.
+
+        Args:
+            initial_machine_setup: (dict) dictionary with machine setup
+
+        Returns:
+            table: (StateTable) the same states as `state_generator.generate_state_table` from the G-code, copied out
+                of the file, or None if no states are stored or they were resolved with another setup
+        """
+        if self._states is None or self._states["setup"] != _state_setup(initial_machine_setup):
+            return None
+
+        # undefined settings are the ones of the setup, rows can become equal with them and are merged
+        defaults = [initial_machine_setup.get(key, default_virtual_machine[key]) for key in _state_settings_keys]
+        settings_lookup = {}
+        settings_map = []
+        for values, units in zip(self.state_settings.tolist(), self._states["units"]):
+            settings = tuple(default if math.isnan(value) else value for value, default in zip(values, defaults))
+            settings += (defaults[-1] if units is None else units,)
+            settings_map.append(settings_lookup.setdefault(settings, len(settings_lookup)))
+
+        return StateTable(
+            position=self.state_position.copy(),
+            settings_index=np.asarray(settings_map, dtype=np.int32)[self.state_settings_index],
+            settings_rows=list(settings_lookup),
+            line_number=self.state_line_number.copy(),
+            layer=self.state_layer.copy(),
+            pause=self.state_pause.copy(),
+            comment_index=self.state_comment_index.copy(),
+            comments=_decode_strings(offsets=self.state_comment_offsets, data=self.state_comment_data),
+        )
+
+    def count_unsupported_commands(self) -> dict:
+        """Count the known but unsupported commands, like `state_generator._count_unsupported_commands`.
+
+        Returns:
+            command_counts: (dict) counts per unsupported command, ordered by their first line
+        """
+        return _count_encoded_unsupported_commands(command_names=self.command_names, commands=self.commands)
+
+    def iter_line_dicts(self, chunk_size: int = 1 << 16) -> Iterator[dict]:
+        """Yield the line dicts as returned by the tokenizer, without parsing text.
+
+        Args:
+            chunk_size: (int, default = 65536) number of lines converted from the arrays at once
+
+        Yields:
+            line_dict: (dict) every line as dict
+        """
+        comments = self.comments
+        progress_bar = ProgressBar(name=f"Loading {self.n_lines} lines of compiled {self.source_name}")
+        base = 0  # index of the first parameter of the chunk
+        for start in range(0, self.n_lines, chunk_size):
+            end = min(start + chunk_size, self.n_lines)
+            param_counts = self.param_counts[start:end]
+            params = slice(base, base + int(param_counts.sum()))
+            yield from _decode_lines(
+                command_names=self.command_names,
+                commands=self.commands[start:end],
+                param_counts=param_counts,
+                param_codes=self.param_codes[params],
+                param_values=self.param_values[params],
+                comment_index=self.comment_index[start:end],
+                comments=comments,
+                line_numbers=range(start + 1, end + 1),
+            )
+            base = params.stop
+            progress_bar.update(end / self.n_lines)
+
+        if self.n_lines == 0:
+            progress_bar.update(1.0)
+
+
+def load_compiled_gcode(pgcd_path: pathlib.Path, gcode_path: Union[pathlib.Path, None] = None) -> compiled_gcode:
+    """Load a compiled .pgcd file.
+
+    Args:
+        pgcd_path: (Path) path of the compiled file
+        gcode_path: (Path, default = None) optional source file, its content hash has to match the compiled file
+
+    Returns:
+        compiled: (compiled_gcode) the memory mapped compiled G-code
+
+    Raises:
+        ValueError: if the file is invalid or does not match the source file
+    """
+    compiled = compiled_gcode(pgcd_path=pgcd_path)
+    if gcode_path is not None and hash_file(gcode_path) != compiled.source_hash:
+        compiled.close()
+        raise ValueError(f"{pgcd_path} was not compiled from the current content of {gcode_path}.")
+    return compiled
@@ -3,44 +3,111 @@
 import importlib.resources
 import time
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import yaml
 
 from pyGCodeDecode.helpers import ProgressBar, custom_print, set_verbosity_level
 
-from .planner_block import planner_block
+from .junction_handling import batch_junction_velocities
+from .planner_block import (
+    batch_planner_segments,
+    lookahead_junction_velocities,
+    planner_block,
+)
 from .result import get_all_result_calculators
-from .state import state
-from .state_generator import generate_states
-from .utils import segment, velocity
-
-
-def generate_planner_blocks(states: List[state], firmware=None):
+from .spatial_index import SpatialIndex
+from .state import StateTable, state
+from .state_generator import compact_states, generate_state_table, iter_states
+from .utils import SegmentTable, segment, velocity
+
+RESAMPLED_DTYPE = np.dtype(
+    [("t", np.float64), ("pos", np.float64, (4,)), ("vel", np.float64, (4,)), ("extruding", bool)]
+)
+_FEATURE_COLORS = {"infill": "blue", "perimeter": "green"}  # feature types named in comments, see `e_type`
+
+
+def generate_planner_blocks(
+    states: Union[List[state], StateTable],
+    firmware=None,
+    lookahead: bool = False,
+    prev_block: planner_block = None,
+    junctions: Tuple[np.ndarray, np.ndarray] = None,
+):
     """Convert list of states to trajectory repr. by planner blocks.
 
     Args:
-        states: (list[state]) list of states
+        states: (list[state] | StateTable) list of states, or a state table, whose states are only created for the
+            planner blocks with `lookahead`, see `_plan_state_table`
         firmware: (string, default = None) select firmware by name
+        lookahead: (bool, default = False) plan reachable junction velocities before creating the blocks,
+            so that they need no self correction, and create the segments of all blocks at once,
+            see `planner_block.lookahead_junction_velocities` and `planner_block.batch_planner_segments`
+        prev_block: (planner_block, default = None) planner block before the states, the new blocks continue
+            its trajectory, e.g. when a window of the states is planned again
+        junctions: (tuple[np.ndarray, np.ndarray], default = None) precalculated target and junction velocities
+            of the states, see `batch_junction_velocities`
 
     Returns:
         block_list (list[planner_block]) list of all planner blocks to complete travel between all states
     """
+    if isinstance(states, StateTable):
+        if lookahead and prev_block is None and junctions is None:
+            return _plan_state_table(table=states, firmware=firmware)[0]
+        states = states.to_states()
+
     block_list = []
     bar = ProgressBar(name="Planner Blocks")
 
-    colordict = {"infill": "blue", "perimeter": "green"}
-    last_type = None
+    # junction velocities of all blocks in one pass
+    if junctions is None:
+        junctions = batch_junction_velocities(states=states, firmware=firmware)
+    target_vels, junction_vels = junctions
+    segment_table = None
+    if lookahead:
+        junction_vels = lookahead_junction_velocities(
+            states=states, target_vels=target_vels, junction_vels=junction_vels
+        )
+        # reachable junction velocities: segments of all blocks at once
+        segment_table, block_states, blocktypes = batch_planner_segments(
+            states=states,
+            target_vels=target_vels,
+            junction_vels=junction_vels,
+            prev_segment=None if prev_block is None else prev_block.get_segments()[-1],
+        )
+        block_ids = np.full(len(states), -1)
+        block_ids[block_states] = np.arange(len(block_states))
 
-    for i, this_state in enumerate(states):
-        prev_block = block_list[-1] if len(block_list) > 0 else None  # grab prev block from block_list
-        new_block = planner_block(state=this_state, prev_block=prev_block, firmware=firmware)  # generate new block
+    last_type = None if prev_block is None else prev_block.e_type
+    first_prev_block = prev_block
 
-        if this_state.comment is not None:
-            for key in colordict.keys():
-                if key in this_state.comment.lower():
-                    last_type = key
+    for i, this_state in enumerate(states):
+        # comments of folded states precede the comment of this state
+        comments = [comment for _, comment, _ in this_state.folded_lines] if this_state.folded_lines else []
+        comments.append(this_state.comment)
+        for comment in comments:
+            if comment is not None:
+                for key in _FEATURE_COLORS:
+                    if key in comment.lower():
+                        last_type = key
+
+        if segment_table is not None and block_ids[i] < 0:
+            bar.update((i + 1) / len(states))
+            continue  # no segments in the table
+
+        prev_block = block_list[-1] if len(block_list) > 0 else first_prev_block  # grab prev block from block_list
+        new_block = planner_block(
+            state=this_state,
+            prev_block=prev_block,
+            firmware=firmware,
+            target_vel=velocity(target_vels[i]),
+            junction_vel=junction_vels[i],
+            segment_table=segment_table,
+            block_id=None if segment_table is None else int(block_ids[i]),
+        )  # generate new block
+        if segment_table is not None:
+            new_block.blocktype = blocktypes[block_ids[i]]
 
         new_block.e_type = last_type
 
@@ -52,6 +119,117 @@ def generate_planner_blocks(states: List[state], firmware=None):
     return block_list
 
 
+def _plan_state_table(table: StateTable, firmware=None) -> Tuple[List[planner_block], np.ndarray]:
+    """Plan a state table with the lookahead planner, creating states only for the planner blocks.
+
+    The junctions, the lookahead passes and the segments are calculated on the columns of the table. The states of
+    the blocks are views of their rows and the row before, linked to each other, see `StateTable.__getitem__`.
+    The blocks equal the ones of `generate_planner_blocks` with `lookahead` for the linked list of all states.
+
+    Args:
+        table: (StateTable) all states
+        firmware: (string, default = None) select firmware by name
+
+    Returns:
+        block_list: (list[planner_block]) list of all planner blocks
+        block_states: (np.ndarray) row of the state ending every planner block
+    """
+    bar = ProgressBar(name="Planner Blocks")
+    target_vels, junction_vels = batch_junction_velocities(states=table, firmware=firmware)
+    junction_vels = lookahead_junction_velocities(states=table, target_vels=target_vels, junction_vels=junction_vels)
+    segment_table, block_states, blocktypes = batch_planner_segments(
+        states=table, target_vels=target_vels, junction_vels=junction_vels
+    )
+
+    # feature type of every row: the last type named in a comment up to the row
+    feature_types = [None] + list(_FEATURE_COLORS)
+    comment_codes = [0]
+    for comment in table.comments:
+        codes = [code for code, key in enumerate(feature_types[1:], start=1) if key in comment.lower()]
+        comment_codes.append(codes[-1] if codes else 0)
+    row_codes = np.array(comment_codes)[table.comment_index + 1]
+    last_named = np.maximum.accumulate(np.where(row_codes > 0, np.arange(len(table)), -1))
+    block_codes = np.where(last_named[block_states] >= 0, row_codes[last_named[block_states]], 0)
+
+    # states of the blocks and the rows before them
+    rows = block_states.tolist()
+    views = {row: table[row] for row in set(rows) | {row - 1 for row in rows if row > 0}}
+    for row in rows:
+        if row > 0:
+            views[row].prev_state = views[row - 1]
+            views[row - 1].next_state = views[row]
+
+    block_list = []
+    prev_block = None
+    for block_id, (row, code) in enumerate(zip(rows, block_codes.tolist())):
+        new_block = planner_block(
+            state=views[row],
+            prev_block=prev_block,
+            firmware=firmware,
+            target_vel=velocity(target_vels[row]),
+            junction_vel=junction_vels[row],
+            segment_table=segment_table,
+            block_id=block_id,
+        )
+        new_block.blocktype = blocktypes[block_id]
+        new_block.e_type = feature_types[code]
+        if prev_block is not None:
+            prev_block.next_block = new_block
+        block_list.append(new_block)
+        prev_block = new_block
+        bar.update((block_id + 1) / len(rows))
+    return block_list, block_states
+
+
+def tabulate_blocklist(blocklist: List[planner_block]) -> SegmentTable:
+    """Store the segments of all planner blocks in a segment table, the blocks then use views of its rows.
+
+    If the blocks already use the rows of one table in order, this table is returned.
+
+    Args:
+        blocklist: (list[planner_block]) list of all planner blocks
+
+    Returns:
+        table: (SegmentTable) segments of all planner blocks, `block_id` is the index in the blocklist
+    """
+    first_segments = [block.get_segments()[0] for block in blocklist]
+    table = getattr(first_segments[0], "table", None) if len(blocklist) > 0 else None
+    if table is not None and len(table.block_offsets) == len(blocklist) + 1:
+        if all(
+            getattr(segm, "table", None) is table and segm.index == offset
+            for segm, offset in zip(first_segments, table.block_offsets.tolist())
+        ):
+            return table  # segments were planned into a table already, see `batch_planner_segments`
+
+    counts = [len(block.get_segments()) for block in blocklist]
+    table = SegmentTable.from_segments(
+        segments=unpack_blocklist(blocklist), block_id=np.repeat(np.arange(len(blocklist)), counts)
+    )
+    for block_id, block in enumerate(blocklist):
+        block.use_segment_table(table=table, block_id=block_id)
+    return table
+
+
+def update_timeline(blocklist: List[planner_block]) -> np.ndarray:
+    """Place the planner blocks back to back in time, using the cumulative sum of their durations.
+
+    Only the begin time of each block is updated, its segments are shifted when they are accessed next.
+
+    Args:
+        blocklist: (list[planner_block]) list of all planner blocks
+
+    Returns:
+        t_begin: (np.ndarray) (n + 1,) begin time of every block and the end time of the last block
+    """
+    if len(blocklist) == 0:
+        return np.zeros(1)
+    durations = np.fromiter((block.duration for block in blocklist), dtype=float, count=len(blocklist))
+    t_begin = np.cumsum(np.concatenate(([blocklist[0].t_begin], durations)))
+    for block, block_begin in zip(blocklist, t_begin.tolist()):
+        block.t_begin = block_begin
+    return t_begin
+
+
 def find_current_segment(path: List[segment], t: float, last_index: int = None, keep_position: bool = False):
     """Find the current segment.
 
@@ -143,19 +321,30 @@ class simulation:
         initial_machine_setup: "setup" = None,
         output_unit_system: str = "SI (mm)",
         verbosity_level: Optional[int] = None,
+        compact: bool = False,
+        skip_metadata: bool = False,
+        lookahead: bool = False,
     ):
         """Initialize the Simulation of a given G-code with initial machine setup or default machine.
 
         - Generate all states from GCode.
         - Connect states with planner blocks, consisting of segments
-        - Self correct inconsistencies.
+        - Self correct inconsistencies, or plan reachable junction velocities beforehand with `lookahead`.
 
         Args:
-            gcode_path: (Path) path to GCode
+            gcode_path: (Path) path to GCode or to a compiled .pgcd file, which skips parsing the text
             machine_name: (string, default = None) name of the default machine to use
             initial_machine_setup: (setup, default = None) setup instance
             output_unit_system: (string, default = "SI (mm)") available unit systems: SI, SI (mm) & inch
             verbosity_level: (int, default = None) set verbosity level (0: no output, 1: warnings, 2: info, 3: debug)
+            compact: (bool, default = False) fold states without movement into the next moving state before planning,
+                see `state_generator.compact_states`
+            skip_metadata: (bool, default = False) skip comment blocks without motion, like thumbnails and config
+                dumps, in bulk while reading. A summary of the skipped blocks is stored in `skipped_blocks`
+            lookahead: (bool, default = False) use a firmware-style two-pass lookahead planner, which calculates
+                every block once in linear time, instead of the recursive self correction of the blocks.
+                Unless `compact` is used, the G-code is read into the columns of `state_table` and states are only
+                created for the planner blocks, the list `states` is created on first access
 
         Example:
         ```python
@@ -163,9 +352,12 @@ class simulation:
         ```
         """
         simulation_start_time = time.time()
-        self._last_index = None  # used to optimize search in segment list
+        self._time_index = None  # sorted segment times for the search in get_values, see `_get_time_index`
+        self._distance_index = None  # cumulative travel distance of the segments, see `_get_distance_index`
+        self._spatial_index = None  # see `get_spatial_index`
         self.filename = Path(gcode_path)
         self.firmware = None
+        self.lookahead = lookahead
         set_verbosity_level(verbosity_level)
 
         # set output unit system
@@ -202,16 +394,39 @@ class simulation:
         self.initial_machine_setup_dict = initial_machine_setup.check_initial_setup()
         self.firmware = self.initial_machine_setup_dict["firmware"]
 
-        self.states: List[state] = generate_states(
-            filepath=self.filename, initial_machine_setup=self.initial_machine_setup_dict
-        )
+        self.skipped_blocks = [] if skip_metadata else None  # (name, first_line, last_line) of skipped blocks
+        self.state_table: Optional[StateTable] = None  # states as columns, planned without a state per line
+        self._states = None  # see `states`
+        if self.lookahead and not compact:
+            self.state_table = generate_state_table(
+                filepath=self.filename,
+                initial_machine_setup=self.initial_machine_setup_dict,
+                skipped_blocks=self.skipped_blocks,
+            )
+        else:
+            states = iter_states(
+                filepath=self.filename,
+                initial_machine_setup=self.initial_machine_setup_dict,
+                skipped_blocks=self.skipped_blocks,
+            )
+            if compact:
+                states = compact_states(states)
+            self.states = list(states)
 
         custom_print(
             f"Simulating {self.filename} with {self.initial_machine_setup_dict['printer']} using "
             f"the {self.firmware} firmware."
         )
-        self.blocklist: List[planner_block] = generate_planner_blocks(states=self.states, firmware=self.firmware)
-        self.trajectory_self_correct()
+        self._block_states = None  # index of the state ending every block, see `update_states`
+        if self.state_table is not None:
+            self.blocklist, self._block_states = _plan_state_table(table=self.state_table, firmware=self.firmware)
+        else:
+            self.blocklist: List[planner_block] = generate_planner_blocks(
+                states=self.states, firmware=self.firmware, lookahead=self.lookahead
+            )
+        if not self.lookahead:
+            self.trajectory_self_correct()
+        self.segment_table: SegmentTable = tabulate_blocklist(self.blocklist)
 
         # calculate results
         self.results = {}
@@ -225,6 +440,24 @@ class simulation:
         if name in self.results:
             return self.results[name]
 
+    @property
+    def states(self) -> List[state]:
+        """Return the linked list of all states.
+
+        If the simulation was planned from `state_table`, the states are created on first access and the planner
+        blocks are linked to them.
+        """
+        if self._states is None and self.state_table is not None:
+            self._states = self.state_table.to_states()
+            for block, row in zip(self.blocklist, self._get_block_states().tolist()):
+                block.state_B = self._states[row]
+                block.state_A = self._states[row].prev_state
+        return self._states
+
+    @states.setter
+    def states(self, states: List[state]):
+        self._states = states
+
     def trajectory_self_correct(self):
         """Self correct all blocks in the blocklist with self_correction() method."""
         n_max = len(self.blocklist)
@@ -237,14 +470,15 @@ class simulation:
                 bar.last_progress_update = progress
 
             block.self_correction()
+        update_timeline(self.blocklist)
         bar.update(1.0)
 
     def calc_results(self):
         """Calculate the results."""
         calculators = get_all_result_calculators()
 
-        for pb in self.blocklist:
-            pb.calc_results(*calculators)
+        for calculator in calculators:
+            calculator.calc_table(table=self.segment_table, blocklist=self.blocklist)
 
     def calculate_averages(self):
         """Calculate averages for averageable results."""
@@ -296,8 +530,7 @@ class simulation:
             list: [vel_x, vel_y, vel_z, vel_e] velocity
             list: [pos_x, pos_y, pos_z, pos_e] position
         """
-        segments = unpack_blocklist(blocklist=self.blocklist)
-        segm, self._last_index = find_current_segment(path=segments, t=t, last_index=self._last_index)
+        segm = self.segment_table[int(self._find_segments(np.array([float(t)]))[0])]
         tmp_vel = segm.get_velocity(t=t).get_vec(withExtrusion=True)
         tmp_pos = segm.get_position(t=t).get_vec(withExtrusion=True)
 
@@ -309,6 +542,183 @@ class simulation:
 
         return tmp_vel, tmp_pos
 
+    def get_values_batch(self, times: np.ndarray, output_unit_system: str = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return unit system scaled values for vel and pos at many times, like `get_values`.
+
+        The segments are looked up and interpolated with array operations, in chunks to limit the memory of the
+        intermediate arrays. The values are identical to `get_values` at every time.
+
+        Args:
+            times: (np.ndarray) (N,) times in any order
+            output_unit_system (str, optional): Unit system for the output.
+                The one from the simulation is used, in None is specified.
+
+        Returns:
+            np.ndarray: (N, 4) velocity x, y, z, e at every time
+            np.ndarray: (N, 4) position x, y, z, e at every time
+
+        Example:
+        ```python
+        vel, pos = sim.get_values_batch(times=np.linspace(0, 100, 1_000_000))
+        ```
+        """
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        scaling = self.get_scaling_factor(output_unit_system=output_unit_system)
+        vel = np.empty((len(times), 4))
+        pos = np.empty((len(times), 4))
+        chunk_size = 1 << 18
+        for start in range(0, len(times), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            chunk_times = times[chunk]
+            chunk_vel, chunk_pos = self.segment_table.interpolate(rows=self._find_segments(chunk_times), t=chunk_times)
+            # scale to required unit system
+            np.multiply(scaling, chunk_vel, out=vel[chunk])
+            np.multiply(scaling, chunk_pos, out=pos[chunk])
+        return vel, pos
+
+    def time_at_distance(self, distances: np.ndarray, output_unit_system: str = None) -> np.ndarray:
+        """Return the times at which the nozzle has traveled distances along the whole path, travel moves included.
+
+        Args:
+            distances: (np.ndarray) (N,) traveled distances in any order
+            output_unit_system (str, optional): Unit system of the distances.
+                The one from the simulation is used, in None is specified.
+
+        Returns:
+            np.ndarray: (N,) first time at which every distance is reached
+        """
+        return self._locate_distances(distances=distances, output_unit_system=output_unit_system)[1]
+
+    def get_values_by_distance(
+        self, distances: np.ndarray, output_unit_system: str = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return unit system scaled values for vel and pos after traveled distances, see `time_at_distance`.
+
+        Args:
+            distances: (np.ndarray) (N,) traveled distances in any order
+            output_unit_system (str, optional): Unit system of the distances and the output.
+                The one from the simulation is used, in None is specified.
+
+        Returns:
+            np.ndarray: (N, 4) velocity x, y, z, e at every distance
+            np.ndarray: (N, 4) position x, y, z, e at every distance
+
+        Example:
+        ```python
+        vel, pos = sim.get_values_by_distance(distances=np.arange(0, 1000, 0.1))
+        ```
+        """
+        rows, t = self._locate_distances(distances=distances, output_unit_system=output_unit_system)
+        vel, pos = self.segment_table.interpolate(rows=rows, t=t)
+        scaling = self.get_scaling_factor(output_unit_system=output_unit_system)
+        return scaling * vel, scaling * pos
+
+    def get_spatial_index(self, cell_size: float = None) -> SpatialIndex:
+        """Return the spatial index of the segments for point, box and plane queries, see `spatial_index`.
+
+        The index is built once and dropped by `refresh` and `update_states`. It is built again for another cell
+        size.
+
+        Args:
+            cell_size: (float, default = None) edge length of the grid cells in mm, see `SpatialIndex`
+
+        Returns:
+            SpatialIndex: index of the rows of the segment table
+
+        Example:
+        ```python
+        rows, t_in, t_out = sim.get_spatial_index().in_box(box_min=[10, 10, 0], box_max=[12, 12, 1])
+        ```
+        """
+        if self._spatial_index is None or (cell_size is not None and cell_size != self._spatial_index.cell_size):
+            self._spatial_index = SpatialIndex(table=self.segment_table, cell_size=cell_size)
+        return self._spatial_index
+
+    def resample(
+        self, rate: float, chunk_size: int = 1 << 18, output_unit_system: str = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """Sample the trajectory at a fixed rate and yield the samples in chunks, like `get_values_batch`.
+
+        The samples are at t = t_begin + k / rate from the begin to the end of the trajectory. Only one chunk is
+        held in memory at a time, so the whole trajectory can be sampled for a long print at a high rate.
+
+        Args:
+            rate: (float) samples per second
+            chunk_size: (int, default = 2^18) maximum number of samples per chunk
+            output_unit_system (str, optional): Unit system for the output.
+                The one from the simulation is used, in None is specified.
+
+        Yields:
+            np.ndarray: (n,) time of the samples
+            np.ndarray: (n, 4) position x, y, z, e
+            np.ndarray: (n, 4) velocity x, y, z, e
+            np.ndarray: (n,) True where the segment is extruding
+
+        Example:
+        ```python
+        for t, pos, vel, extruding in sim.resample(rate=1000):
+            controller.send(pos[:, :3])
+        ```
+        """
+        t_begin, t_end, n_samples = self._get_sample_range(rate=rate)
+        scaling = self.get_scaling_factor(output_unit_system=output_unit_system)
+        extruding = self.segment_table.is_extruding()
+        for start in range(0, n_samples, chunk_size):
+            t = np.minimum(t_begin + np.arange(start, min(start + chunk_size, n_samples)) / rate, t_end)
+            rows = self._find_segments(t)
+            vel, pos = self.segment_table.interpolate(rows=rows, t=t)
+            yield t, scaling * pos, scaling * vel, extruding[rows]
+
+    def save_resampled(
+        self, filepath: Union[Path, str], rate: float, chunk_size: int = 1 << 18, output_unit_system: str = None
+    ):
+        """Save the trajectory sampled at a fixed rate to a .npy or binary file, chunk by chunk, see `resample`.
+
+        Every sample is a record of `RESAMPLED_DTYPE` with the fields t, pos (4), vel (4) and extruding. A .npy file
+        is written through a memory map, any other suffix writes the raw records, which are read with
+        `np.fromfile(filepath, dtype=RESAMPLED_DTYPE)`.
+
+        Args:
+            filepath: (Path | str) path to the .npy or binary file
+            rate: (float) samples per second
+            chunk_size: (int, default = 2^18) maximum number of samples per chunk
+            output_unit_system (str, optional): Unit system for the output.
+                The one from the simulation is used, in None is specified.
+        """
+        filepath = Path(filepath)
+        n_samples = self._get_sample_range(rate=rate)[2]
+        bar = ProgressBar(name="Resampling")
+        if filepath.suffix == ".npy":
+            records = np.lib.format.open_memmap(filepath, mode="w+", dtype=RESAMPLED_DTYPE, shape=(n_samples,))
+            file = None
+        else:
+            file = open(filepath, mode="wb")
+        try:
+            start = 0
+            for t, pos, vel, extruding in self.resample(
+                rate=rate, chunk_size=chunk_size, output_unit_system=output_unit_system
+            ):
+                rows = slice(start, start + len(t))
+                chunk = records[rows] if file is None else np.empty(len(t), dtype=RESAMPLED_DTYPE)
+                chunk["t"], chunk["pos"], chunk["vel"], chunk["extruding"] = t, pos, vel, extruding
+                if file is not None:
+                    chunk.tofile(file)
+                start += len(t)
+                bar.update(start / n_samples)
+        finally:
+            if file is None:
+                records.flush()
+            else:
+                file.close()
+        custom_print(f"💾 {n_samples} samples written to 👉 {str(filepath)}")
+
+    def _get_sample_range(self, rate: float) -> Tuple[float, float, int]:
+        """Return the begin, the end and the number of samples of the trajectory at a fixed rate."""
+        if not rate > 0:
+            raise ValueError(f"The sample rate has to be positive, got {rate}.")
+        t_begin, t_end = float(self.segment_table.t_begin[0]), float(self.segment_table.t_end[-1])
+        return t_begin, t_end, int(np.floor((t_end - t_begin) * rate)) + 1
+
     def get_width(self, t: float, extrusion_h: float, filament_dia: Optional[float] = None) -> float:
         """Return the extrusion width for a certain extrusion height at time.
 
@@ -341,7 +751,8 @@ class simulation:
             start_time (float): time when the simulation run was started
         """
         custom_print(
-            f"✅ Simulation finished: pyGCodeDecode extracted {len(self.states)} states from {self.filename}"
+            f"✅ Simulation finished: pyGCodeDecode extracted "
+            f"{len(self.state_table) if self._states is None else len(self._states)} states from {self.filename}"
             f" and generated {len(self.blocklist)} planner blocks.\n"
             f"Estimated time to travel all states with provided "
             f"printer settings is {self.blocklist[-1].get_segments()[-1].t_end:.2f} seconds.\n"
@@ -358,10 +769,201 @@ class simulation:
         if new_state_list is not None:
             self.states = new_state_list
 
-        self.blocklist: List[planner_block] = generate_planner_blocks(
-            states=self.states, firmware=self.initial_machine_setup_dict["firmware"]
+        if self._states is None and self.lookahead:
+            self.blocklist, self._block_states = _plan_state_table(
+                table=self.state_table, firmware=self.initial_machine_setup_dict["firmware"]
+            )
+        else:
+            self.blocklist: List[planner_block] = generate_planner_blocks(
+                states=self.states, firmware=self.initial_machine_setup_dict["firmware"], lookahead=self.lookahead
+            )
+            self._block_states = None
+        if not self.lookahead:
+            self.trajectory_self_correct()
+        self.segment_table: SegmentTable = tabulate_blocklist(self.blocklist)
+        self._time_index = None
+        self._distance_index = None
+        self._spatial_index = None
+
+    def update_states(self, start: int, end: int, new_states: List[state]) -> Tuple[int, int]:
+        """Replace the states [start, end) and plan only the affected window of planner blocks again.
+
+        Blocks without travel, like retractions and dwells, end and begin with zero velocity, so the trajectory on
+        one side of them does not depend on the other side. The window reaches from the last such block before the
+        changed states to the first one after them, or to the begin or end of the program. Later blocks keep their
+        velocity profile and positions and are shifted in time by the change of the window duration.
+        The segment table is updated in place and the results of the new segments are calculated,
+        the averages are not updated, see `calculate_averages`.
+
+        Args:
+            start: (int) index of the first replaced state
+            end: (int) index after the last replaced state, equal to `start` to insert states
+            new_states: (list[state]) new states, which are linked to their neighbors here
+
+        Returns:
+            blocks: (tuple[int, int]) index of the first and after the last re-planned block in the blocklist
+        """
+        if not 0 <= start <= end <= len(self.states):
+            raise ValueError(f"Invalid range of states [{start}, {end}) for {len(self.states)} states.")
+        block_states = self._get_block_states()
+
+        # link and insert the new states
+        chain = [self.states[start - 1] if start > 0 else None] + list(new_states)
+        chain.append(self.states[end] if end < len(self.states) else None)
+        for prev_state, next_state in zip(chain[:-1], chain[1:]):
+            if prev_state is not None:
+                prev_state.next_state = next_state
+            if next_state is not None:
+                next_state.prev_state = prev_state
+        shift = len(new_states) - (end - start)
+        self.states[start:end] = new_states
+
+        # window of blocks between blocks without travel, the junction of the last move before start is changed too
+        def no_travel(block_index: int) -> bool:
+            return self.blocklist[block_index].target_vel.get_norm() == 0
+
+        last_move = int(np.searchsorted(block_states, start)) - 1
+        while last_move >= 0 and self.blocklist[last_move].state_B.pause is not None:
+            last_move -= 1
+        left = last_move - 1
+        while left >= 0 and not no_travel(left):
+            left -= 1
+        right = int(np.searchsorted(block_states, end, side="right"))
+        while right < len(self.blocklist) and not no_travel(right):
+            right += 1
+        first_block, end_block = max(left + 1, 0), min(right + 1, len(self.blocklist))
+        prev_block = self.blocklist[first_block - 1] if first_block > 0 else None
+        next_block = self.blocklist[end_block] if end_block < len(self.blocklist) else None
+
+        # states of the window, the junctions also depend on the previous state and the next move
+        state_begin = int(block_states[first_block - 1]) + 1 if first_block > 0 else 0
+        state_end = int(block_states[end_block - 1]) + 1 + shift if next_block is not None else len(self.states)
+        next_move = state_end
+        while next_move < len(self.states) and (
+            self.states[next_move].state_position.get_vec(withExtrusion=True)
+            == self.states[next_move - 1].state_position.get_vec(withExtrusion=True)
+        ):
+            next_move += 1
+        context_begin, context_end = max(state_begin - 1, 0), next_move + 1
+        target_vels, junction_vels = batch_junction_velocities(
+            states=self.states[context_begin:context_end], firmware=self.firmware
+        )
+        window_slice = slice(state_begin - context_begin, state_end - context_begin)
+
+        window = generate_planner_blocks(
+            states=self.states[state_begin:state_end],
+            firmware=self.firmware,
+            lookahead=self.lookahead,
+            prev_block=prev_block,
+            junctions=(target_vels[window_slice], junction_vels[window_slice]),
+        )
+        if not self.lookahead and len(window) > 0:
+            window[-1].next_block = next_block
+            for block in window:
+                block.self_correction()
+            update_timeline(([prev_block] if prev_block is not None else []) + window)
+
+        # replace the rows of the window and shift the following rows
+        window_table = tabulate_blocklist(window)
+        for calculator in get_all_result_calculators():
+            calculator.calc_table(table=window_table, blocklist=window)
+        self.segment_table.replace_blocks(first_block=first_block, n_blocks=end_block - first_block, table=window_table)
+        for block_id, block in enumerate(window, start=first_block):
+            block.use_segment_table(table=self.segment_table, block_id=block_id)
+
+        last_block = window[-1] if len(window) > 0 else prev_block
+        if next_block is not None:
+            delta_t = (last_block.t_begin + last_block.duration if last_block is not None else 0.0) - next_block.t_begin
+            if delta_t != 0:
+                rows = slice(int(self.segment_table.block_offsets[first_block + len(window)]), None)
+                self.segment_table.t_begin[rows] += delta_t
+                self.segment_table.t_end[rows] += delta_t
+                for block in self.blocklist[end_block:]:
+                    block.timeshift(delta_t=delta_t, segments_shifted=True)
+            next_block.prev_block = last_block
+        if last_block is not None:
+            last_block.next_block = next_block
+
+        self.blocklist[first_block:end_block] = window
+        window_states = {id(this_state): i for i, this_state in enumerate(self.states[state_begin:state_end])}
+        self._block_states = np.concatenate(
+            (
+                block_states[:first_block],
+                np.array([state_begin + window_states[id(block.state_B)] for block in window], dtype=np.int64),
+                block_states[end_block:] + shift,
+            )
         )
-        self.trajectory_self_correct()
+        self._time_index = None
+        self._distance_index = None
+        self._spatial_index = None
+        return first_block, first_block + len(window)
+
+    def _get_block_states(self) -> np.ndarray:
+        """Return the index of the state ending every planner block, see `update_states`."""
+        if self._block_states is None:
+            state_index = {id(this_state): i for i, this_state in enumerate(self.states)}
+            self._block_states = np.array([state_index[id(block.state_B)] for block in self.blocklist], dtype=np.int64)
+        return self._block_states
+
+    def _get_time_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the begin and end times of all segments in the rows of the segment table, sorted for a binary search.
+
+        The index is built once and dropped by `refresh` and `update_states`.
+        """
+        if self._time_index is None:
+            # the end times are non decreasing, the running maximum only guards against rounding between blocks
+            self._time_index = (self.segment_table.t_begin.copy(), np.maximum.accumulate(self.segment_table.t_end))
+        return self._time_index
+
+    def _find_segments(self, times: np.ndarray) -> np.ndarray:
+        """Return the rows of the segment table at the times with a binary search, see `_get_time_index`.
+
+        Args:
+            times: (np.ndarray) (N,) times in any order
+
+        Returns:
+            rows: (np.ndarray) (N,) row of the segment at every time, the earlier one at the boundary of two segments
+        """
+        t_begin, t_end = self._get_time_index()
+        rows = np.searchsorted(t_end, times, side="right")  # first segment ending after the time
+        if len(t_end) > 0:
+            rows[(rows == len(t_end)) & (times == t_end[-1])] -= 1  # end of the last segment
+        outside = rows == len(t_end)
+        outside[~outside] = times[~outside] < t_begin[rows[~outside]]
+        if outside.any():
+            custom_print("No movement at this time in Path!", lvl=1)
+            raise ValueError(f"No segment at the time {times[outside][0]}.")
+        return rows
+
+    def _get_distance_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the cumulative travel distance at the begin and the end of all segments in the rows of the table.
+
+        The index is built once and dropped by `refresh` and `update_states`.
+        """
+        if self._distance_index is None:
+            dist_end = np.cumsum(self.segment_table.get_lengths())
+            self._distance_index = (np.concatenate(([0.0], dist_end[:-1])), dist_end)
+        return self._distance_index
+
+    def _locate_distances(self, distances: np.ndarray, output_unit_system: str = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows of the segment table and the times at which traveled distances are reached.
+
+        Args:
+            distances: (np.ndarray) (N,) traveled distances in any order
+            output_unit_system (str, optional): Unit system of the distances.
+
+        Returns:
+            rows: (np.ndarray) (N,) row of the first segment reaching every distance
+            t: (np.ndarray) (N,) time at every distance
+        """
+        distances = np.asarray(distances, dtype=np.float64).reshape(-1)
+        dist = distances / self.get_scaling_factor(output_unit_system=output_unit_system)
+        dist_begin, dist_end = self._get_distance_index()
+        rows = np.searchsorted(dist_end, dist, side="left")  # first segment ending at or after the distance
+        outside = (dist < 0) | (rows == len(dist_end))
+        if outside.any():
+            raise ValueError(f"No segment at the distance {distances[outside][0]}.")
+        return rows, self.segment_table.get_times_by_dist(rows=rows, dist=dist - dist_begin[rows])
 
     def extrusion_extent(self, output_unit_system: str = None) -> np.ndarray:
         """Return scaled xyz min & max while extruding.
@@ -506,7 +1108,7 @@ class setup:
 
     def __getattr__(self, name):
         """Access to setup_dict content."""
-        if name in self.setup_dict:
+        if name != "setup_dict" and name in self.setup_dict:  # no setup_dict yet while unpickling or copying
             return self.setup_dict[name]
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
@@ -582,6 +1184,7 @@ class setup:
             "absolute_extrusion",
             "initial_position",
             "units",
+            "mm_per_arc_segment",
         ]
 
         valid_keys = req_keys + optional_keys
@@ -2,13 +2,14 @@
 
 import inspect
 import sys
+from typing import List, Tuple, Union
 
 import numpy as np
 
 from pyGCodeDecode.helpers import custom_print
 
-from .state import state
-from .utils import velocity
+from .state import StateTable, state
+from .utils import _row_dots, _row_norms, velocity
 
 
 class junction_handling:
@@ -81,6 +82,24 @@ class junction_handling:
         """
         return 0
 
+    @classmethod
+    def batch_junction_vel(
+        cls, vel_0: np.ndarray, vel_1: np.ndarray, jerk: np.ndarray, p_acc: np.ndarray, speed: np.ndarray
+    ) -> np.ndarray:
+        """Calculate the junction velocities of many junctions at once, identical to `get_junction_vel`.
+
+        Args:
+            vel_0: (np.ndarray) (n, 4) target velocity of the moves into the junctions
+            vel_1: (np.ndarray) (n, 4) target velocity of the moves out of the junctions
+            jerk: (np.ndarray) (n,) jerk setting at the junctions
+            p_acc: (np.ndarray) (n,) printing acceleration at the junctions
+            speed: (np.ndarray) (n,) nominal speed at the junctions
+
+        Returns:
+            junction_vel: (np.ndarray) (n,) junction velocities, zero for default full stop junction handling
+        """
+        return np.zeros(len(vel_0))
+
 
 class prusa(junction_handling):
     """Prusa specific classic jerk junction handling (validated on Prusa Mini).
@@ -193,6 +212,48 @@ class prusa(junction_handling):
         """
         return self.junction_vel
 
+    @classmethod
+    def batch_junction_vel(
+        cls, vel_0: np.ndarray, vel_1: np.ndarray, jerk: np.ndarray, p_acc: np.ndarray, speed: np.ndarray
+    ) -> np.ndarray:
+        """Calculate the junction velocities of many junctions at once, identical to `calc_j_vel`.
+
+        Args:
+            vel_0: (np.ndarray) (n, 4) target velocity of the moves into the junctions
+            vel_1: (np.ndarray) (n, 4) target velocity of the moves out of the junctions
+            jerk: (np.ndarray) (n,) jerk setting at the junctions
+            p_acc: (np.ndarray) (n,) printing acceleration at the junctions
+            speed: (np.ndarray) (n,) nominal speed at the junctions
+
+        Returns:
+            junction_vel: (np.ndarray) (n,) junction velocities
+        """
+        norm_0 = _row_norms(vel_0[:, :3])
+        v_max_junction = np.minimum(norm_0, _row_norms(vel_1[:, :3]))
+        smaller_speed_factor = np.zeros(len(vel_0))
+        np.divide(v_max_junction, norm_0, out=smaller_speed_factor, where=v_max_junction > 0)
+
+        v_factor = np.ones(len(vel_0))
+        limited = np.zeros(len(vel_0), dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for axis in range(4):  # Include extrusion axis
+                # the factor is one until the junction is limited, so scaling all junctions gives the same result
+                v_exit = vel_0[:, axis] * smaller_speed_factor * v_factor
+                v_entry = vel_1[:, axis] * v_factor
+
+                # Calculate jerk depending on whether the axis is coasting in the same direction or reversing
+                axis_jerk = np.where(
+                    v_exit > v_entry,
+                    np.where((v_entry > 0) | (v_exit < 0), v_exit - v_entry, np.maximum(v_exit, -v_entry)),
+                    np.where((v_entry < 0) | (v_exit > 0), v_entry - v_exit, np.maximum(-v_exit, v_entry)),
+                )
+
+                exceeded = axis_jerk > jerk
+                v_factor = np.where(exceeded, v_factor * (jerk / axis_jerk), v_factor)
+                limited |= exceeded
+
+        return np.where(limited, v_max_junction * v_factor, v_max_junction)
+
 
 class marlin(junction_handling):
     """Marlin classic jerk specific junction handling.
@@ -256,6 +317,35 @@ class marlin(junction_handling):
         """
         return self.junction_vel
 
+    @classmethod
+    def batch_junction_vel(
+        cls, vel_0: np.ndarray, vel_1: np.ndarray, jerk: np.ndarray, p_acc: np.ndarray, speed: np.ndarray
+    ) -> np.ndarray:
+        """Calculate the junction velocities of many junctions at once, identical to `calc_j_vel`.
+
+        Args:
+            vel_0: (np.ndarray) (n, 4) target velocity of the moves into the junctions
+            vel_1: (np.ndarray) (n, 4) target velocity of the moves out of the junctions
+            jerk: (np.ndarray) (n,) jerk setting at the junctions
+            p_acc: (np.ndarray) (n,) printing acceleration at the junctions
+            speed: (np.ndarray) (n,) nominal speed at the junctions
+
+        Returns:
+            junction_vel: (np.ndarray) (n,) junction velocities
+        """
+        vel_diff = vel_0 - vel_1
+
+        scale = np.ones(len(vel_0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for axx in range(4):
+                ax_jerk = np.abs(vel_diff[:, axx])
+                scale = np.where(ax_jerk * scale > jerk, jerk / ax_jerk, scale)
+
+        scaled = scale < 1
+        junction_vel = _row_norms(vel_0[:, :3])
+        junction_vel[scaled] = _row_norms(vel_0[scaled, :3] * scale[scaled, None])
+        return junction_vel
+
 
 class ultimaker(junction_handling):
     """Ultimaker specific junction handling.
@@ -358,6 +448,60 @@ class ultimaker(junction_handling):
         """
         return self.junction_vel
 
+    @classmethod
+    def batch_junction_vel(
+        cls, vel_0: np.ndarray, vel_1: np.ndarray, jerk: np.ndarray, p_acc: np.ndarray, speed: np.ndarray
+    ) -> np.ndarray:
+        """Calculate the junction velocities of many junctions at once, identical to `calc_j_vel`.
+
+        Args:
+            vel_0: (np.ndarray) (n, 4) target velocity of the moves into the junctions
+            vel_1: (np.ndarray) (n, 4) target velocity of the moves out of the junctions
+            jerk: (np.ndarray) (n,) jerk setting at the junctions, used for all axes
+            p_acc: (np.ndarray) (n,) printing acceleration at the junctions
+            speed: (np.ndarray) (n,) nominal speed at the junctions
+
+        Returns:
+            junction_vel: (np.ndarray) (n,) junction velocities
+        """
+        # max jerk values, there are no separate z and e jerk settings
+        max_xy_jerk = max_z_jerk = max_e_jerk = jerk
+
+        # current and previous speeds
+        curr_speed = vel_1
+        prev_speed = vel_0
+        norm_0 = _row_norms(vel_0[:, :3])
+        norm_1 = _row_norms(vel_1[:, :3])
+
+        # XY jerk, float_power calls pow like the scalar ** while ** of arrays squares by multiplication
+        xy_jerk = np.sqrt(
+            np.float_power(curr_speed[:, 0] - prev_speed[:, 0], 2)
+            + np.float_power(curr_speed[:, 1] - prev_speed[:, 1], 2)
+        )
+        z_jerk = np.abs(curr_speed[:, 2] - prev_speed[:, 2])
+        e_jerk = np.abs(curr_speed[:, 3] - prev_speed[:, 3])
+
+        # Initial vmax_junction
+        vmax_junction = max_xy_jerk / 2.0
+        vmax_junction = np.where(
+            np.abs(curr_speed[:, 2]) > max_z_jerk / 2.0, np.minimum(vmax_junction, max_z_jerk / 2.0), vmax_junction
+        )
+        vmax_junction = np.where(
+            np.abs(curr_speed[:, 3]) > max_e_jerk / 2.0, np.minimum(vmax_junction, max_e_jerk / 2.0), vmax_junction
+        )
+        vmax_junction = np.minimum(vmax_junction, norm_1)
+
+        # If there is a previous move (simulate moves_queued > 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vmax_junction_factor = np.where(xy_jerk > max_xy_jerk, max_xy_jerk / xy_jerk, 1.0)
+            vmax_junction_factor = np.where(
+                z_jerk > max_z_jerk, np.minimum(vmax_junction_factor, max_z_jerk / z_jerk), vmax_junction_factor
+            )
+            vmax_junction_factor = np.where(
+                e_jerk > max_e_jerk, np.minimum(vmax_junction_factor, max_e_jerk / e_jerk), vmax_junction_factor
+            )
+        return np.where(norm_0 > 0.0001, np.minimum(norm_0, norm_1 * vmax_junction_factor), vmax_junction)
+
 
 class mka(prusa):
     """Anisoprint Composer models using MKA Firmware junction handling.
@@ -420,7 +564,7 @@ class junction_deviation(junction_handling):
         JD_acc = p_settings.p_acc
         if p_settings.jerk == 0:
             return 0
-        JD_delta = 0.414 * p_settings.jerk * p_settings.jerk / JD_acc  # [2]
+        JD_delta = p_settings.jd_delta  # [2], cached per settings instance
         JD_minAngle = 18
         JD_maxAngle = 180 - 18
         vel_0_vec = vel_0.get_vec()
@@ -470,6 +614,51 @@ class junction_deviation(junction_handling):
         """
         return self.junction_vel
 
+    @classmethod
+    def batch_junction_vel(
+        cls, vel_0: np.ndarray, vel_1: np.ndarray, jerk: np.ndarray, p_acc: np.ndarray, speed: np.ndarray
+    ) -> np.ndarray:
+        """Calculate the junction velocities of many junctions at once, identical to `calc_JD`.
+
+        Args:
+            vel_0: (np.ndarray) (n, 4) target velocity of the moves into the junctions
+            vel_1: (np.ndarray) (n, 4) target velocity of the moves out of the junctions
+            jerk: (np.ndarray) (n,) jerk setting at the junctions
+            p_acc: (np.ndarray) (n,) printing acceleration at the junctions
+            speed: (np.ndarray) (n,) nominal speed at the junctions
+
+        Returns:
+            junction_vel: (np.ndarray) (n,) junction velocities
+        """
+        JD_minAngle = 18
+        JD_maxAngle = 180 - 18
+        vel_0_vec = vel_0[:, :3]
+        vel_1_vec = vel_1[:, :3]
+        norm_0 = _row_norms(vel_0_vec)
+        norm_1 = _row_norms(vel_1_vec)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            JD_delta = 0.414 * jerk * jerk / p_acc  # [2], like `state.p_settings.jd_delta`
+
+            # calculate junction angle
+            JD_cos_theta = _row_dots(-vel_0_vec, vel_1_vec) / (norm_0 * norm_1)
+            JD_sin_theta_half = np.where(JD_cos_theta < 1, np.sqrt((1 - JD_cos_theta) / 2), 0)
+
+            # calculate scalar junction velocity
+            JD_Radius = JD_delta * JD_sin_theta_half / (1 - JD_sin_theta_half)
+            JD_velocity_scalar = np.sqrt(p_acc * JD_Radius)
+
+        junction_vel = np.where(
+            JD_sin_theta_half < np.sin(JD_maxAngle * np.pi / (2 * 180)),
+            np.where(  # larger than min angle --> junction deviation, else stop completely
+                JD_sin_theta_half > np.sin(JD_minAngle * np.pi / (2 * 180)),
+                np.where(JD_velocity_scalar < speed, JD_velocity_scalar, speed),
+                0.0,
+            ),
+            speed,  # angle larger than max angle, full speed pass
+        )
+        return np.where((jerk == 0) | (norm_0 == 0) | (norm_1 == 0), 0.0, junction_vel)
+
 
 # class junction_handling_klipper(junction_handling):
 
@@ -549,6 +738,86 @@ class junction_deviation(junction_handling):
 #         return self.junction_vel
 
 
+def _batch_connect(positions_A: np.ndarray, positions_B: np.ndarray, speeds_B: np.ndarray) -> np.ndarray:
+    """Connect pairs of positions and generate the velocities of the moves, like `connect_state`.
+
+    Args:
+        positions_A: (np.ndarray) (n, 4) start positions
+        positions_B: (np.ndarray) (n, 4) end positions
+        speeds_B: (np.ndarray) (n,) nominal speed at the end positions
+
+    Returns:
+        target_vel: (np.ndarray) (n, 4) target velocities of the moves
+    """
+    travel_direction = positions_B - positions_A
+    t_distance = _row_norms(travel_direction[:, :3])
+    e_len = np.abs(travel_direction[:, 3])
+    travel = t_distance > 0  # regular travel mixed move
+    extrusion = ~travel & (e_len > 0)  # for extrusion only move
+    travel_direction[travel] /= t_distance[travel, None]
+    travel_direction[extrusion] /= e_len[extrusion, None]
+    travel_direction[~travel & ~extrusion] = 0  # no move at all
+    return speeds_B[:, None] * travel_direction
+
+
+def batch_target_velocities(positions: np.ndarray, speeds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate the target velocities of all moves of a linked state chain at once, like `connect_state`.
+
+    Args:
+        positions: (np.ndarray) (n, 4) positions of the states
+        speeds: (np.ndarray) (n,) nominal speed of the states
+
+    Returns:
+        target_vel: (np.ndarray) (n, 4) target velocity of the move into every state, zero for the first state
+        vel_next: (np.ndarray) (n, 4) target velocity of the next move out of every state, like `_calc_vel_next`
+    """
+    n = len(positions)
+    target_vel = np.zeros((n, 4))
+    vel_next = np.zeros((n, 4))
+    if n < 2:
+        return target_vel, vel_next
+
+    # the next move leads to the first following state at a different position, or to the last state
+    changed = np.flatnonzero((positions[1:] != positions[:-1]).any(axis=1)) + 1
+    next_index = np.append(changed, n - 1)[np.searchsorted(changed, np.arange(n), side="right")]
+
+    target_vel[1:] = _batch_connect(positions[:-1], positions[1:], speeds[1:])
+    vel_next[:] = _batch_connect(positions, positions[next_index], speeds[next_index])
+
+    return target_vel, vel_next
+
+
+def batch_junction_velocities(
+    states: Union[List[state], StateTable], firmware: str = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate target and junction velocities of all planner blocks in one pass per firmware.
+
+    The results are identical to creating a junction handler for every state, see `get_handler`.
+
+    Args:
+        states: (list[state] | StateTable) linked states or state table in order, the first state has no previous
+            state
+        firmware: (string, default = None) select firmware by name
+
+    Returns:
+        target_vel: (np.ndarray) (n, 4) target velocity of the planner block ending in every state
+        junction_vel: (np.ndarray) (n,) junction velocity at the end of every planner block
+    """
+    handler = get_handler(firmware_name=firmware)
+    table = states if isinstance(states, StateTable) else StateTable.from_states(states)
+    speeds = table.get_settings_column("speed")
+
+    target_vel, vel_next = batch_target_velocities(positions=table.position, speeds=speeds)
+    junction_vel = handler.batch_junction_vel(
+        vel_0=target_vel,
+        vel_1=vel_next,
+        jerk=table.get_settings_column("jerk"),
+        p_acc=table.get_settings_column("p_acc"),
+        speed=speeds,
+    )
+    return target_vel, junction_vel
+
+
 def get_handler(firmware_name: str) -> type[junction_handling]:
     """Get the junction handling class for the given firmware name.
 
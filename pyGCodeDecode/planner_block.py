@@ -1,20 +1,499 @@
 """Planner block Module."""
 
-from typing import List, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 
 from pyGCodeDecode.helpers import custom_print
 from pyGCodeDecode.result import abstract_result, acceleration_result, velocity_result
 
-from .junction_handling import get_handler
-from .state import state
-from .utils import segment, velocity
+from .junction_handling import batch_target_velocities, get_handler
+from .state import StateTable, state
+from .utils import SegmentTable, _isclose, _row_norms, segment, velocity
+
+
+def _block_distance(state_A: state, state_B: state) -> Tuple[float, bool]:
+    """Return the distance of a move, which is the extrusion length for extrusion only moves.
+
+    Args:
+        state_A: (state) start state
+        state_B: (state) end state
+
+    Returns:
+        distance: (float) travel distance or extrusion length
+        extrusion_only: (bool) True if the move does not travel
+    """
+    if state_A is None:
+        return 0, False
+    distance = state_B.state_position.get_t_distance(other=state_A.state_position)
+    if distance == 0:  # no travel, extrusion possible
+        return state_B.state_position.get_t_distance(other=state_A.state_position, withExtrusion=True), True
+    return distance, False
+
+
+def _as_state_table(states: Union[List[state], StateTable]) -> Tuple[StateTable, np.ndarray]:
+    """Return the states as state table and the position before every state.
+
+    The position before the first state is its own, unless a list of states continues a linked previous state,
+    e.g. a window of the states which is planned again.
+
+    Args:
+        states: (list[state] | StateTable) linked states or state table in order
+
+    Returns:
+        table: (StateTable) the states as columns
+        prev_positions: (np.ndarray) (n, 4) position before every state
+    """
+    if isinstance(states, StateTable):
+        table, first_prev_state = states, None
+    else:
+        table = StateTable.from_states(states)
+        first_prev_state = states[0].prev_state if len(states) > 0 else None
+    prev_positions = np.concatenate((table.position[:1], table.position[:-1]))
+    if first_prev_state is not None:
+        prev_positions[0] = np.array(first_prev_state.state_position.get_vec(withExtrusion=True), dtype=float)
+    return table, prev_positions
+
+
+def lookahead_junction_velocities(
+    states: Union[List[state], StateTable], target_vels: np.ndarray, junction_vels: np.ndarray
+) -> np.ndarray:
+    """Limit the junction velocities to velocities reachable with the acceleration, like a firmware lookahead planner.
+
+    A backward pass caps every junction by the velocity, from which the following blocks can still decelerate to
+    their exit velocities. A forward pass caps it by the velocity reachable from the previous junction. Planner blocks
+    ending with these velocities are consistent with their neighbors, so each profile is calculated once and no
+    self correction is needed. The passes take linear time without recursion.
+
+    Args:
+        states: (list[state] | StateTable) linked states or state table in order
+        target_vels: (np.ndarray) (n, 4) target velocity of the planner block ending in every state
+        junction_vels: (np.ndarray) (n,) junction velocity at the end of every planner block
+
+    Returns:
+        junction_vels: (np.ndarray) (n,) reachable junction velocities, see `batch_junction_velocities`
+    """
+    table, prev_positions = _as_state_table(states)
+
+    # planner blocks with segments: moves and dwells, which stop the machine
+    moving = target_vels.any(axis=1)
+    dwell = ~np.isnan(table.pause)
+    blocks = np.flatnonzero(moving | dwell)
+
+    # 2 * acceleration * distance of every block, the travel velocity of extrusion only blocks starts and ends at zero,
+    # see `_block_distance`
+    positions, prev_positions = table.position[blocks], prev_positions[blocks]
+    travel = _row_norms(positions[:, :3] - prev_positions[:, :3])
+    extrusion_only = travel == 0
+    distance = np.where(extrusion_only, _row_norms(positions - prev_positions), travel)
+    stopping = ~moving[blocks] | dwell[blocks]
+    reach = np.where(stopping, 0.0, 2 * table.get_settings_column("p_acc")[blocks] * distance).tolist()
+    stops = stopping | extrusion_only
+
+    # maximum velocity at the end of every block, limited by the junction and the nominal speed of both blocks
+    speed = table.get_settings_column("speed")[blocks]
+    speed = np.minimum(speed, np.append(speed[1:], np.inf))
+    v_max = np.where(stops | np.append(stops[1:], False), 0.0, np.minimum(junction_vels[blocks], speed)).tolist()
+
+    # backward pass: decelerate to the exit velocity of the following block
+    for k in range(len(blocks) - 2, -1, -1):
+        v_max[k] = min(v_max[k], np.sqrt(reach[k + 1] + v_max[k + 1] * v_max[k + 1]))
+
+    # forward pass: accelerate from the exit velocity of the previous block
+    v_begin = 0.0
+    for k in range(len(blocks)):
+        v_max[k] = min(v_max[k], np.sqrt(v_begin * v_begin + reach[k]))
+        v_begin = v_max[k]
+
+    lookahead_vels = np.array(junction_vels, dtype=float)
+    lookahead_vels[blocks] = v_max
+    return lookahead_vels
+
+
+_BLOCK_TYPES = ("trapezoid", "triangle", "single", "single")  # profiles of `batch_block_profiles`
+_max_profile_passes = 100  # passes of the batch planners to settle the begin velocities of the blocks
+
+
+def batch_block_profiles(
+    distance: np.ndarray,
+    v_begin: np.ndarray,
+    v_end: np.ndarray,
+    v_target: np.ndarray,
+    acc: np.ndarray,
+    v_const: np.ndarray = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Select the velocity profile of many planner blocks at once, like `planner_block.move_maker`.
+
+    Every profile is described by three phases: ramp up, constant velocity and ramp down. Phases which are not
+    part of the selected profile have zero duration and length. The branches of `move_maker` are selected with
+    array masks in the same order and with the same floating point operations, so the results are identical.
+
+    Args:
+        distance: (np.ndarray) (n,) travel distance, or extrusion length for extrusion only blocks
+        v_begin: (np.ndarray) (n,) velocity at the end of the previous block, it is limited to v_target
+        v_end: (np.ndarray) (n,) velocity at the end of the block
+        v_target: (np.ndarray) (n,) nominal velocity
+        acc: (np.ndarray) (n,) acceleration
+        v_const: (np.ndarray, default = None) (n,) norm of the constant velocity vector, default v_target
+
+    Returns:
+        blocktype: (np.ndarray) (n,) index of the profile in `_BLOCK_TYPES`, -1 if the block could not be modeled
+        speeds: (np.ndarray) (n, 4) velocity at the begin, after ramp up, before ramp down and at the end
+        durations: (np.ndarray) (n, 3) duration of ramp up, constant velocity and ramp down
+        lengths: (np.ndarray) (n, 3) travel of ramp up, constant velocity and ramp down
+    """
+    distance, v_end, v_target, acc = (np.asarray(arr, dtype=float) for arr in (distance, v_end, v_target, acc))
+    v_begin = np.asarray(v_begin, dtype=float)
+    v_begin = np.where(v_begin < v_target, v_begin, v_target)
+    v_const = v_target if v_const is None else np.asarray(v_const, dtype=float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # candidate velocities of all profiles
+        travel_ramp_up = (v_target - v_begin) * (v_begin + v_target) / (2 * acc)
+        travel_ramp_down = (v_end - v_target) * (v_end + v_target) / (2 * -acc)
+        v_peak_tri = np.sqrt(acc * distance + v_begin * v_begin / 2 + v_end * v_end / 2)
+        v_end_sing_sqr = np.where(
+            v_begin > v_end, v_begin * v_begin - 2 * acc * distance, v_begin * v_begin + 2 * acc * distance
+        )
+        v_end_sing = np.where(v_end_sing_sqr >= 0, np.sqrt(np.maximum(v_end_sing_sqr, 0)), 0.0)
+        v_begin_sing = np.sqrt(2 * acc * distance + v_end * v_end)
+
+        # select the first matching profile
+        is_trapezoid = (
+            (travel_ramp_up + travel_ramp_down < distance)
+            & ((travel_ramp_up > 0) | np.isclose(travel_ramp_up, 0.0))
+            & ((travel_ramp_down > 0) | np.isclose(travel_ramp_down, 0.0))
+        )
+        is_triangle = (
+            (v_peak_tri > v_end) & (v_peak_tri > v_begin) & ((v_peak_tri < v_target) | np.isclose(v_peak_tri, v_target))
+        )
+        is_single_up = (v_end_sing > v_begin) & ((v_end_sing < v_target) | np.isclose(v_end_sing, v_target))
+        is_single_down = v_end_sing < v_begin
+        conditions = [is_trapezoid, is_triangle, is_single_up, is_single_down]
+        blocktype = np.select(conditions, [0, 1, 2, 3], default=-1)
+
+        # velocities at the phase boundaries
+        v_peak = np.select(conditions, [v_target, v_peak_tri, v_end_sing, v_begin_sing], default=0.0)
+        speeds = np.stack(
+            [
+                np.where(blocktype == 3, v_begin_sing, v_begin),
+                v_peak,
+                v_peak,
+                np.select(conditions, [v_end, v_end, v_end_sing, v_end], default=0.0),
+            ],
+            axis=1,
+        )
+
+        # ramps from and to the peak velocity, constant velocity only for trapezoids
+        travel_const = np.where(blocktype == 0, distance - travel_ramp_down - travel_ramp_up, 0.0)
+        durations = np.stack(
+            [
+                (speeds[:, 1] - speeds[:, 0]) / acc,
+                np.where(blocktype == 0, travel_const / v_const, 0.0),
+                (speeds[:, 2] - speeds[:, 3]) / acc,
+            ],
+            axis=1,
+        )
+        lengths = np.stack(
+            [
+                (speeds[:, 1] - speeds[:, 0]) * (speeds[:, 0] + speeds[:, 1]) / (2 * acc),
+                travel_const,
+                (speeds[:, 2] - speeds[:, 3]) * (speeds[:, 3] + speeds[:, 2]) / (2 * acc),
+            ],
+            axis=1,
+        )
+    return blocktype, speeds, durations, lengths
+
+
+def batch_planner_segments(
+    states: Union[List[state], StateTable],
+    target_vels: np.ndarray,
+    junction_vels: np.ndarray,
+    prev_segment: segment = None,
+) -> Tuple[SegmentTable, np.ndarray, List[str]]:
+    """Create the segments of all planner blocks at once, filling a segment table directly.
+
+    The junction velocities have to be reachable, see `lookahead_junction_velocities`, so that every block can be
+    calculated without correcting its neighbors. The profiles are selected with `batch_block_profiles`. Times and
+    positions are accumulated along the whole trajectory in the same order as with `planner_block.move_maker`.
+    Segments without movement are dropped, blocks without segments are skipped.
+
+    Args:
+        states: (list[state] | StateTable) linked states or state table in order
+        target_vels: (np.ndarray) (n, 4) target velocity of the planner block ending in every state
+        junction_vels: (np.ndarray) (n,) reachable junction velocity at the end of every planner block
+        prev_segment: (segment, default = None) last segment before the states, the trajectory continues from its
+            end, e.g. when a window of a longer trajectory is planned again
+
+    Returns:
+        table: (SegmentTable) segments of all planner blocks, `block_id` counts the blocks with segments
+        block_states: (np.ndarray) index of the state ending each block of the table
+        blocktypes: (list[str]) type of each block of the table
+    """
+    table, prev_positions = _as_state_table(states)
+    n = len(table)
+    target_vels = np.asarray(target_vels, dtype=float).reshape(-1, 4)
+    junction_vels = np.asarray(junction_vels, dtype=float)
+    positions = table.position
+    v_target = table.get_settings_column("speed")
+    acc = table.get_settings_column("p_acc")
+    dwell = ~np.isnan(table.pause)
+    pauses = np.where(dwell, table.pause, 0.0)
+    valid = target_vels.any(axis=1) & ~dwell
+
+    # block distances and directions, see `_block_distance` and `velocity.get_norm_dir`
+    travel = _row_norms(positions[:, :3] - prev_positions[:, :3])
+    extrusion_only = travel == 0
+    distance = np.where(extrusion_only, _row_norms(positions - prev_positions), travel)
+    target_norms = _row_norms(target_vels[:, :3])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        direction = target_vels / np.where(target_norms > 0, target_norms, _row_norms(target_vels))[:, None]
+    direction[~valid] = 0.0
+    vel_const = direction * v_target[:, None]
+    v_const = np.where(extrusion_only, _row_norms(vel_const), _row_norms(vel_const[:, :3]))
+
+    # the begin velocity of a block is the end velocity of the last segment of the previous block, which depends on
+    # the segments kept in that block. Blocks with a changed begin velocity are profiled again until no begin velocity
+    # changes. The blocks before the first change are final, only the phases from there on are accumulated again.
+    blocks = valid | dwell
+    end_vels = direction * junction_vels[:, None]
+    start = prev_positions[np.argmax(blocks)] if n > 0 else np.zeros(4)
+    t_start, v_start = 0.0, 0.0
+    if prev_segment is not None:
+        start = np.asarray(prev_segment.pos_end.get_vec(withExtrusion=True), dtype=float)
+        t_start, v_start = float(prev_segment.t_end), prev_segment.vel_end.get_norm()
+    index = np.arange(n)
+    all_types = np.full(n, -1)
+    all_speeds = np.zeros((n, 4))
+    all_durations = np.zeros((n, 3))
+    all_durations[dwell, 0] = pauses[dwell]
+    all_lengths = np.zeros((n, 3))
+    pos_chain = np.empty((3 * n + 1, 4))
+    pos_chain[0] = start
+    keep = np.zeros((n, 3), dtype=bool)
+    rows, first = np.flatnonzero(valid), 0
+    v_begin = None
+    for _ in range(_max_profile_passes):
+        prev_block = np.maximum.accumulate(np.where(blocks, index, -1))
+        prev_block = np.concatenate(([-1], prev_block[:-1]))
+        new_v_begin = np.where(prev_block >= 0, _row_norms(end_vels[prev_block, :3]), v_start)
+        if v_begin is not None:
+            rows = np.flatnonzero(valid & (new_v_begin != v_begin))
+            if len(rows) == 0:
+                break
+            first = int(rows[0])
+        v_begin = new_v_begin
+
+        blocktype, speeds, durations, lengths = batch_block_profiles(
+            distance=distance[rows],
+            v_begin=v_begin[rows],
+            v_end=junction_vels[rows],
+            v_target=v_target[rows],
+            acc=acc[rows],
+            v_const=v_const[rows],
+        )
+        if np.any(blocktype < 0):
+            i = int(rows[np.argmax(blocktype < 0)])
+            raise NameError(
+                "Segment could not be modeled: \n"
+                + str(table[i - 1] if i > 0 else None)
+                + "\n"
+                + str(table[i])
+                + f"\nv-begin {min(v_begin[i], v_target[i])} / v-target {v_target[i]} / v-end {junction_vels[i]} "
+            )
+        all_types[rows] = blocktype
+        all_speeds[rows] = speeds
+        all_durations[rows] = durations
+        all_lengths[rows] = lengths
+
+        # accumulate the positions of all phases, phases without movement are dropped
+        increments = direction[first:, None, :] * all_lengths[first:, :, None]
+        first_phase = 3 * first
+        chain = pos_chain[first_phase:]
+        chain[:] = np.cumsum(np.concatenate((chain[:1], increments.reshape(-1, 4))), axis=0)
+        keep[first:] = (chain[1:] != chain[:-1]).any(axis=1).reshape(-1, 3)
+        keep[first:, 0] |= dwell[first:]
+        blocks = keep.any(axis=1)
+        last_phase = np.where(blocks, 2 - np.argmax(keep[:, ::-1], axis=1), 0)
+        end_vels = direction * all_speeds[index, last_phase + 1][:, None]
+    else:
+        raise RuntimeError(
+            f"The begin velocities of the planner blocks did not settle within {_max_profile_passes} passes. "
+            "Simulate without lookahead instead."
+        )
+
+    # the next block begins at the end of the last kept phase, later phases do not count
+    all_durations[np.arange(3)[None, :] > last_phase[:, None]] = 0.0
+    all_durations[~blocks] = 0.0
+    t_chain = np.cumsum(np.concatenate(([t_start], all_durations.reshape(-1))))
+
+    rows = np.flatnonzero(keep.reshape(-1))
+    block_of_row, phase_of_row = np.divmod(rows, 3)
+    vel_rows = direction[block_of_row]
+    table = SegmentTable(
+        t_begin=t_chain[rows],
+        t_end=t_chain[rows + 1],
+        pos_begin=pos_chain[rows],
+        pos_end=pos_chain[rows + 1],
+        vel_begin=vel_rows * all_speeds[block_of_row, phase_of_row][:, None],
+        vel_end=vel_rows * all_speeds[block_of_row, phase_of_row + 1][:, None],
+        block_id=(np.cumsum(blocks) - 1)[block_of_row],
+    )
+    block_states = np.flatnonzero(blocks)
+    blocktypes = [_BLOCK_TYPES[blocktype] if blocktype >= 0 else None for blocktype in all_types[block_states]]
+    return table, block_states, blocktypes
+
+
+def batch_print_times(
+    states: Union[List[state], StateTable], firmware: str, parameter: str, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the print time for many values of the acceleration or the jerk at once, without creating segments.
+
+    Every state is planned with each value instead of its own setting, which includes settings of the G-code like
+    M204. The junction velocities of the firmware, the passes of `lookahead_junction_velocities` and the profiles of
+    `batch_block_profiles` are calculated on (n, K) arrays of the n states and K values. The times equal simulations
+    with `lookahead` up to rounding, apart from segments too short to change the position, which are not dropped.
+
+    Args:
+        states: (list[state] | StateTable) linked states or state table in order
+        firmware: (string) select firmware by name
+        parameter: (string) "p_acc" or "jerk"
+        values: (np.ndarray) (K,) values of the parameter
+
+    Returns:
+        print_times: (np.ndarray) (K,) print time for every value
+        layers: (np.ndarray) (m,) layer of the states, 0 without layer cue
+        layer_times: (np.ndarray) (m, K) time spent in every layer for every value
+    """
+    if parameter not in ("p_acc", "jerk"):
+        raise ValueError(f"Unknown parameter '{parameter}', available parameters are 'p_acc' and 'jerk'.")
+    values = np.asarray(values, dtype=float).reshape(-1)
+    table, prev_positions = _as_state_table(states)
+    n, n_values = len(table), len(values)
+    positions = table.position
+    v_target = table.get_settings_column("speed")
+    acc = table.get_settings_column("p_acc")[:, None].repeat(n_values, axis=1)
+    jerk = table.get_settings_column("jerk")[:, None].repeat(n_values, axis=1)
+    (acc if parameter == "p_acc" else jerk)[:] = values
+    dwell = ~np.isnan(table.pause)
+    pauses = np.where(dwell, table.pause, 0.0)
+    layers = np.maximum(table.layer, 0).astype(int)
+
+    # junction velocities for every value, see `batch_junction_velocities`
+    target_vels, vel_next = batch_target_velocities(positions=positions, speeds=v_target)
+    junction_vels = (
+        get_handler(firmware_name=firmware)
+        .batch_junction_vel(
+            vel_0=target_vels.repeat(n_values, axis=0),
+            vel_1=vel_next.repeat(n_values, axis=0),
+            jerk=jerk.reshape(-1),
+            p_acc=acc.reshape(-1),
+            speed=v_target.repeat(n_values),
+        )
+        .reshape(n, n_values)
+    )
+
+    # block distances and directions, see `batch_planner_segments`
+    moving = target_vels.any(axis=1)
+    valid = moving & ~dwell
+    travel = _row_norms(positions[:, :3] - prev_positions[:, :3])
+    extrusion_only = travel == 0
+    distance = np.where(extrusion_only, _row_norms(positions - prev_positions), travel)
+    target_norms = _row_norms(target_vels[:, :3])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        direction = target_vels / np.where(target_norms > 0, target_norms, _row_norms(target_vels))[:, None]
+    direction[~valid] = 0.0
+    vel_const = direction * v_target[:, None]
+    v_const = np.where(extrusion_only, _row_norms(vel_const), _row_norms(vel_const[:, :3]))
+
+    # lookahead passes over the blocks, every step for all values, see `lookahead_junction_velocities`
+    blocks = np.flatnonzero(moving | dwell)
+    stops = (extrusion_only | dwell)[blocks]
+    reach = np.where(dwell[blocks, None], 0.0, 2 * acc[blocks] * distance[blocks, None])
+    speed = np.minimum(v_target[blocks], np.append(v_target[blocks][1:], np.inf))
+    v_max = np.where(
+        (stops | np.append(stops[1:], False))[:, None], 0.0, np.minimum(junction_vels[blocks], speed[:, None])
+    )
+    for k in range(len(blocks) - 2, -1, -1):
+        v_max[k] = np.minimum(v_max[k], np.sqrt(reach[k + 1] + v_max[k + 1] * v_max[k + 1]))
+    v_begin = np.zeros(n_values)
+    for k in range(len(blocks)):
+        v_max[k] = np.minimum(v_max[k], np.sqrt(v_begin * v_begin + reach[k]))
+        v_begin = v_max[k]
+    junction_vels[blocks] = v_max
+
+    # profiles of all blocks for all values, the begin velocity is the end velocity of the previous block. Only the
+    # blocks and values with a changed begin velocity are profiled again, until no begin velocity changes.
+    prev_block = np.concatenate(([-1], np.maximum.accumulate(np.where(moving | dwell, np.arange(n), -1))[:-1]))
+    end_speeds = np.where(valid[:, None], junction_vels, 0.0)
+    all_durations = np.zeros((n, 3, n_values))
+    all_durations[dwell, 0] = pauses[dwell, None]
+    rows, columns = np.flatnonzero(valid).repeat(n_values), np.tile(np.arange(n_values), np.count_nonzero(valid))
+    v_begin = None
+    for _ in range(_max_profile_passes):
+        end_vels = direction[prev_block, None, :3] * end_speeds[prev_block, :, None]
+        new_v_begin = np.where(
+            (prev_block >= 0)[:, None], _row_norms(end_vels.reshape(-1, 3)).reshape(n, n_values), 0.0
+        )
+        if v_begin is not None:
+            rows, columns = np.nonzero(valid[:, None] & (new_v_begin != v_begin))
+            if len(rows) == 0:
+                break
+        v_begin = new_v_begin
+
+        blocktype, speeds, durations, _ = batch_block_profiles(
+            distance=distance[rows],
+            v_begin=v_begin[rows, columns],
+            v_end=junction_vels[rows, columns],
+            v_target=v_target[rows],
+            acc=acc[rows, columns],
+            v_const=v_const[rows],
+        )
+        if np.any(blocktype < 0):
+            i, k = int(rows[np.argmax(blocktype < 0)]), int(columns[np.argmax(blocktype < 0)])
+            raise NameError(
+                "Segment could not be modeled: \n"
+                + str(table[i - 1] if i > 0 else None)
+                + "\n"
+                + str(table[i])
+                + f"\nwith {parameter} {values[k]}"
+            )
+        end_speeds[rows, columns] = speeds[:, 3]
+        all_durations[rows, :, columns] = durations
+    else:
+        raise RuntimeError(
+            f"The begin velocities of the planner blocks did not settle within {_max_profile_passes} passes."
+        )
+
+    # accumulate the phase durations in the order of the segments
+    t_chain = np.cumsum(np.concatenate((np.zeros((1, n_values)), all_durations.reshape(-1, n_values))), axis=0)
+
+    layer_values, layer_index = np.unique(layers, return_inverse=True)
+    layer_times = np.zeros((len(layer_values), n_values))
+    np.add.at(layer_times, layer_index.reshape(-1), t_chain[3::3] - t_chain[:-1:3])
+    return t_chain[-1], layer_values, layer_times
 
 
 class planner_block:
     """Planner Block Class."""
 
+    __slots__ = (
+        "state_A",
+        "state_B",
+        "_prev_block",
+        "_next_block",
+        "is_extruding",
+        "t_begin",
+        "_segments",
+        "_t_segments",
+        "blocktype",
+        "e_type",
+        "target_vel",
+        "direction",
+        "valid",
+        "JD",
+    )
+
     result_calculators: List[abstract_result] = [
         acceleration_result(),
         velocity_result(),
@@ -40,7 +519,7 @@ class planner_block:
                 t_begin=t0, t_end=t1, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_A)
+                segments.append(segment_A)
             # B --
             travel_const = distance - travel_ramp_down - travel_ramp_up
             v_const = vel_const.get_norm(withExtrusion=extrusion_only)  # abs of vel const
@@ -53,7 +532,7 @@ class planner_block:
                 t_begin=t1, t_end=t2, pos_begin=pos_begin, vel_begin=vel_begin, pos_end=pos_end, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_B)
+                segments.append(segment_B)
             # C \
             t2 = segment_B.t_end
             t3 = t2 + (v_target - v_end) / acc
@@ -65,7 +544,7 @@ class planner_block:
                 t_begin=t2, t_end=t3, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_C)
+                segments.append(segment_C)
 
             self.blocktype = "trapezoid"
 
@@ -82,7 +561,7 @@ class planner_block:
                 t_begin=t0, t_end=t1, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_A)
+                segments.append(segment_A)
             # C \
             t2 = segment_A.t_end
             t3 = t2 + (v_peak_tri - v_end) / acc
@@ -95,7 +574,7 @@ class planner_block:
                 t_begin=t2, t_end=t3, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_C)
+                segments.append(segment_C)
 
             self.blocktype = "triangle"
 
@@ -112,7 +591,7 @@ class planner_block:
                 t_begin=t0, t_end=t1, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_A)
+                segments.append(segment_A)
 
             self.blocktype = "single"
 
@@ -129,21 +608,12 @@ class planner_block:
                 t_begin=t0, t_end=t1, pos_begin=pos_begin, pos_end=pos_end, vel_begin=vel_begin, vel_end=vel_end
             )
             if pos_end.is_travel(pos_begin) or pos_end.is_extruding(pos_begin, ignore_retract=False):
-                self.segments.append(segment_C)
+                segments.append(segment_C)
 
             self.blocktype = "single"
 
-        extrusion_only = False  # flag
-        self.segments = []  # clear segments
-        if self.state_A is not None:
-            distance = self.state_B.state_position.get_t_distance(other=self.state_A.state_position)
-            if distance == 0:  # no travel, extrusion possible
-                distance = self.state_B.state_position.get_t_distance(
-                    other=self.state_A.state_position, withExtrusion=True
-                )
-                extrusion_only = True
-        else:
-            distance = 0
+        segments = []  # new segments
+        distance, extrusion_only = _block_distance(state_A=self.state_A, state_B=self.state_B)
         previous_segment = (
             self.prev_block.get_segments()[-1]
             if self.prev_block is not None
@@ -174,17 +644,17 @@ class planner_block:
         try:
             if (
                 (travel_ramp_up + travel_ramp_down) < distance
-                and (travel_ramp_up > 0 or np.isclose(travel_ramp_up, 0.0))
-                and (travel_ramp_down > 0 or np.isclose(travel_ramp_down, 0.0))
+                and (travel_ramp_up > 0 or _isclose(travel_ramp_up, 0.0))
+                and (travel_ramp_down > 0 or _isclose(travel_ramp_down, 0.0))
             ):
                 trapezoid(extrusion_only=extrusion_only)
             elif (
                 v_peak_tri > v_end
                 and v_peak_tri > v_begin
-                and (v_peak_tri < v_target or np.isclose(v_peak_tri, v_target))
+                and (v_peak_tri < v_target or _isclose(v_peak_tri, v_target))
             ):
                 triang(extrusion_only=extrusion_only)
-            elif v_end_sing > v_begin and (v_end_sing < v_target or np.isclose(v_end_sing, v_target)):
+            elif v_end_sing > v_begin and (v_end_sing < v_target or _isclose(v_end_sing, v_target)):
                 singl_up()
             elif v_end_sing < v_begin:
                 singl_dwn()
@@ -201,6 +671,8 @@ class planner_block:
             custom_print(f"Segments to state: {str(self.state_B)} could not be modeled.\n {ve}", lvl=1)
             raise RuntimeError()
 
+        self.segments = segments
+
     def self_correction(self, tolerance=float("1e-12")):
         """Check for interfacing vel and self correct."""
         flag_correct = False
@@ -222,11 +694,6 @@ class planner_block:
             if self.blocktype == "single":
                 self.prev_block.self_correction()  # forward correction?
 
-        # Timeshift the corrected blocks
-        if self.next_block is not None:
-            delta_t = self.get_segments()[-1].t_end - self.next_block.get_segments()[0].t_begin
-            self.next_block.timeshift(delta_t=delta_t)
-
         # Check continuity in Position
         if self.next_block is not None:
             same_position = self.get_segments()[-1].pos_end == self.next_block.get_segments()[0].pos_begin
@@ -247,15 +714,50 @@ class planner_block:
 
         return flag_correct
 
-    def timeshift(self, delta_t: float):
-        """Shift planner block in time.
+    def timeshift(self, delta_t: float, segments_shifted: bool = False):
+        """Shift planner block in time. The segments are shifted when they are accessed next, see `segments`.
 
         Args:
             delta_t: (float) time to be shifted
+            segments_shifted: (bool, default = False) the segments were shifted already,
+                e.g. together with all following rows of a segment table
         """
-        if len(self.segments) > 0:
-            for segm in self.segments:
+        self.t_begin += delta_t
+        if segments_shifted:
+            self._t_segments += delta_t
+
+    @property
+    def duration(self) -> float:
+        """Return the duration of the planner block, which does not depend on its position in time."""
+        if len(self._segments) == 0:
+            return 0.0
+        return float(self._segments[-1].t_end - self._segments[0].t_begin)
+
+    @property
+    def segments(self) -> List[segment]:
+        """Return the segments, shifted to the current begin time of the block."""
+        if self.t_begin != self._t_segments:
+            delta_t = self.t_begin - self._t_segments
+            for segm in self._segments:
                 segm.move_segment_time(delta_t)
+            self._t_segments = self.t_begin
+        return self._segments
+
+    @segments.setter
+    def segments(self, segments: List[segment]):
+        """Set the segments, the block begins with the first segment."""
+        self._segments = segments
+        self.t_begin = self._t_segments = float(segments[0].t_begin) if len(segments) > 0 else self.t_begin
+
+    def use_segment_table(self, table: SegmentTable, block_id: int):
+        """Replace the segments by views of their rows in a segment table, see `gcode_interpreter.tabulate_blocklist`.
+
+        Args:
+            table: (SegmentTable) table containing the current segments of the block
+            block_id: (int) index of the block in the table
+        """
+        self._segments = table.get_segments(block_id=block_id)
+        self._t_segments = self.t_begin
 
     def extrusion_block_max_vel(self) -> Union[np.ndarray, None]:
         """Return max vel from planner block while extruding.
@@ -290,13 +792,27 @@ class planner_block:
                 if calculator not in self.result_calculators:
                     calculator.calc_pblock(self)
 
-    def __init__(self, state: state, prev_block: "planner_block", firmware=None):
+    def __init__(
+        self,
+        state: state,
+        prev_block: "planner_block",
+        firmware=None,
+        target_vel: velocity = None,
+        junction_vel: float = None,
+        segment_table: SegmentTable = None,
+        block_id: int = None,
+    ):
         """Calculate and store planner block consisting of one or multiple segments.
 
         Args:
             state: (state) the current state
             prev_block: (planner_block) previous planner block
             firmware: (string, default = None) firmware selection for junction
+            target_vel: (velocity, default = None) precalculated target velocity, see `batch_junction_velocities`
+            junction_vel: (float, default = None) precalculated junction velocity, used together with target_vel
+            segment_table: (SegmentTable, default = None) table with the precalculated segments of the block,
+                see `batch_planner_segments`
+            block_id: (int, default = None) index of the block in the segment table
         """
         # neighbor list
         self.state_A = state.prev_state  # from state A
@@ -305,26 +821,31 @@ class planner_block:
         self.next_block = None  # nb list next
         self.is_extruding = False  # default Value
 
+        self.t_begin = 0.0  # global begin time, segment times are derived from it, see `segments`
         self.segments: List[segment] = []  # store segments here
         self.blocktype = None
         self.e_type = None  # use for extrusion type e.g. perimeter, infill ...
 
-        handler = get_handler(firmware_name=firmware)  # get junction handler
-        junction = handler(state_A=self.state_A, state_B=self.state_B)
+        if target_vel is None or junction_vel is None:
+            handler = get_handler(firmware_name=firmware)  # get junction handler
+            junction = handler(state_A=self.state_A, state_B=self.state_B)
+            target_vel = junction.get_target_vel()
+            junction_vel = junction.get_junction_vel()
 
         # planner block calculation
-        self.target_vel = junction.get_target_vel()  # target velocity for this planner block
+        self.target_vel = target_vel  # target velocity for this planner block
 
-        v_JD = junction.get_junction_vel()
+        v_JD = junction_vel
 
         self.direction = self.target_vel.get_norm_dir(withExtrusion=True)  # direction vector of pb
 
         self.valid = self.target_vel.not_zero()  # valid planner block
 
-        # standard move maker
+        # standard move maker, unless the segments were calculated beforehand
         if self.valid:
             self.JD = v_JD * self.direction  # jd writeout for debugging plot
-            self.move_maker(v_end=v_JD)
+            if segment_table is None:
+                self.move_maker(v_end=v_JD)
             self.is_extruding = self.state_A.state_position.is_extruding(
                 self.state_B.state_position
             )  # store extrusion flag
@@ -332,6 +853,9 @@ class planner_block:
         # dwell functionality
         if self.state_B.pause is not None:
             self.JD = [0, 0, 0, 0]
+        if segment_table is not None:
+            self.segments = segment_table.get_segments(block_id=block_id)
+        elif self.state_B.pause is not None:
             self.segments = [
                 segment(
                     t_begin=self.prev_block.segments[-1].t_end,
@@ -434,21 +958,11 @@ class planner_block:
         Returns:
             time_global: (float) global time when the point will be reached.
         """
-        # block_length = sum(segm.get_segm_len() for segm in self.segments)
-
         cum_dist = 0
-        # last_cum_dist = 0
         for segm in self.segments:
-            cum_dist += segm.get_segm_len()  # len with current segment
-            # last_cum_dist = len, without curr segm; dist_local >= last_cum_dist and ; last_cum_dist = cum_dist
-            if dist_local <= cum_dist:
-                segm_local_dist = segm.get_segm_len() - (cum_dist - dist_local)
-
-                time_of_isect = segm._interpolate_time_to_space(
-                    scalar_begin=segm.t_begin,
-                    scalar_end=segm.t_end,
-                    x=segm_local_dist,
-                )  # interpolate time over space
-                return time_of_isect
+            segm_len = segm.get_segm_len()
+            if dist_local <= cum_dist + segm_len:
+                return segm.get_time_by_dist(dist=dist_local - cum_dist)
+            cum_dist += segm_len
 
         raise ValueError(f"This Planner Block with length {cum_dist} is not defined for dist: {dist_local}.")
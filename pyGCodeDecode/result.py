@@ -1,12 +1,14 @@
 """Result calculation for segments and planner blocks."""
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
+
+import numpy as np
 
 if TYPE_CHECKING:
     from pyGCodeDecode.planner_block import planner_block
 
-from pyGCodeDecode.utils import segment
+from pyGCodeDecode.utils import SegmentTable, _row_norms, segment
 
 
 # new segment class spanned by pos, rest is "result"
@@ -29,6 +31,19 @@ class abstract_result(ABC):
         """Calculate the result for a segment."""
         pass
 
+    def calc_table(self, table: SegmentTable, blocklist: List["planner_block"], **kwargs):
+        """Calculate the result for all segments of a segment table, stored as result column.
+
+        The default calculates every planner block, whose segments are views of the table rows.
+        Results, which only depend on the segment, can override this with a vectorized calculation.
+
+        Args:
+            table: (SegmentTable) segments of all planner blocks
+            blocklist: (list[planner_block]) the planner blocks using the table
+        """
+        for pblock in blocklist:
+            self.calc_pblock(pblock, **kwargs)
+
 
 class acceleration_result(abstract_result):
     """The acceleration."""
@@ -51,6 +66,14 @@ class acceleration_result(abstract_result):
         for segm in pblock.segments:
             self.calc_segm(segm, **kwargs)
 
+    def calc_table(self, table: SegmentTable, blocklist: List["planner_block"], **kwargs):
+        """Calculate the acceleration for all segments at once."""
+        delta_v = _row_norms(table.vel_end[:, :3]) - _row_norms(table.vel_begin[:, :3])
+        delta_t = table.get_durations()
+        acc = np.zeros(len(table))
+        np.divide(delta_v, delta_t, out=acc, where=delta_t > 0)
+        table.set_result(name=self.name, index=slice(None), value=acc)
+
 
 class velocity_result(abstract_result):
     """The velocity."""
@@ -69,6 +92,11 @@ class velocity_result(abstract_result):
         for segm in pblock.segments:
             self.calc_segm(segm, **kwargs)
 
+    def calc_table(self, table: SegmentTable, blocklist: List["planner_block"], **kwargs):
+        """Calculate the velocity for all segments at once."""
+        velocities = np.column_stack((_row_norms(table.vel_begin[:, :3]), _row_norms(table.vel_end[:, :3])))
+        table.set_result(name=self.name, index=slice(None), value=velocities)
+
 
 def get_all_result_calculators():
     """Get all results."""
@@ -0,0 +1,335 @@
+"""Spatial index of the segments of a simulation for point, box and plane queries.
+
+Every segment is sampled with a spacing of at most one cell and registered in the cells of a uniform grid, only
+occupied cells are stored. The segments are also sorted by their lowest z in a z-interval index. The queries test
+only the candidate segments of the cells, vectorized, and return rows of the segment table together with the times
+at which the nozzle is at the queried location, see `SegmentTable.get_times_by_dist`.
+
+All coordinates and distances are in mm, like the segment table.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from .utils import SegmentTable
+
+
+class SpatialIndex:
+    """Uniform grid and z-interval index over the segments of a segment table."""
+
+    def __init__(self, table: SegmentTable, cell_size: float = None):
+        """Build the index of a segment table.
+
+        Args:
+            table: (SegmentTable) segments to index
+            cell_size: (float, default = None) edge length of the grid cells, the mean travel length of the moving
+                segments if None
+        """
+        self.table = table
+        self.points_begin = table.pos_begin[:, :3]
+        self.points_end = table.pos_end[:, :3]
+        self.lengths = table.get_lengths()
+        self.bbox_min = np.minimum(self.points_begin, self.points_end)
+        self.bbox_max = np.maximum(self.points_begin, self.points_end)
+
+        moving = self.lengths > 0
+        if cell_size is None:
+            cell_size = float(np.mean(self.lengths[moving])) if moving.any() else 1.0
+        if not cell_size > 0:
+            raise ValueError(f"The cell size has to be positive, got {cell_size}.")
+        self.cell_size = cell_size
+        if len(table) > 0:
+            self.origin = self.bbox_min.min(axis=0)
+            self.shape = np.floor((self.bbox_max.max(axis=0) - self.origin) / cell_size).astype(np.int64) + 1
+        else:
+            self.origin, self.shape = np.zeros(3), np.ones(3, dtype=np.int64)
+
+        # grid: every point of a segment is at most half a cell away from one of its samples
+        n_samples = np.ceil(self.lengths / cell_size).astype(np.int64) + 1
+        rows = np.repeat(np.arange(len(table)), n_samples)
+        first_sample = np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+        fraction = (np.arange(len(rows)) - first_sample) / np.repeat(np.maximum(n_samples - 1, 1), n_samples)
+        samples = self.points_begin[rows] + fraction[:, np.newaxis] * (self.points_end - self.points_begin)[rows]
+        keys = self._get_keys(self._get_cells(samples))
+        order = np.lexsort((rows, keys))
+        keys, rows = keys[order], rows[order]
+        unique = np.ones(len(keys), dtype=bool)
+        unique[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        self._cell_rows = rows[unique]  # rows of all cells, cell by cell
+        self._keys, cell_begin = np.unique(keys[unique], return_index=True)  # occupied cells, sorted
+        self._cell_offsets = np.append(cell_begin, len(self._cell_rows))
+
+        # z-interval index: segments sorted by their lowest z, segments higher than a cell are checked separately
+        tall = self.bbox_max[:, 2] - self.bbox_min[:, 2] > cell_size
+        self._tall_rows = np.flatnonzero(tall)
+        flat_rows = np.flatnonzero(~tall)
+        self._z_rows = flat_rows[np.argsort(self.bbox_min[flat_rows, 2], kind="stable")]
+        self._z_min = self.bbox_min[self._z_rows, 2]
+
+    def nearest(self, points: np.ndarray, chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the nearest segment of every point, the earliest one for equal distances.
+
+        The segments in the cells next to every point give an upper bound of the distance. Then all cells within
+        this distance are searched, for points far from the segments only the occupied cells within the distance.
+
+        Args:
+            points: (np.ndarray) (N, 3) query points x, y, z
+            chunk_size: (int, default = 4096) number of points searched at once
+
+        Returns:
+            rows: (np.ndarray) (N,) row of the nearest segment
+            distances: (np.ndarray) (N,) distance to the nearest segment
+            t: (np.ndarray) (N,) time at which the nozzle is closest to the point on the nearest segment
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(self.table) == 0:
+            raise ValueError("The spatial index contains no segments.")
+        rows = np.zeros(len(points), dtype=np.int64)
+        distances = np.full(len(points), np.inf)
+        fractions = np.zeros(len(points))
+        nearest = (rows, distances, fractions)
+        for start in range(0, len(points), chunk_size):
+            chunk = np.arange(start, min(start + chunk_size, len(points)))
+            cells = self._get_cells(points[chunk])
+            # the segments in the neighboring cells give an upper bound of the distance
+            self._update_nearest(points, chunk, *self._get_cube_rows(cells=cells, reach=1), *nearest)
+
+            # a closer segment has a sample within half a cell of its closest point, so in a cell within the reach
+            reach = np.floor(distances[chunk] / self.cell_size + 0.5) + 1  # infinite without neighboring segments
+            for cube_reach in np.unique(reach):
+                queries = reach == cube_reach
+                if np.prod(2 * np.minimum(cube_reach, self.shape - 1) + 1) < len(self._keys):
+                    cube_rows = self._get_cube_rows(cells=cells[queries], reach=int(cube_reach))
+                    self._update_nearest(points, chunk[queries], *cube_rows, *nearest)
+                else:  # the cube covers more cells than are occupied, filter the occupied cells
+                    self._update_nearest_far(points, chunk[queries], *nearest)
+        return rows, distances, self._get_times(rows=rows, fractions=fractions)
+
+    def in_box(self, box_min: np.ndarray, box_max: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the segments inside or crossing an axis aligned box with their entry and exit times.
+
+        Args:
+            box_min: (np.ndarray) (3,) lower corner x, y, z of the box
+            box_max: (np.ndarray) (3,) upper corner x, y, z of the box
+
+        Returns:
+            rows: (np.ndarray) (n,) rows of the segments touching the box, ascending
+            t_in: (np.ndarray) (n,) time at which every segment enters the box
+            t_out: (np.ndarray) (n,) time at which every segment leaves the box
+        """
+        box_min, box_max = np.asarray(box_min, dtype=np.float64), np.asarray(box_max, dtype=np.float64)
+        margin = self.cell_size / 2  # samples are at most half a cell away from the segment points in the box
+        rows = self._get_box_rows(box_min - margin, box_max + margin)
+
+        begin = self.points_begin[rows]
+        direction = self.points_end[rows] - begin
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction_a = (box_min - begin) / direction
+            fraction_b = (box_max - begin) / direction
+        # axes without direction keep the whole segment if the segment is within the limits of the axis
+        inside = (begin >= box_min) & (begin <= box_max)
+        fraction_lo = np.where(direction == 0, np.where(inside, 0.0, np.inf), np.minimum(fraction_a, fraction_b))
+        fraction_hi = np.where(direction == 0, np.where(inside, 1.0, -np.inf), np.maximum(fraction_a, fraction_b))
+        fraction_in = np.maximum(fraction_lo.max(axis=1), 0.0)
+        fraction_out = np.minimum(fraction_hi.min(axis=1), 1.0)
+        hit = fraction_in <= fraction_out
+        rows = rows[hit]
+        return rows, self._get_times(rows, fraction_in[hit]), self._get_times(rows, fraction_out[hit])
+
+    def crossing_plane(
+        self, origin: np.ndarray, normal: np.ndarray, tolerance: float = 1e-9
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the segments crossing or lying in a plane with their entry and exit times.
+
+        Planes normal to z, like the layer heights, use the z-interval index, other planes check all segments.
+        Segments crossing the plane enter and exit it at the same time, segments in the plane enter at their begin
+        and exit at their end.
+
+        Args:
+            origin: (np.ndarray) (3,) point x, y, z on the plane
+            normal: (np.ndarray) (3,) unit normal vector of the plane
+            tolerance: (float, default = 1e-9) distance up to which points are on the plane, for the rounding of
+                the planned positions
+
+        Returns:
+            rows: (np.ndarray) (n,) rows of the segments touching the plane, ascending
+            t_in: (np.ndarray) (n,) time at which every segment enters the plane
+            t_out: (np.ndarray) (n,) time at which every segment exits the plane
+        """
+        origin, normal = np.asarray(origin, dtype=np.float64), np.asarray(normal, dtype=np.float64)
+        if normal[0] == 0 and normal[1] == 0 and normal[2] != 0:
+            window = slice(
+                np.searchsorted(self._z_min, origin[2] - tolerance - self.cell_size, side="left"),
+                np.searchsorted(self._z_min, origin[2] + tolerance, side="right"),
+            )
+            rows = np.sort(np.concatenate((self._z_rows[window], self._tall_rows)))
+        else:
+            rows = np.arange(len(self.table))
+
+        dist_begin = (self.points_begin[rows] - origin) @ normal
+        dist_end = (self.points_end[rows] - origin) @ normal
+        dist_begin[np.abs(dist_begin) <= tolerance] = 0.0
+        dist_end[np.abs(dist_end) <= tolerance] = 0.0
+        hit = ((dist_begin <= 0) & (dist_end >= 0)) | ((dist_begin >= 0) & (dist_end <= 0))
+        rows, dist_begin, dist_end = rows[hit], dist_begin[hit], dist_end[hit]
+        in_plane = dist_begin == dist_end  # both zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(in_plane, 0.0, dist_begin / (dist_begin - dist_end))
+        return rows, self._get_times(rows, fraction), self._get_times(rows, np.where(in_plane, 1.0, fraction))
+
+    def _update_nearest(
+        self,
+        points: np.ndarray,
+        chunk: np.ndarray,
+        query_ids: np.ndarray,
+        candidates: np.ndarray,
+        rows: np.ndarray,
+        distances: np.ndarray,
+        fractions: np.ndarray,
+    ):
+        """Store the nearest candidate segment of every query point of a chunk, the earliest one for equal distances.
+
+        Args:
+            points: (np.ndarray) (N, 3) all query points
+            chunk: (np.ndarray) (n,) indices of the query points of the chunk
+            query_ids: (np.ndarray) (m,) point in the chunk of every candidate
+            candidates: (np.ndarray) (m,) candidate rows
+            rows: (np.ndarray) (N,) nearest row of every point, updated
+            distances: (np.ndarray) (N,) distance to the nearest row, updated
+            fractions: (np.ndarray) (N,) fraction of the closest point on the nearest row, updated
+        """
+        if len(candidates) == 0:
+            return
+        fraction, distance = self._point_distances(points[chunk][query_ids], candidates)
+        # the candidates are grouped by query, the nearest and then earliest candidate of every group
+        new_group = np.ones(len(query_ids), dtype=bool)
+        new_group[1:] = query_ids[1:] != query_ids[:-1]
+        group_begin = np.flatnonzero(new_group)
+        group = np.cumsum(new_group) - 1
+        is_nearest = distance == np.minimum.reduceat(distance, group_begin)[group]
+        nearest_row = np.minimum.reduceat(np.where(is_nearest, candidates, len(self.table)), group_begin)
+        best = np.flatnonzero(is_nearest & (candidates == nearest_row[group]))
+        best = best[np.unique(group[best], return_index=True)[1]]
+
+        found = chunk[query_ids[best]]
+        closer = (distance[best] < distances[found]) | (
+            (distance[best] == distances[found]) & (candidates[best] < rows[found])
+        )
+        found, best = found[closer], best[closer]
+        rows[found] = candidates[best]
+        distances[found] = distance[best]
+        fractions[found] = fraction[best]
+
+    def _update_nearest_far(
+        self, points: np.ndarray, chunk: np.ndarray, rows: np.ndarray, distances: np.ndarray, fractions: np.ndarray
+    ):
+        """Store the nearest segment of query points far from the segments, filtering the occupied cells.
+
+        The cell nearest to every point gives an upper bound of the distance, only the cells closer than this bound
+        are checked. The points of the segments are at most half a cell outside of their cells.
+
+        Args:
+            points: (np.ndarray) (N, 3) all query points
+            chunk: (np.ndarray) (n,) indices of the query points
+            rows: (np.ndarray) (N,) nearest row of every point, updated
+            distances: (np.ndarray) (N,) distance to the nearest row, updated
+            fractions: (np.ndarray) (N,) fraction of the closest point on the nearest row, updated
+        """
+        cell_min = self.origin + self._get_key_cells(self._keys) * self.cell_size - self.cell_size / 2
+        cell_max = cell_min + 2 * self.cell_size
+        step = max(1, (1 << 20) // len(self._keys))
+        for sub_start in range(0, len(chunk), step):
+            sub_chunk = chunk[sub_start:][:step]
+            sub_points = points[sub_chunk][:, np.newaxis]
+            lower_bound = np.linalg.norm(
+                np.maximum(np.maximum(cell_min - sub_points, sub_points - cell_max), 0.0), axis=2
+            )
+            query_ids = np.arange(len(sub_chunk))
+            nearest_cell = self._keys[np.argmin(lower_bound, axis=1)]
+            self._update_nearest(
+                points, sub_chunk, *self._get_cell_rows(query_ids, nearest_cell), rows, distances, fractions
+            )
+            query_ids, cells = np.nonzero(lower_bound <= distances[sub_chunk][:, np.newaxis])
+            cell_rows = self._get_cell_rows(query_ids, self._keys[cells])
+            self._update_nearest(points, sub_chunk, *cell_rows, rows, distances, fractions)
+
+    def _get_cells(self, points: np.ndarray) -> np.ndarray:
+        """Return the grid cell of every point, points outside of the grid get the nearest cell."""
+        return np.clip(np.floor((points - self.origin) / self.cell_size).astype(np.int64), 0, self.shape - 1)
+
+    def _get_key_cells(self, keys: np.ndarray) -> np.ndarray:
+        """Return the grid cell of every linear index, the inverse of `_get_keys`."""
+        rest, x = np.divmod(keys, self.shape[0])
+        z, y = np.divmod(rest, self.shape[1])
+        return np.stack((x, y, z), axis=-1)
+
+    def _get_cube_rows(self, cells: np.ndarray, reach: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows registered in the cubes of cells around cells, with the query of every row.
+
+        Args:
+            cells: (np.ndarray) (n, 3) center cell of every query
+            reach: (int) number of cells from the center to the sides of the cubes
+
+        Returns:
+            query_ids: (np.ndarray) (m,) query of every row, ascending
+            rows: (np.ndarray) (m,) rows of the cubes, a row may appear several times per query
+        """
+        axes = [np.arange(-axis_reach, axis_reach + 1) for axis_reach in np.minimum(reach, self.shape - 1)]
+        offsets = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(1, -1, 3)
+        cube_cells = np.clip(cells[:, np.newaxis] + offsets, 0, self.shape - 1).reshape(-1, 3)
+        return self._get_cell_rows(np.repeat(np.arange(len(cells)), offsets.shape[1]), self._get_keys(cube_cells))
+
+    def _get_keys(self, cells: np.ndarray) -> np.ndarray:
+        """Return the linear index of every grid cell."""
+        return (cells[:, 2] * self.shape[1] + cells[:, 1]) * self.shape[0] + cells[:, 0]
+
+    def _get_cell_rows(self, query_ids: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows registered in cells, with the query of every row.
+
+        Args:
+            query_ids: (np.ndarray) (n,) query of every cell
+            keys: (np.ndarray) (n,) linear index of the cells
+
+        Returns:
+            query_ids: (np.ndarray) (m,) query of every row
+            rows: (np.ndarray) (m,) rows of the cells, a row may appear several times per query
+        """
+        if len(self._keys) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        cells = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        occupied = self._keys[cells] == keys
+        query_ids, cells = query_ids[occupied], cells[occupied]
+        begin = self._cell_offsets[cells]
+        counts = self._cell_offsets[cells + 1] - begin
+        entries = np.repeat(begin - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        return np.repeat(query_ids, counts), self._cell_rows[entries]
+
+    def _get_box_rows(self, box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+        """Return the unique rows registered in the cells overlapping a box."""
+        if np.any(box_max < self.origin) or np.any(box_min > self.origin + self.shape * self.cell_size):
+            return np.zeros(0, dtype=np.int64)
+        cell_min, cell_max = self._get_cells(np.stack((box_min, box_max)))
+        if np.prod(cell_max - cell_min + 1) < len(self._keys):
+            axes = np.meshgrid(*[np.arange(lo, hi + 1) for lo, hi in zip(cell_min, cell_max)], indexing="ij")
+            keys = self._get_keys(np.stack(axes, axis=-1).reshape(-1, 3))
+        else:  # the box covers more cells than are occupied, select the occupied cells in the box
+            cells = self._get_key_cells(self._keys)
+            keys = self._keys[np.all((cells >= cell_min) & (cells <= cell_max), axis=1)]
+        return np.unique(self._get_cell_rows(np.zeros(len(keys), dtype=np.int64), keys)[1])
+
+    def _point_distances(self, points: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the fraction of the closest point on every segment and its distance to the point."""
+        begin = self.points_begin[rows]
+        direction = self.points_end[rows] - begin
+        squared_length = np.einsum("ij,ij->i", direction, direction)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip(np.einsum("ij,ij->i", points - begin, direction) / squared_length, 0.0, 1.0)
+        fraction[squared_length == 0] = 0.0
+        return fraction, np.linalg.norm(points - begin - fraction[:, np.newaxis] * direction, axis=1)
+
+    def _get_times(self, rows: np.ndarray, fractions: np.ndarray) -> np.ndarray:
+        """Return the times at fractions of the travel of segments, the begin and end time at the segment ends."""
+        t = self.table.get_times_by_dist(rows=rows, dist=fractions * self.lengths[rows])
+        t = np.where(fractions >= 1.0, self.table.t_end[rows], t)
+        return np.where(fractions <= 0.0, self.table.t_begin[rows], t)
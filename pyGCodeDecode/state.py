@@ -1,4 +1,11 @@
-"""State module with state."""
+"""State module with state and the columnar StateTable."""
+
+import functools
+import weakref
+from array import array
+from typing import Iterable, List
+
+import numpy as np
 
 from .utils import position
 
@@ -7,10 +14,43 @@ class state:
     """State contains a Position and Printing Settings (p_settings) to apply for the corresponding move to this State."""
 
     class p_settings:
-        """Store Printing Settings."""
+        """Store Printing Settings.
+
+        Printing settings are immutable and interned: creating settings with the same values returns the same shared
+        instance. This saves memory, since the settings only change on a few commands, and allows to cache values
+        derived from the settings, e.g. `jd_delta`, once per instance.
+        """
+
+        _interned = weakref.WeakValueDictionary()  # settings tuple -> shared instance
+
+        def __new__(cls, p_acc, jerk, vX, vY, vZ, vE, speed, units="SI (mm)"):
+            """Return the shared instance for these settings, create it if necessary."""
+            # the types are part of the key, so that e.g. settings with int values keep their own instance
+            values = (p_acc, jerk, vX, vY, vZ, vE, speed, units)
+            key = values + tuple(map(type, values))
+            try:
+                instance = cls._interned.get(key)
+            except TypeError:  # unhashable values are not interned
+                key, instance = None, None
+
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.__dict__.update(
+                    p_acc=p_acc,  # printing acceleration
+                    jerk=jerk,  # jerk settings
+                    vX=vX,  # max axis speed X
+                    vY=vY,  # max axis speed Y
+                    vZ=vZ,  # max axis speed Z
+                    vE=vE,  # max axis speed E
+                    speed=speed,  # travel speed for move
+                    units=units,  # unit system used
+                )
+                if key is not None:
+                    cls._interned[key] = instance
+            return instance
 
         def __init__(self, p_acc, jerk, vX, vY, vZ, vE, speed, units="SI (mm)"):
-            """Initialize printing settings.
+            """Initialize printing settings, the values are set once when the shared instance is created.
 
             Args:
                 p_acc: (float) printing acceleration
@@ -22,14 +62,39 @@ class state:
                 speed: (float) default target velocity
                 units: (string, default = "SI (mm)") unit settings
             """
-            self.p_acc = p_acc  # printing acceleration
-            self.jerk = jerk  # jerk settings
-            self.vX = vX  # max axis speed X
-            self.vY = vY  # max axis speed Y
-            self.vZ = vZ  # max axis speed Z
-            self.vE = vE  # max axis speed E
-            self.speed = speed  # travel speed for move
-            self.units = units  # unit system used
+
+        def __setattr__(self, name, value):
+            """Prevent changes, since the instance is shared."""
+            raise AttributeError(f"p_settings are immutable, create new settings instead of setting '{name}'.")
+
+        def __delattr__(self, name):
+            """Prevent changes, since the instance is shared."""
+            raise AttributeError(f"p_settings are immutable, '{name}' cannot be deleted.")
+
+        def __getnewargs__(self) -> tuple:
+            """Return the arguments to recreate (and intern) the settings when unpickling or copying."""
+            return self.as_tuple()
+
+        def as_tuple(self) -> tuple:
+            """Return the settings ordered like the arguments of the constructor."""
+            return (self.p_acc, self.jerk, self.vX, self.vY, self.vZ, self.vE, self.speed, self.units)
+
+        def __eq__(self, other) -> bool:
+            """Check for equal settings."""
+            if self is other:
+                return True
+            if isinstance(other, type(self)):
+                return self.as_tuple() == other.as_tuple()
+            return NotImplemented
+
+        def __hash__(self) -> int:
+            """Hash the settings values."""
+            return hash(self.as_tuple())
+
+        @functools.cached_property
+        def jd_delta(self) -> float:
+            """Junction deviation delta derived from jerk and acceleration, computed once per settings instance."""
+            return 0.414 * self.jerk * self.jerk / self.p_acc
 
         def __str__(self) -> str:
             """Create summary string for p_settings."""
@@ -47,6 +112,18 @@ class state:
             """Define representation."""
             return self.__str__()
 
+    __slots__ = (
+        "_state_position",
+        "_state_p_settings",
+        "_next_state",
+        "_prev_state",
+        "_line_nmbr",
+        "comment",
+        "layer",
+        "pause",
+        "folded_lines",
+    )
+
     def __init__(self, state_position: position = None, state_p_settings: p_settings = None):
         """Initialize a state.
 
@@ -62,6 +139,7 @@ class state:
         self.comment = None
         self.layer = None
         self.pause = None
+        self.folded_lines = None  # (line_number, comment, layer) of non-moving states folded into this state
 
     @property
     def state_position(self):
@@ -164,3 +242,235 @@ class state:
     def __repr__(self) -> str:
         """Call __str__() for representation."""
         return self.__str__()
+
+
+class StateTable:
+    """Columnar storage of states backed by NumPy arrays.
+
+    Instead of one `state` object per G-code line, every attribute is stored in a contiguous column:
+
+    - `position`: float64 array (n, 4) with x, y, z, e, undefined axes are NaN
+    - `settings_index`: int32 array (n,) with the row in the deduplicated settings table
+    - `settings`: float64 array (n_settings, 7) with the columns in `settings_columns`
+    - `line_number`: int64 array (n,), -1 for the initial state
+    - `layer`: int32 array (n,), -1 if no layer cue is used
+    - `pause`: float64 array (n,), NaN if there is no pause
+    - `comment_index`: int32 array (n,) with the index in the interned `comments`, -1 if there is no comment
+
+    `state` objects are only created on access, either single unlinked views by indexing or a fully linked list
+    by `to_states()`.
+    """
+
+    settings_columns = ("p_acc", "jerk", "vX", "vY", "vZ", "vE", "speed")
+
+    def __init__(
+        self,
+        position: np.ndarray,
+        settings_index: np.ndarray,
+        settings_rows: List[tuple],
+        line_number: np.ndarray,
+        layer: np.ndarray,
+        pause: np.ndarray,
+        comment_index: np.ndarray,
+        comments: List[str],
+    ):
+        """Initialize a state table from its columns.
+
+        Args:
+            position: (np.ndarray) x, y, z, e of every state
+            settings_index: (np.ndarray) index of the settings of every state in settings_rows
+            settings_rows: (list[tuple]) unique settings, ordered like the arguments of `state.p_settings`
+            line_number: (np.ndarray) line number of every state, -1 for None
+            layer: (np.ndarray) layer of every state, -1 for None
+            pause: (np.ndarray) pause duration of every state, NaN for None
+            comment_index: (np.ndarray) index of the comment of every state in comments, -1 for None
+            comments: (list[str]) unique comments
+        """
+        self.position = position
+        self.settings_index = settings_index
+        self.settings_rows = settings_rows
+        self.settings = np.array([row[:-1] for row in settings_rows], dtype=np.float64).reshape(-1, 7)
+        self.settings_units = [row[-1] for row in settings_rows]
+        self.line_number = line_number
+        self.layer = layer
+        self.pause = pause
+        self.comment_index = comment_index
+        self.comments = comments
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "StateTable":
+        """Create a state table from rows of the virtual machine without creating intermediate objects per row.
+
+        Args:
+            rows: (iterable[tuple]) (line_number, [x, y, z, e], settings, comment, layer, pause) per state,
+                e.g. from `state_generator._machine_traveler`
+
+        Returns:
+            table: (StateTable) the state table
+        """
+        positions = array("d")
+        settings_index = array("i")
+        line_numbers = array("q")
+        layers = array("i")
+        pauses = array("d")
+        comment_index = array("i")
+        settings_lookup = {}
+        comments_lookup = {}
+        nan = float("nan")
+
+        for line_number, pos, settings, comment, layer, pause in rows:
+            try:
+                positions.extend(pos)
+            except TypeError:  # undefined axes
+                positions.extend(nan if value is None else value for value in pos)
+
+            index = settings_lookup.get(settings)
+            if index is None:
+                index = settings_lookup[settings] = len(settings_lookup)
+            settings_index.append(index)
+
+            if comment is None:
+                comment_index.append(-1)
+            else:
+                index = comments_lookup.get(comment)
+                if index is None:
+                    index = comments_lookup[comment] = len(comments_lookup)
+                comment_index.append(index)
+
+            line_numbers.append(-1 if line_number is None else line_number)
+            layers.append(-1 if layer is None else layer)
+            pauses.append(nan if pause is None else pause)
+
+        return cls(
+            position=np.frombuffer(positions, dtype=np.float64).reshape(-1, 4),
+            settings_index=np.frombuffer(settings_index, dtype=np.int32),
+            settings_rows=list(settings_lookup),
+            line_number=np.frombuffer(line_numbers, dtype=np.int64),
+            layer=np.frombuffer(layers, dtype=np.int32),
+            pause=np.frombuffer(pauses, dtype=np.float64),
+            comment_index=np.frombuffer(comment_index, dtype=np.int32),
+            comments=list(comments_lookup),
+        )
+
+    @classmethod
+    def concatenate(cls, tables: Iterable["StateTable"]) -> "StateTable":
+        """Join state tables, e.g. of consecutive chunks of a file.
+
+        The settings rows and comments are deduplicated in order of their first appearance, so the result is the same
+        as `from_rows` over the rows of all tables. The tables are appended one by one, so a generator of tables does
+        not have to hold all of them at the same time.
+
+        Args:
+            tables: (iterable[StateTable]) tables in order
+
+        Returns:
+            table: (StateTable) the joined state table
+        """
+        positions = array("d")
+        settings_index = array("i")
+        line_numbers = array("q")
+        layers = array("i")
+        pauses = array("d")
+        comment_index = array("i")
+        settings_lookup = {}
+        comments_lookup = {}
+
+        for table in tables:
+            settings_map = [settings_lookup.setdefault(row, len(settings_lookup)) for row in table.settings_rows]
+            comments_map = [comments_lookup.setdefault(comment, len(comments_lookup)) for comment in table.comments]
+            positions.frombytes(table.position.tobytes())
+            settings_index.frombytes(np.asarray(settings_map, dtype=np.int32)[table.settings_index].tobytes())
+            line_numbers.frombytes(table.line_number.tobytes())
+            layers.frombytes(table.layer.tobytes())
+            pauses.frombytes(table.pause.tobytes())
+            comment_index.frombytes(  # -1 for no comment stays -1
+                np.asarray(comments_map + [-1], dtype=np.int32)[table.comment_index].tobytes()
+            )
+
+        return cls(
+            position=np.frombuffer(positions, dtype=np.float64).reshape(-1, 4),
+            settings_index=np.frombuffer(settings_index, dtype=np.int32),
+            settings_rows=list(settings_lookup),
+            line_number=np.frombuffer(line_numbers, dtype=np.int64),
+            layer=np.frombuffer(layers, dtype=np.int32),
+            pause=np.frombuffer(pauses, dtype=np.float64),
+            comment_index=np.frombuffer(comment_index, dtype=np.int32),
+            comments=list(comments_lookup),
+        )
+
+    @classmethod
+    def from_states(cls, states: Iterable[state]) -> "StateTable":
+        """Create a state table from state objects, e.g. to plan a list of states with the batch planners.
+
+        Args:
+            states: (iterable[state]) states in order
+
+        Returns:
+            table: (StateTable) the state table
+        """
+        return cls.from_rows(
+            (
+                this_state.line_number,
+                this_state.state_position.get_vec(withExtrusion=True),
+                this_state.state_p_settings.as_tuple(),
+                this_state.comment,
+                this_state.layer,
+                this_state.pause,
+            )
+            for this_state in states
+        )
+
+    def __len__(self) -> int:
+        """Return the number of states."""
+        return len(self.line_number)
+
+    def __getitem__(self, index: int) -> state:
+        """Return an unlinked state view of a single row."""
+        if index < 0:
+            index += len(self)
+        pos = [None if value != value else value for value in self.position[index].tolist()]  # NaN -> None
+        new_state = state(state_position=position(pos), state_p_settings=self.get_p_settings(index))
+
+        line_number = int(self.line_number[index])
+        new_state.line_number = line_number if line_number >= 0 else None
+        comment_index = int(self.comment_index[index])
+        new_state.comment = self.comments[comment_index] if comment_index >= 0 else None
+        layer = int(self.layer[index])
+        new_state.layer = layer if layer >= 0 else None
+        pause = float(self.pause[index])
+        new_state.pause = pause if pause == pause else None
+        return new_state
+
+    def get_p_settings(self, index: int) -> state.p_settings:
+        """Return the (interned) printing settings of a row.
+
+        Args:
+            index: (int) row of the state
+
+        Returns:
+            p_settings: (state.p_settings) printing settings
+        """
+        return state.p_settings(*self.settings_rows[int(self.settings_index[index])])
+
+    def get_settings_column(self, name: str) -> np.ndarray:
+        """Return a printing setting for every state.
+
+        Args:
+            name: (str) one of `settings_columns`
+
+        Returns:
+            column: (np.ndarray) the setting of every state
+        """
+        return self.settings[self.settings_index, self.settings_columns.index(name)]
+
+    def to_states(self) -> List[state]:
+        """Create the linked list of states, e.g. for the planner.
+
+        Returns:
+            states: (list[state]) all states, linked to their neighbors
+        """
+        states = [self[index] for index in range(len(self))]
+        for prev_state, next_state in zip(states[:-1], states[1:]):
+            next_state.prev_state = prev_state
+            prev_state.next_state = next_state
+        return states
@@ -1,18 +1,38 @@
 """State generator module."""
 
+import collections
+import concurrent.futures
+import io
 import math
+import mmap
+import os
 import pathlib
 import re
-from typing import List, Match
+from array import array
+from typing import Iterable, Iterator, List, Match, Optional, Tuple
+
+import numpy as np
 
 from pyGCodeDecode.helpers import ProgressBar, custom_print
 
-from .state import state
+from .state import StateTable, state
 from .utils import position
 
 supported_commands = {
     "G0": {"E": None, "X": None, "Y": None, "Z": None, "F": None},  # non Extrusion Move
     "G1": {"E": None, "X": None, "Y": None, "Z": None, "F": None},  # Extrusion Move
+    "G2": {"E": None, "F": None, "I": None, "J": None, "P": None, "R": None, "X": None, "Y": None, "Z": None},  # CW Arc
+    "G3": {
+        "E": None,
+        "F": None,
+        "I": None,
+        "J": None,
+        "P": None,
+        "R": None,
+        "X": None,
+        "Y": None,
+        "Z": None,
+    },  # CCW Arc
     "M203": {"E": None, "X": None, "Y": None, "Z": None},  # Max Feedrate
     "M204": {"P": None, "R": None, "S": None, "T": None},  # Starting Acceleration
     "M205": {"E": None, "J": None, "S": None, "X": None, "Y": None, "Z": None},  # Advanced Settings
@@ -28,28 +48,6 @@ supported_commands = {
 }
 
 unsupported_commands = {
-    "G2": {
-        "E": None,
-        "F": None,
-        "I": None,
-        "J": None,
-        "P": None,
-        "R": None,
-        "S": None,
-        "X": None,
-        "Y": None,
-    },  # clockwise arc move
-    "G3": {
-        "E": None,
-        "F": None,
-        "I": None,
-        "J": None,
-        "P": None,
-        "R": None,
-        "S": None,
-        "X": None,
-        "Y": None,
-    },  # counter-clockwise arc move,
     "G10": {"S": None},  # read only
     "G11": None,  # read only
     "G28": {"L": None, "O": None, "R": None, "X": None, "Y": None, "Z": None},  # home all axes
@@ -88,6 +86,7 @@ default_virtual_machine = {
     # general properties
     "nozzle_diam": 0.4,
     "filament_diam": 1.75,
+    "mm_per_arc_segment": 1.0,  # chord length for the interpolation of arcs, like MM_PER_ARC_SEGMENT in firmware
     # default settings
     "p_vel": 35,
     "p_acc": 200,
@@ -173,39 +172,1003 @@ def _arg_extract(string: str, key_dict: dict) -> dict:
     return arg_dict
 
 
-def _read_gcode_to_dict_list(filepath: pathlib.Path) -> List[dict]:
+# precompiled tokenizer tables
+_word_regex = re.compile(r"([A-Z])([^A-Z;]*)")  # a letter followed by its (unparsed) argument
+_command_letters = frozenset("GM")
+_command_table = {
+    key: (frozenset(sub_keys) if sub_keys is not None else None)
+    for key, sub_keys in known_commands.items()
+    if key != ";"
+}  # command word -> allowed parameter letters, None for commands without parameters
+_command_word_cache = {}  # raw command word (e.g. "G01") -> normalized command word (e.g. "G1") or None
+_unknown_word = object()  # sentinel for command words missing in the cache
+
+
+def _parse_arg(text: str):
+    """Convert the raw argument text of a word like `_arg_extract` does: float if possible, stripped string otherwise.
+
+    Args:
+        text: (str) raw argument text
+
+    Returns:
+        arg: (float or str) parsed argument
     """
-    Read gcode from .gcode file.
+    try:
+        return float(text)
+    except ValueError:
+        text = text.replace(" ", "").replace("\n", "")
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _normalize_command_word(letter: str, text: str):
+    """Return the known command word for a letter and its argument text or None if the command is unknown.
 
     Args:
-        filepath: (Path) filepath of the .gcode file
+        letter: (str) command letter, G or M
+        text: (str) raw argument text following the letter
 
     Returns:
-        dict_list: (list[dict]) list with every line as dict
+        command: (str or None) normalized command word, e.g. "G1" for "G01"
     """
-    dict_list = []
+    raw_word = letter + text
+    if raw_word in _command_word_cache:
+        return _command_word_cache[raw_word]
+
+    number = text.strip()
+    command = letter + str(int(number)) if number.isdigit() else None
+    command = command if command in _command_table else None
+    if len(_command_word_cache) < 4096:  # the cache only holds the few distinct command words of a file
+        _command_word_cache[raw_word] = command
+    return command
 
-    # First pass to count total lines
-    with open(file=filepath) as file_gcode:
-        total_lines = sum(1 for _ in file_gcode)
 
-    # Initialize progress bar with the total number of lines
-    progress_bar = ProgressBar(name=f"Parsing {total_lines} lines of {filepath.name}")
+def _tokenize_line(line: str) -> dict:
+    """Tokenize a single G-code line in one pass.
 
-    # Second pass to process the lines
+    The line is split once into its code and comment part. The code part is walked word by word, where a word is an
+    upper case letter followed by its argument. Command words (G, M) are looked up in a precompiled table of known
+    commands, the following parameter words are assigned to the last known command if it accepts them.
+    The returned dictionary has the same structure as the one returned by `_arg_extract` with `known_commands`.
+
+    Args:
+        line: (str) a single line of G-code
+
+    Returns:
+        line_dict: (dict) dictionary with all found commands and their arguments
+    """
+    line_dict = dict()
+    code, comment_sep, comment = line.partition(";")
+    if comment_sep:
+        line_dict[";"] = comment
+
+    params = None  # parameters of the current command
+    allowed = None  # allowed parameter letters of the current command
+    for letter, text in _word_regex.findall(code):
+        if letter in _command_letters:
+            command = _command_word_cache.get(letter + text, _unknown_word)
+            if command is _unknown_word:
+                command = _normalize_command_word(letter, text)
+            if command is None or command in line_dict:
+                params = allowed = None  # unknown or repeated command, ignore its parameters
+                continue
+            allowed = _command_table[command]
+            if allowed is None:
+                line_dict[command] = _parse_arg(text.lstrip().lstrip("0123456789"))
+                params = None
+            else:
+                params = line_dict[command] = dict()
+        elif params is not None and letter in allowed and letter not in params:
+            try:
+                params[letter] = float(text)  # fast path for well formed numbers
+            except ValueError:
+                params[letter] = _parse_arg(text)
+
+    return line_dict
+
+
+# comment blocks without motion written by slicers: name -> (begin, end) pattern of the marker comments
+metadata_blocks = {
+    "thumbnail_block": ("THUMBNAIL_BLOCK_START", "THUMBNAIL_BLOCK_END"),  # OrcaSlicer, BambuStudio
+    "thumbnail": (r"thumbnail(?:_[A-Z]+)? begin", r"thumbnail(?:_[A-Z]+)? end"),  # PrusaSlicer, SuperSlicer, Cura
+    "header_block": ("HEADER_BLOCK_START", "HEADER_BLOCK_END"),  # OrcaSlicer, BambuStudio
+    "config_block": ("CONFIG_BLOCK_START", "CONFIG_BLOCK_END"),  # OrcaSlicer, BambuStudio
+    "prusaslicer_config": ("prusaslicer_config = begin", "prusaslicer_config = end"),  # PrusaSlicer
+}
+_metadata_begin_pattern = (
+    ";[ \t]*(?:" + "|".join(f"(?P<{name}>{begin})" for name, (begin, _) in metadata_blocks.items()) + ")"
+)
+_metadata_begin_regex = re.compile(_metadata_begin_pattern)
+_metadata_end_regexes = {name: re.compile(f";[ \t]*{end}") for name, (_, end) in metadata_blocks.items()}
+
+
+def _skip_metadata_block(begin: Match, first_line: int, numbered_lines: Iterator[tuple], skipped_blocks: list) -> None:
+    """
+    Consume the lines of a comment block without motion, e.g. a thumbnail or a config dump, up to its end marker.
+
+    The lines of the block are only compared to the end marker, they are neither tokenized nor turned into states.
+
+    Args:
+        begin: (Match) match of `_metadata_begin_regex` on the first line of the block
+        first_line: (int) line number of the first line
+        numbered_lines: (iterator[tuple]) (line_number, line) of the following lines, consumed up to the end marker
+        skipped_blocks: (list) (name, first_line, last_line) of the block is appended
+    """
+    end_regex = _metadata_end_regexes[begin.lastgroup]
+    last_line = first_line
+    for last_line, line in numbered_lines:
+        if line[:1] == ";" and end_regex.match(line):
+            break
+    skipped_blocks.append((begin.lastgroup, first_line, last_line))
+
+
+def _skip_metadata_line_dicts(line_dicts: Iterable[dict], skipped_blocks: list) -> Iterator[dict]:
+    """
+    Skip comment blocks without motion in already tokenized lines, e.g. loaded from a compiled .pgcd file.
+
+    Args:
+        line_dicts: (iterable[dict]) dicts with commands
+        skipped_blocks: (list) (name, first_line, last_line) of every skipped block is appended
+
+    Yields:
+        line_dict: (dict) every line outside of the blocks
+    """
+    line_dicts = iter(line_dicts)
+    for line_dict in line_dicts:
+        begin = _metadata_begin_regex.match(";" + line_dict[";"]) if len(line_dict) == 2 and ";" in line_dict else None
+        if begin is None:
+            yield line_dict
+            continue
+
+        end_regex = _metadata_end_regexes[begin.lastgroup]
+        last_line = line_dict["line_number"]
+        for block_line_dict in line_dicts:
+            last_line = block_line_dict["line_number"]
+            if ";" in block_line_dict and end_regex.match(";" + block_line_dict[";"]):
+                break
+        skipped_blocks.append((begin.lastgroup, line_dict["line_number"], last_line))
+
+
+def _metadata_end_regex_bytes(name: str) -> "re.Pattern[bytes]":
+    """Return the byte pattern matching the whole line with the end marker of a metadata block."""
+    return re.compile(b"^" + _metadata_end_regexes[name].pattern.encode() + rb"[^\n]*", flags=re.MULTILINE)
+
+
+def _find_metadata_blocks(buffer: mmap.mmap) -> List[tuple]:
+    """
+    Find the byte ranges of all comment blocks without motion in a memory mapped file.
+
+    Args:
+        buffer: (mmap) memory mapped G-code file
+
+    Returns:
+        byte_ranges: (list[tuple]) (start, end) of every block, end is directly after the line break of the end marker
+    """
+    begin_regex = re.compile(b"^" + _metadata_begin_pattern.encode(), flags=re.MULTILINE)
+    byte_ranges = []
+    position = 0
+    while True:
+        begin = begin_regex.search(buffer, position)
+        if begin is None:
+            return byte_ranges
+        end = _metadata_end_regex_bytes(begin.lastgroup).search(buffer, begin.end())
+        position = len(buffer) if end is None else min(end.end() + 1, len(buffer))
+        byte_ranges.append((begin.start(), position))
+
+
+def _iter_gcode_lines(filepath: pathlib.Path, skipped_blocks: list = None) -> Iterator[dict]:
+    """
+    Read and tokenize a .gcode file line by line.
+
+    The progress is based on the bytes read, so no line counting pre-pass over the file is needed.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion are skipped and
+            their (name, first_line, last_line) is appended, see `metadata_blocks`
+
+    Yields:
+        line_dict: (dict) every line as dict
+    """
     with open(file=filepath) as file_gcode:
-        for i, line in enumerate(file_gcode):
-            line_dict = _arg_extract(string=line, key_dict=known_commands)
-            line_dict["line_number"] = i + 1
-            dict_list.append(line_dict)
+        file_size = os.fstat(file_gcode.fileno()).st_size
+        progress_bar = ProgressBar(name=f"Parsing {file_size / 1e6:.1f} MB of {filepath.name}")
+        last_bytes_read = 0
+
+        numbered_lines = enumerate(file_gcode, start=1)
+        for line_number, line in numbered_lines:
+            if skipped_blocks is not None and line[:1] == ";":
+                begin = _metadata_begin_regex.match(line)
+                if begin is not None:
+                    _skip_metadata_block(begin, line_number, numbered_lines, skipped_blocks)
+                    continue
+
+            line_dict = _tokenize_line(line=line)
+            line_dict["line_number"] = line_number
+            yield line_dict
+
+            # update the progress bar whenever a new chunk of the file has been read
+            bytes_read = file_gcode.buffer.tell()
+            if bytes_read != last_bytes_read:
+                last_bytes_read = bytes_read
+                progress_bar.update(bytes_read / file_size)
+
+    if progress_bar.last_progress_update < 100:
+        progress_bar.update(1.0)
+
+
+# byte level line filter of the memory mapped reader
+_mmap_command_pattern = rb"^(?P<command>[^;\n]*[GM][^\n]*)"  # a G or M letter before any comment
+_mmap_feature_pattern = rb"infill|perimeter"  # feature types detected by `generate_planner_blocks` from comments
+
+
+def _mmap_line_regex(layer_cue: str = None, skip_metadata: bool = False) -> "re.Pattern[bytes]":
+    """Compile the byte pattern matching all lines that are relevant for the state generation.
+
+    Args:
+        layer_cue: (str, default = None) comment marking a layer change
+        skip_metadata: (bool, default = False) additionally match the begin of comment blocks without motion
+
+    Returns:
+        line_regex: (Pattern[bytes]) multiline pattern, either matching a line with a command, the begin of a
+            metadata block or a relevant comment
+    """
+    comment_keys = _mmap_feature_pattern
+    if layer_cue:
+        comment_keys += b"|" + re.escape(layer_cue.encode())
+    block_pattern = rb"|^(?P<block>" + _metadata_begin_pattern.encode() + rb")" if skip_metadata else b""
+    return re.compile(
+        _mmap_command_pattern + block_pattern + rb"|^(?P<comment>[ \t]*;[^\n]*?(?i:" + comment_keys + rb")[^\n]*)",
+        flags=re.MULTILINE,
+    )
+
+
+def _scan_mmap_lines(
+    buffer: mmap.mmap,
+    line_regex: "re.Pattern[bytes]",
+    start: int,
+    end: int,
+    progress_bar: ProgressBar = None,
+    skipped_blocks: list = None,
+) -> Iterator[dict]:
+    """
+    Tokenize the relevant lines in a byte range of a memory mapped file.
+
+    Args:
+        buffer: (mmap) memory mapped G-code file
+        line_regex: (Pattern[bytes]) pattern from `_mmap_line_regex`
+        start: (int) first byte of the range, has to be the beginning of a line
+        end: (int) end of the range, has to be the end of the file or directly after a line break
+        progress_bar: (ProgressBar, default = None) optional progress bar to update
+        skipped_blocks: (list, default = None) (name, first_line, last_line) of every skipped metadata block is
+            appended, requires a pattern created with `skip_metadata`
+
+    Yields:
+        line_dict: (dict) every relevant line as dict, line numbers count from 1 at the beginning of the range
+    """
+    line_number = 1
+    last_end = start
+    next_update = start
+    update_step = max(len(buffer) // 1000, 1)
+
+    for match in line_regex.finditer(buffer, start, end):
+        match_start, match_end = match.span()
+        if match_start < last_end:
+            continue  # inside a skipped block
+        # a match ends right before its line break, so consecutive lines are exactly one byte apart
+        line_number += 1 if match_start - last_end == 1 else buffer[last_end:match_start].count(b"\n")
+        last_end = match_end
+
+        if match.lastgroup == "block":
+            name = next(name for name in metadata_blocks if match.group(name) is not None)
+            block_end = _metadata_end_regex_bytes(name).search(buffer, match_end, end)
+            last_end = end if block_end is None else block_end.end()
+            first_line = line_number
+            block = buffer[match_start:last_end]
+            line_number += block.count(b"\n") - block.endswith(b"\n")
+            if skipped_blocks is not None:
+                skipped_blocks.append((name, first_line, line_number))
+            continue
+
+        line_dict = _tokenize_line(line=match.group().decode(errors="replace"))
+        if match.lastgroup == "command" and len(line_dict) == (";" in line_dict):
+            continue  # only unknown commands
+        line_dict["line_number"] = line_number
+        yield line_dict
+
+        if progress_bar is not None and match_start >= next_update:
+            next_update = match_start + update_step
+            progress_bar.update(match_start / len(buffer))
+
+
+def _iter_gcode_lines_mmap(
+    filepath: pathlib.Path, layer_cue: str = None, skipped_blocks: list = None
+) -> Iterator[dict]:
+    """
+    Read and tokenize a .gcode file by memory mapping it and scanning the raw bytes.
 
-            # Update progress bar
-            progress = (i + 1) / total_lines
-            progress_bar.update(progress)
+    Line boundaries and command letters are found by a byte pattern running over the whole buffer, so only lines
+    with commands and comments relevant for the layer and feature detection are decoded and tokenized. Lines without
+    a known command, e.g. thumbnails, config dumps or unknown commands, are skipped without creating any objects.
+    Line numbers are kept by counting the line breaks in between.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        layer_cue: (str, default = None) comment marking a layer change, these lines are kept as well
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion are skipped and
+            their (name, first_line, last_line) is appended, see `metadata_blocks`
+
+    Yields:
+        line_dict: (dict) every relevant line as dict
+    """
+    with open(file=filepath, mode="rb") as file_gcode:
+        file_size = os.fstat(file_gcode.fileno()).st_size
+        progress_bar = ProgressBar(name=f"Parsing {file_size / 1e6:.1f} MB of {filepath.name} (mmap)")
+        if file_size == 0:
+            progress_bar.update(1.0)
+            return
+
+        with mmap.mmap(file_gcode.fileno(), length=0, access=mmap.ACCESS_READ) as buffer:
+            yield from _scan_mmap_lines(
+                buffer=buffer,
+                line_regex=_mmap_line_regex(layer_cue=layer_cue, skip_metadata=skipped_blocks is not None),
+                start=0,
+                end=file_size,
+                progress_bar=progress_bar,
+                skipped_blocks=skipped_blocks,
+            )
 
-    # custom_print(f"Parsing done. {len(dict_list)} lines parsed.")
+    progress_bar.update(1.0)
 
-    return dict_list
+
+# compact encoding of line dicts, used by compiled .pgcd files and to return the chunks of the parallel reader
+def _encode_strings(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as offsets into their concatenated UTF-8 data.
+
+    Args:
+        strings: (iterable[str]) strings in order
+
+    Returns:
+        offsets: (np.ndarray) int64 (n + 1,) begin of every string and the end of the last one
+        data: (np.ndarray) uint8 UTF-8 data
+    """
+    encoded = [string.encode() for string in strings]
+    offsets = np.cumsum([0] + [len(data) for data in encoded], dtype=np.int64)
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _decode_strings(offsets: np.ndarray, data: np.ndarray) -> List[str]:
+    """Decode strings encoded by `_encode_strings`."""
+    data = data.tobytes()
+    offsets = offsets.tolist()
+    return [data[start:end].decode() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _encode_lines(line_dicts: Iterable[dict], arrays: dict) -> Iterator[dict]:
+    """Pass line dicts through while encoding them as arrays.
+
+    Args:
+        line_dicts: (iterable[dict]) dicts of the tokenizer, e.g. from `_iter_gcode_lines`
+        arrays: (dict) filled with name -> np.ndarray when the line dicts are exhausted, see `compiled_gcode` for the
+            layout, and the line numbers in `line_number`
+
+    Yields:
+        line_dict: (dict) the unchanged line dicts
+
+    Raises:
+        ValueError: if an argument of a supported command is not a number
+    """
+    command_names = [key for key in known_commands if key != ";"]
+    command_index = {name: i for i, name in enumerate(command_names)}
+
+    commands = array("I")
+    param_counts = array("B")
+    param_codes = array("H")
+    param_values = array("d")
+    comment_index = array("i")
+    line_numbers = array("q")
+    comments = {}
+    n_params = 0
+
+    for line_dict in line_dicts:
+        mask = 0
+        for key, value in line_dict.items():
+            if key == ";":
+                comment = value.strip()
+                index = comments.get(comment)
+                if index is None:
+                    index = comments[comment] = len(comments)
+                comment_index.append(index)
+            elif key != "line_number":
+                index = command_index[key]
+                mask |= 1 << index
+                if isinstance(value, dict):
+                    for letter, arg in value.items():
+                        if not isinstance(arg, float):
+                            if key in supported_commands:
+                                raise ValueError(
+                                    f"Line {line_dict['line_number']}: the argument '{letter}{arg}' of {key} "
+                                    "is not a number."
+                                )
+                            arg = float("nan")  # arguments of unsupported commands are never used
+                        param_codes.append(index * 26 + ord(letter) - ord("A"))
+                        param_values.append(arg)
+        if ";" not in line_dict:
+            comment_index.append(-1)
+        commands.append(mask)
+        param_counts.append(len(param_codes) - n_params)
+        n_params = len(param_codes)
+        line_numbers.append(line_dict["line_number"])
+        yield line_dict
+
+    comment_offsets, comment_data = _encode_strings(comments)
+    arrays.update(
+        {
+            "command_names": command_names,
+            "commands": np.frombuffer(commands, dtype=np.uint32),
+            "param_counts": np.frombuffer(param_counts, dtype=np.uint8),
+            "param_codes": np.frombuffer(param_codes, dtype=np.uint16),
+            "param_values": np.frombuffer(param_values, dtype=np.float64),
+            "comment_index": np.frombuffer(comment_index, dtype=np.int32),
+            "comment_offsets": comment_offsets,
+            "comment_data": comment_data,
+            "line_number": np.frombuffer(line_numbers, dtype=np.int64),
+        }
+    )
+
+
+def _decode_lines(
+    command_names: List[str],
+    commands: np.ndarray,
+    param_counts: np.ndarray,
+    param_codes: np.ndarray,
+    param_values: np.ndarray,
+    comment_index: np.ndarray,
+    comments: List[str],
+    line_numbers: Iterable[int],
+) -> Iterator[dict]:
+    """Yield the line dicts encoded by `_encode_lines`, like the tokenizer returns them with stripped comments.
+
+    Args:
+        command_names: (list[str]) command of every bit of the masks
+        commands: (np.ndarray) bit masks of the commands of consecutive lines
+        param_counts: (np.ndarray) number of parameters of the lines
+        param_codes: (np.ndarray) codes of the parameters, starting with the ones of the first line
+        param_values: (np.ndarray) values of the parameters, starting with the ones of the first line
+        comment_index: (np.ndarray) index of the comment of the lines, -1 for no comment
+        comments: (list[str]) unique comments
+        line_numbers: (iterable[int]) line number of the lines
+
+    Yields:
+        line_dict: (dict) every line as dict
+    """
+    has_params = [isinstance(known_commands.get(name), dict) for name in command_names]
+    code_command = [command_names[code // 26] for code in range(26 * len(command_names))]
+    code_letter = [chr(ord("A") + code % 26) for code in range(26 * len(command_names))]
+    mask_commands = {}  # bit mask -> list of (command, has parameters)
+
+    offsets = np.concatenate(([0], np.cumsum(param_counts, dtype=np.int64))).tolist()
+    codes = param_codes[: offsets[-1]].tolist()
+    values = param_values[: offsets[-1]].tolist()
+    comment_index = comment_index.tolist()
+
+    for i, (mask, line_number) in enumerate(zip(commands.tolist(), line_numbers)):
+        line_dict = {}
+        if comment_index[i] >= 0:
+            line_dict[";"] = comments[comment_index[i]]
+        if mask:
+            line_commands = mask_commands.get(mask)
+            if line_commands is None:
+                line_commands = mask_commands[mask] = [
+                    (name, has_params[bit]) for bit, name in enumerate(command_names) if mask >> bit & 1
+                ]
+            for name, params in line_commands:
+                line_dict[name] = {} if params else ""
+            for j in range(offsets[i], offsets[i + 1]):
+                line_dict[code_command[codes[j]]][code_letter[codes[j]]] = values[j]
+        line_dict["line_number"] = line_number
+        yield line_dict
+
+
+def _decode_chunk(arrays: dict, line_offset: int = 0) -> Iterator[dict]:
+    """Yield the line dicts of a chunk encoded by `_encode_lines`.
+
+    Args:
+        arrays: (dict) the encoded chunk
+        line_offset: (int, default = 0) added to the line numbers
+
+    Yields:
+        line_dict: (dict) every line as dict
+    """
+    yield from _decode_lines(
+        command_names=arrays["command_names"],
+        commands=arrays["commands"],
+        param_counts=arrays["param_counts"],
+        param_codes=arrays["param_codes"],
+        param_values=arrays["param_values"],
+        comment_index=arrays["comment_index"],
+        comments=_decode_strings(offsets=arrays["comment_offsets"], data=arrays["comment_data"]),
+        line_numbers=(arrays["line_number"] + line_offset).tolist(),
+    )
+
+
+def _count_encoded_unsupported_commands(command_names: List[str], commands: np.ndarray) -> dict:
+    """Count the known but unsupported commands in encoded lines, like `_count_unsupported_commands`.
+
+    Args:
+        command_names: (list[str]) command of every bit of the masks
+        commands: (np.ndarray) bit masks of the commands of every line
+
+    Returns:
+        command_counts: (dict) counts per unsupported command, ordered by their first line
+    """
+    counts = []
+    for bit, name in enumerate(command_names):
+        if name in unsupported_commands:
+            lines = (commands >> np.uint32(bit)) & np.uint32(1)
+            count = int(np.count_nonzero(lines))
+            if count > 0:
+                counts.append((int(np.argmax(lines)), name, count))
+    return {name: count for _, name, count in sorted(counts)}
+
+
+_min_chunk_size = 1 << 20  # bytes, smaller chunks do not pay off the inter process communication
+
+
+def _chunk_byte_ranges(filepath: pathlib.Path, n_chunks: int, skip_metadata: bool = False) -> List[tuple]:
+    """
+    Split a file into byte ranges of about equal size, aligned to line breaks.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        n_chunks: (int) maximum number of chunks, each chunk is at least `_min_chunk_size` bytes
+        skip_metadata: (bool, default = False) move boundaries out of comment blocks without motion, so every block
+            is skipped as a whole by one chunk
+
+    Returns:
+        byte_ranges: (list[tuple]) (start, end) of every chunk, covering the whole file
+    """
+    with open(file=filepath, mode="rb") as file_gcode:
+        file_size = os.fstat(file_gcode.fileno()).st_size
+        if file_size == 0:
+            return []
+        n_chunks = max(1, min(n_chunks, file_size // _min_chunk_size))
+
+        with mmap.mmap(file_gcode.fileno(), length=0, access=mmap.ACCESS_READ) as buffer:
+            bounds = [0]
+            for i in range(1, n_chunks):
+                line_break = buffer.find(b"\n", max(file_size * i // n_chunks, bounds[-1]))
+                if line_break == -1 or line_break + 1 >= file_size:
+                    break
+                if line_break + 1 > bounds[-1]:
+                    bounds.append(line_break + 1)
+
+            if skip_metadata:
+                for block_start, block_end in _find_metadata_blocks(buffer=buffer):
+                    bounds = [block_end if block_start < bound < block_end else bound for bound in bounds]
+                bounds = sorted(set(bound for bound in bounds if bound < file_size))
+            bounds.append(file_size)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+_move_command_order = {"G0": 0, "G1": 1, "G2": 2, "G3": 3, "G92": 4}  # order of the commands of a line in the VM
+
+
+def _summarize_chunk(arrays: dict, initial_machine_setup: dict) -> dict:
+    """
+    Summarize the effect of an encoded chunk on the virtual machine, executed in a worker process.
+
+    Modes, units, feed rate and the M203/M204/M205 limits are modal, the chunk sets them to its last value. Positions
+    and G92 offsets accumulate instead, they are kept as the position commands per axis in order, so that
+    `_apply_chunk_summary` replays them with the same floating point operations as the virtual machine.
+
+    Args:
+        arrays: (dict) chunk encoded by `_encode_lines`
+        initial_machine_setup: (dict) setup with all keys of `default_virtual_machine`
+
+    Returns:
+        summary: (dict) "machine" with the modal values set in the chunk, "layers" with the number of layer cues and
+            "axes" with the (kinds, values) of the position commands of every axis, the kind is 1 for absolute,
+            0 for relative, -1 for the mode at the beginning of the chunk and 2 for G92
+    """
+    command_names = arrays["command_names"]
+    index = {name: i for i, name in enumerate(command_names)}
+    commands = arrays["commands"]
+    line_range = np.arange(len(commands))
+
+    def last_mode(on_command: str, off_command: str) -> np.ndarray:
+        """Return the mode after every line, 1 for on, 0 for off, -1 if not set yet, off is applied last."""
+        mode = np.where(commands >> np.uint32(index[on_command]) & np.uint32(1), 1, -1)
+        mode[commands >> np.uint32(index[off_command]) & np.uint32(1) == 1] = 0
+        last = np.maximum.accumulate(np.where(mode >= 0, line_range, -1))
+        return np.where(last >= 0, mode[last], -1)
+
+    position_mode = last_mode("G90", "G91")
+    extrusion_mode = last_mode("M82", "M83")
+    units_mode = last_mode("G20", "G21")
+
+    machine = {}
+    if len(commands) > 0:
+        if position_mode[-1] >= 0:
+            machine["absolute_position"] = bool(position_mode[-1])
+        if extrusion_mode[-1] >= 0:
+            machine["absolute_extrusion"] = bool(extrusion_mode[-1])
+        if units_mode[-1] >= 0:
+            machine["units"] = "inch" if units_mode[-1] else "SI (mm)"
+
+    # parameters in the order the virtual machine applies them
+    lines = np.repeat(line_range, arrays["param_counts"])
+    codes = arrays["param_codes"]
+    code_command, code_letter = codes // 26, codes % 26
+    command_order = np.full(len(command_names), len(_move_command_order), dtype=np.int64)
+    for name, order in _move_command_order.items():
+        command_order[index[name]] = order
+    sort = np.argsort(lines * (len(_move_command_order) + 1) + command_order[code_command], kind="stable")
+    lines, code_command, code_letter = lines[sort], code_command[sort], code_letter[sort]
+    values = arrays["param_values"][sort]
+
+    def last_value(names: tuple, letter: str) -> Optional[float]:
+        """Return the last value of a parameter of the commands, None if it is not set."""
+        selected = np.flatnonzero(
+            np.isin(code_command, [index[name] for name in names]) & (code_letter == ord(letter) - ord("A"))
+        )
+        return float(values[selected[-1]]) if len(selected) > 0 else None
+
+    feed_rate = last_value(("G0", "G1", "G2", "G3"), "F")
+    if feed_rate is not None:
+        machine["p_vel"] = feed_rate / 60
+    for key, (command, letter) in {
+        "p_acc": ("M204", "P"),
+        "jerk": ("M205", "X"),
+        "vX": ("M203", "X"),
+        "vY": ("M203", "Y"),
+        "vZ": ("M203", "Z"),
+        "vE": ("M203", "E"),
+    }.items():
+        value = last_value((command,), letter)
+        if value is not None:
+            machine[key] = value
+
+    axes = {}
+    g92 = index["G92"]
+    moves = [index[name] for name in ("G0", "G1", "G2", "G3")]
+    for axis in ["X", "Y", "Z", "E"]:
+        selected = np.isin(code_command, moves + [g92]) & (code_letter == ord(axis) - ord("A"))
+        is_g92 = code_command[selected] == g92
+        modes = extrusion_mode if axis == "E" else position_mode
+        kinds = np.where(is_g92, 2, modes[lines[selected]]).astype(np.int8)
+        axis_values = values[selected]
+        if axis == "E" and initial_machine_setup["volumetric_extrusion"]:
+            area = math.pi * (initial_machine_setup["filament_diam"] / 2) ** 2
+            axis_values = np.where(is_g92, axis_values, axis_values / area)
+        axes[axis] = (kinds, axis_values)
+
+    layers = 0
+    if "layer_cue" in initial_machine_setup:
+        comments = _decode_strings(offsets=arrays["comment_offsets"], data=arrays["comment_data"])
+        if initial_machine_setup["layer_cue"] in comments:
+            layer_index = comments.index(initial_machine_setup["layer_cue"])
+            layers = int(np.count_nonzero(arrays["comment_index"] == layer_index))
+
+    return {"machine": machine, "layers": layers, "axes": axes}
+
+
+def _apply_chunk_summary(virtual_machine: dict, summary: dict) -> dict:
+    """
+    Return the virtual machine after a chunk, one step of the prefix pass over the chunk summaries.
+
+    Relative moves are summed in order with `np.add.accumulate`, so every position and offset is bitwise identical to
+    running the virtual machine line by line.
+
+    Args:
+        virtual_machine: (dict) virtual machine before the chunk with a fully defined position
+        summary: (dict) summary of the chunk from `_summarize_chunk`
+
+    Returns:
+        virtual_machine: (dict) virtual machine after the chunk
+    """
+    result = {**virtual_machine, **summary["machine"]}
+    result["layer"] += summary["layers"]
+
+    for axis, (kinds, values) in summary["axes"].items():
+        if len(kinds) == 0:
+            continue
+        if axis == "E":
+            entry_mode = 1 if virtual_machine["absolute_extrusion"] else 0
+        else:
+            entry_mode = 1 if virtual_machine["absolute_position"] is True else 0
+        kinds = np.where(kinds < 0, entry_mode, kinds)
+        anchors = np.flatnonzero(kinds > 0)  # absolute moves and G92 set the position
+
+        def position_before(end: int):
+            """Return the position before the command `end`, adding the relative moves since the last anchor."""
+            last = np.searchsorted(anchors, end) - 1
+            begin = anchors[last] if last >= 0 else -1
+            position = float(values[begin]) if begin >= 0 else virtual_machine[axis]
+            if end - begin > 1:
+                position = float(np.add.accumulate(np.concatenate(([position], values[slice(begin + 1, end)])))[-1])
+            return position
+
+        offset = virtual_machine[f"_{axis}"]
+        for command in np.flatnonzero(kinds == 2).tolist():
+            offset = position_before(command) + float(values[command]) + offset
+        result[f"_{axis}"] = offset
+        result[axis] = position_before(len(kinds))
+
+    return result
+
+
+def _tokenize_chunk(
+    filepath: pathlib.Path,
+    start: int,
+    end: int,
+    reader: str,
+    layer_cue: str = None,
+    skip_metadata: bool = False,
+    initial_machine_setup: dict = None,
+) -> tuple:
+    """
+    Tokenize a byte range of a .gcode file, executed in a worker process.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        start: (int) first byte of the chunk, the beginning of a line
+        end: (int) end of the chunk, the end of the file or directly after a line break
+        reader: (str) "text" to tokenize every line, "mmap" to only tokenize the relevant lines
+        layer_cue: (str, default = None) comment marking a layer change, kept by the "mmap" reader
+        skip_metadata: (bool, default = False) skip comment blocks without motion
+        initial_machine_setup: (dict, default = None) setup with all keys of `default_virtual_machine`, if given the
+            chunk is summarized for the prefix pass, see `_summarize_chunk`
+
+    Returns:
+        chunk: (tuple) number of lines in the chunk, the line dicts encoded by `_encode_lines`, the list of skipped
+            blocks, all numbered from 1 within the chunk, and the summary or None
+    """
+    skipped_blocks = [] if skip_metadata else None
+    arrays = {}
+    if reader == "mmap":
+        with open(file=filepath, mode="rb") as file_gcode:
+            with mmap.mmap(file_gcode.fileno(), length=0, access=mmap.ACCESS_READ) as buffer:
+                line_dicts = _scan_mmap_lines(
+                    buffer=buffer,
+                    line_regex=_mmap_line_regex(layer_cue, skip_metadata=skip_metadata),
+                    start=start,
+                    end=end,
+                    skipped_blocks=skipped_blocks,
+                )
+                collections.deque(_encode_lines(line_dicts=line_dicts, arrays=arrays), maxlen=0)
+                n_lines = buffer[start:end].count(b"\n")
+    else:
+        with open(file=filepath, mode="rb") as file_gcode:
+            file_gcode.seek(start)
+            chunk = io.TextIOWrapper(io.BytesIO(file_gcode.read(end - start)))  # same line splitting as `open`
+
+        def iter_chunk_lines() -> Iterator[dict]:
+            numbered_lines = enumerate(chunk, start=1)
+            for line_number, line in numbered_lines:
+                if skip_metadata and line[:1] == ";":
+                    begin = _metadata_begin_regex.match(line)
+                    if begin is not None:
+                        _skip_metadata_block(begin, line_number, numbered_lines, skipped_blocks)
+                        continue
+
+                line_dict = _tokenize_line(line=line)
+                line_dict["line_number"] = line_number
+                yield line_dict
+
+        collections.deque(_encode_lines(line_dicts=iter_chunk_lines(), arrays=arrays), maxlen=0)
+        n_lines = int(arrays["line_number"][-1]) if len(arrays["line_number"]) > 0 else 0
+        if skipped_blocks:
+            n_lines = max(n_lines, skipped_blocks[-1][2])
+
+    summary = None if initial_machine_setup is None else _summarize_chunk(arrays, initial_machine_setup)
+    return n_lines, arrays, skipped_blocks, summary
+
+
+def _ordered_results(
+    executor: concurrent.futures.Executor, function, arguments: Iterable[tuple], window: int
+) -> Iterator:
+    """
+    Submit calls through a bounded window of pending futures and yield their results in order.
+
+    Unlike `executor.map`, which submits all calls at once, only `window` calls are pending at any time, so the
+    results of a large file are consumed while it is read instead of all being held in memory.
+
+    Args:
+        executor: (Executor) process pool
+        function: (callable) function to call
+        arguments: (iterable[tuple]) positional arguments of every call
+        window: (int) maximum number of pending calls
+
+    Yields:
+        result: the result of every call in order
+    """
+    pending = collections.deque()
+    for args in arguments:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _iter_gcode_lines_parallel(
+    filepath: pathlib.Path, n_workers: int, reader: str = "text", layer_cue: str = None, skipped_blocks: list = None
+) -> Iterator[dict]:
+    """
+    Read and tokenize a .gcode file in parallel.
+
+    The file is split into byte ranges at line breaks, which are tokenized independently in a process pool and
+    returned encoded as arrays. The chunks only know their local line numbers, a prefix sum over the line counts of
+    the preceding chunks gives the offset of every chunk. Line dicts are yielded in file order, so the result is
+    identical to the serial reader, apart from the comments, which are stripped.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        n_workers: (int) number of worker processes
+        reader: (str, default = "text") "text" or "mmap", see `iter_states`
+        layer_cue: (str, default = None) comment marking a layer change, kept by the "mmap" reader
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion are skipped and
+            their (name, first_line, last_line) is appended, see `metadata_blocks`
+
+    Yields:
+        line_dict: (dict) every line as dict
+    """
+    skip_metadata = skipped_blocks is not None
+    byte_ranges = _chunk_byte_ranges(  # more chunks than workers to balance
+        filepath=filepath, n_chunks=4 * n_workers, skip_metadata=skip_metadata
+    )
+    if len(byte_ranges) <= 1:
+        if reader == "mmap":
+            yield from _iter_gcode_lines_mmap(filepath=filepath, layer_cue=layer_cue, skipped_blocks=skipped_blocks)
+        else:
+            yield from _iter_gcode_lines(filepath=filepath, skipped_blocks=skipped_blocks)
+        return
+
+    progress_bar = ProgressBar(
+        name=f"Parsing {byte_ranges[-1][1] / 1e6:.1f} MB of {filepath.name} in {len(byte_ranges)} chunks"
+    )
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        chunks = _ordered_results(
+            executor=executor,
+            function=_tokenize_chunk,
+            arguments=((filepath, start, end, reader, layer_cue, skip_metadata) for start, end in byte_ranges),
+            window=n_workers + 1,
+        )
+
+        line_offset = 0
+        for i, (n_lines, arrays, chunk_skipped_blocks, _) in enumerate(chunks):
+            yield from _decode_chunk(arrays=arrays, line_offset=line_offset)
+            if skip_metadata:
+                skipped_blocks.extend(
+                    (name, first_line + line_offset, last_line + line_offset)
+                    for name, first_line, last_line in chunk_skipped_blocks
+                )
+            line_offset += n_lines
+            progress_bar.update((i + 1) / len(byte_ranges))
+
+
+def _chunk_state_table(
+    arrays: dict, initial_machine_setup: dict, virtual_machine: Optional[dict], line_offset: int
+) -> StateTable:
+    """
+    Run the virtual machine over an encoded chunk, executed in a worker process.
+
+    Args:
+        arrays: (dict) chunk encoded by `_encode_lines`
+        initial_machine_setup: (dict) setup with all keys of `default_virtual_machine`
+        virtual_machine: (dict or None) virtual machine at the beginning of the chunk from the prefix pass,
+            None for the first chunk
+        line_offset: (int) number of lines before the chunk
+
+    Returns:
+        table: (StateTable) the states of the chunk
+    """
+    line_dicts = _decode_chunk(arrays=arrays, line_offset=line_offset)
+    return StateTable.from_rows(
+        _machine_traveler(
+            line_dicts=line_dicts, initial_machine_setup=initial_machine_setup, virtual_machine=virtual_machine
+        )
+    )
+
+
+def _generate_state_table_parallel(
+    filepath: pathlib.Path,
+    initial_machine_setup: dict,
+    reader: str,
+    n_workers: int,
+    command_counts: dict,
+    skipped_blocks: list = None,
+) -> Optional[StateTable]:
+    """
+    Generate a state table by tokenizing and running the virtual machine over chunks of a file in parallel.
+
+    In a first pass, the workers tokenize the chunks and summarize them. A sequential prefix pass over the summaries
+    gives the virtual machine at the beginning of every chunk, see `_apply_chunk_summary`. In a second pass, the
+    workers run the virtual machine over the chunks from there. Both passes are pipelined through bounded windows
+    of pending chunks and the states are identical to the ones of a single process.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+        initial_machine_setup: (dict) dictionary with machine setup
+        reader: (str) "text" or "mmap", see `iter_states`
+        n_workers: (int) number of worker processes
+        command_counts: (dict) counts per unsupported command, updated in place
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion are skipped and
+            their (name, first_line, last_line) is appended, see `metadata_blocks`
+
+    Returns:
+        table: (StateTable) all states as columns, None if the file is too small to be split or the initial position
+            is not fully defined, which only a single process resolves
+    """
+    skip_metadata = skipped_blocks is not None
+    byte_ranges = _chunk_byte_ranges(filepath=filepath, n_chunks=4 * n_workers, skip_metadata=skip_metadata)
+    axes = ["X", "Y", "Z", "E"]
+    if len(byte_ranges) <= 1 or any(
+        initial_machine_setup.get(key, default_virtual_machine[key]) is None for key in axes
+    ):
+        return None
+
+    virtual_machine = _initial_virtual_machine(initial_machine_setup)
+    chunk_setup = {**initial_machine_setup, **{key: virtual_machine[key] for key in default_virtual_machine}}
+    layer_cue = initial_machine_setup.get("layer_cue", None)
+
+    progress_bar = ProgressBar(
+        name=f"Generating states of {byte_ranges[-1][1] / 1e6:.1f} MB of {filepath.name} in {len(byte_ranges)} chunks"
+    )
+
+    def iter_chunk_tables(executor: concurrent.futures.Executor) -> Iterator[StateTable]:
+        """Run both passes over the chunks and yield the state table of every chunk in order."""
+        virtual_machine = _initial_virtual_machine(initial_machine_setup)
+        chunks = _ordered_results(
+            executor=executor,
+            function=_tokenize_chunk,
+            arguments=(
+                (filepath, start, end, reader, layer_cue, skip_metadata, chunk_setup) for start, end in byte_ranges
+            ),
+            window=n_workers + 1,
+        )
+        pending = collections.deque()
+        line_offset = 0
+        for i, (n_lines, arrays, chunk_skipped_blocks, summary) in enumerate(chunks):
+            pending.append(
+                executor.submit(
+                    _chunk_state_table, arrays, chunk_setup, virtual_machine if i > 0 else None, line_offset
+                )
+            )
+            virtual_machine = _apply_chunk_summary(virtual_machine=virtual_machine, summary=summary)
+
+            for name, count in _count_encoded_unsupported_commands(arrays["command_names"], arrays["commands"]).items():
+                command_counts[name] = command_counts.get(name, 0) + count
+            if skip_metadata:
+                skipped_blocks.extend(
+                    (name, first_line + line_offset, last_line + line_offset)
+                    for name, first_line, last_line in chunk_skipped_blocks
+                )
+            line_offset += n_lines
+
+            while len(pending) > n_workers or (pending and i == len(byte_ranges) - 1):
+                yield pending.popleft().result()
+                progress_bar.update((i + 1 - len(pending)) / len(byte_ranges))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return StateTable.concatenate(iter_chunk_tables(executor=executor))
+
+
+def _read_gcode_to_dict_list(filepath: pathlib.Path) -> List[dict]:
+    """
+    Read gcode from .gcode file.
+
+    Args:
+        filepath: (Path) filepath of the .gcode file
+
+    Returns:
+        dict_list: (list[dict]) list with every line as dict
+    """
+    return list(_iter_gcode_lines(filepath=filepath))
 
 
 def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict) -> List[state]:
@@ -219,6 +1182,134 @@ def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict)
     Returns:
         state_list: (list[state]) all states in a list
 
+    """
+    return list(_state_traveler(line_dicts=line_dict_list, initial_machine_setup=initial_machine_setup))
+
+
+def _interpolate_arc(start: List[float], target: List[float], arc: dict, clockwise: bool, mm_per_arc_segment: float):
+    """Interpolate an arc in the XY plane with linear chords, like the firmware does.
+
+    The center is either given by the offset I, J from the start or by the radius R (negative for the longer arc).
+    P adds full circles. Z and E are interpolated linearly along the arc, which results in helical moves for Z.
+    The number of chords follows Marlin: floor(travel / mm_per_arc_segment), but at least one.
+
+    Args:
+        start: (list[float]) x, y, z, e at the start of the arc
+        target: (list[float]) x, y, z, e at the end of the arc
+        arc: (dict) arguments of the G2/G3 command
+        clockwise: (bool) True for G2, False for G3
+        mm_per_arc_segment: (float) length of the chords
+
+    Returns:
+        points: (np.ndarray) (n, 4) x, y, z, e of the chord ends between start and target, the target is excluded
+
+    Raises:
+        ValueError: if neither a center offset nor a valid radius is given
+    """
+    if "I" in arc or "J" in arc:
+        offset_x, offset_y = arc.get("I", 0.0), arc.get("J", 0.0)
+    elif "R" in arc and (start[0] != target[0] or start[1] != target[1]):
+        # center on the perpendicular bisector of the chord from start to target
+        half_x, half_y = (target[0] - start[0]) / 2, (target[1] - start[1]) / 2
+        half_length = math.hypot(half_x, half_y)
+        radius = arc["R"]
+        height = math.sqrt(max((radius - half_length) * (radius + half_length), 0.0))
+        direction = -1 if clockwise ^ (radius < 0) else 1
+        offset_x = half_x - half_y / half_length * direction * height
+        offset_y = half_y + half_x / half_length * direction * height
+    else:
+        raise ValueError(
+            "Arc move requires a center offset (I, J) or a radius (R) with a target different from the start."
+        )
+
+    if offset_x == 0 and offset_y == 0:
+        raise ValueError("Arc move with a center offset of zero cannot be interpolated.")
+
+    center_x, center_y = start[0] + offset_x, start[1] + offset_y
+    radius = math.hypot(offset_x, offset_y)
+    start_angle = math.atan2(-offset_y, -offset_x)
+
+    # angle between the vectors from the center to the start and to the target
+    target_x, target_y = target[0] - center_x, target[1] - center_y
+    angular_travel = math.atan2(-offset_x * target_y + offset_y * target_x, -offset_x * target_x - offset_y * target_y)
+    if angular_travel < 0:
+        angular_travel += 2 * math.pi
+    if clockwise:
+        angular_travel -= 2 * math.pi
+    if angular_travel == 0 and start[0] == target[0] and start[1] == target[1]:
+        angular_travel = 2 * math.pi  # full circle
+    angular_travel += math.copysign(2 * math.pi, angular_travel) * int(arc.get("P", 0.0))
+
+    travel = math.hypot(abs(angular_travel) * radius, target[2] - start[2])
+    n_segments = max(int(travel / mm_per_arc_segment), 1)
+
+    fractions = np.arange(1, n_segments) / n_segments
+    angles = start_angle + angular_travel * fractions
+    points = np.empty((n_segments - 1, 4))
+    points[:, 0] = center_x + radius * np.cos(angles)
+    points[:, 1] = center_y + radius * np.sin(angles)
+    points[:, 2] = start[2] + (target[2] - start[2]) * fractions
+    points[:, 3] = start[3] + (target[3] - start[3]) * fractions
+    return points
+
+
+def _initial_virtual_machine(initial_machine_setup: dict) -> dict:
+    """
+    Return the virtual machine before the first line, the defaults are used for values missing in the setup.
+
+    Args:
+        initial_machine_setup: (dict) dict with initial machine setup
+
+    Returns:
+        virtual_machine: (dict) machine coordinates, offsets through nulling, layer counter, modes and settings
+    """
+    virtual_machine = {
+        "X": 0,  # machine coordinates
+        "Y": 0,
+        "Z": 0,
+        "E": 0,
+        "_X": 0,  # offset through nulling
+        "_Y": 0,
+        "_Z": 0,
+        "_E": 0,
+        "layer": 0,  # number of layer cues
+    }  # keeping track of interstate values
+
+    # overwrite default values from initial machine setup
+    for key in default_virtual_machine:
+        if initial_machine_setup is not None and key in initial_machine_setup:
+            virtual_machine[key] = initial_machine_setup[key]
+        else:
+            custom_print(
+                f"The parameter '{key}' was not specified in your machine presets. "
+                f"Using the the default value of '{default_virtual_machine[key]}' to continue.",
+                lvl=3,
+            )
+            virtual_machine[key] = default_virtual_machine[key]
+    return virtual_machine
+
+
+def _machine_traveler(
+    line_dicts: Iterable[dict], initial_machine_setup: dict, virtual_machine: dict = None
+) -> Iterator[tuple]:
+    """
+    Run line dictionaries through a virtual machine and yield the resulting rows.
+
+    The rows contain plain values only, so they can either be turned into `state` objects or be stored in a
+    columnar `StateTable`.
+
+    Args:
+        line_dicts: (iterable[dict]) dicts with commands, e.g. a generator from `_iter_gcode_lines`
+        initial_machine_setup: (dict) dict with initial machine setup [absolute_position, absolute_extrusion, units, initial_position...]
+        virtual_machine: (dict, default = None) virtual machine before the first line with a fully defined position,
+            e.g. at the beginning of a chunk, see `_apply_chunk_summary`. By default, it is initialized from the setup
+            and the initial state is yielded first.
+
+    Yields:
+        row: (tuple) (line_number, [x, y, z, e], settings, comment, layer, pause) of each line, preceded by the
+            initial state if the initial position is defined. The settings are ordered like the arguments of
+            `state.p_settings`: (p_acc, jerk, vX, vY, vZ, vE, speed, units)
+
     """
     position_fully_defined = False
 
@@ -252,62 +1343,33 @@ def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict)
 
         return virtual_machine
 
-    state_list: List[state] = list()
-
     pos_keys = ["X", "Y", "Z"]
     ax_keys = pos_keys + ["E"]  # add E for extrusion
 
-    virtual_machine = {
-        "X": 0,  # machine coordinates
-        "Y": 0,
-        "Z": 0,
-        "E": 0,
-        "_X": 0,  # offset through nulling
-        "_Y": 0,
-        "_Z": 0,
-        "_E": 0,
-    }  # keeping track of interstate values
-
-    # optionally record layers
-    if "layer_cue" in initial_machine_setup:
-        layer_counter = 0
-
-    # overwrite default values from initial machine setup
-    for key in default_virtual_machine:
-        if initial_machine_setup is not None and key in initial_machine_setup:
-            virtual_machine[key] = initial_machine_setup[key]
-        else:
-            custom_print(
-                f"The parameter '{key}' was not specified in your machine presets. "
-                f"Using the the default value of '{default_virtual_machine[key]}' to continue.",
-                lvl=3,
+    if virtual_machine is None:
+        virtual_machine = _initial_virtual_machine(initial_machine_setup)
+
+        # create initial state only with initial position
+        if not any([virtual_machine[poskey] is None for poskey in pos_keys]):
+            # initial state creation
+            settings = (
+                virtual_machine["p_acc"],
+                virtual_machine["jerk"],
+                virtual_machine["vX"],
+                virtual_machine["vY"],
+                virtual_machine["vZ"],
+                virtual_machine["vE"],
+                virtual_machine["p_vel"],
+                "SI (mm)",
             )
-            virtual_machine[key] = default_virtual_machine[key]
-
-    # create initial state only with initial position
-    if not any([virtual_machine[poskey] is None for poskey in pos_keys]):
-        # initial state creation
-        state_position = position(apply_pos_offset(virtual_machine))
-
-        p_settings = state.p_settings(
-            speed=virtual_machine["p_vel"],
-            p_acc=virtual_machine["p_acc"],
-            jerk=virtual_machine["jerk"],
-            vX=virtual_machine["vX"],
-            vY=virtual_machine["vY"],
-            vZ=virtual_machine["vZ"],
-            vE=virtual_machine["vE"],
-        )
-        new_state = state(state_position=state_position, state_p_settings=p_settings)  # create new state
-
-        # add initial state comment
-        new_state.comment = "Initial state created by pyGCD."
-        new_state.line_number = None
+            yield None, apply_pos_offset(virtual_machine), settings, "Initial state created by pyGCD.", None, None
+    else:
+        virtual_machine = dict(virtual_machine)
 
-        state_list.append(new_state)
+    layer_counter = virtual_machine.pop("layer")  # only counted if a layer cue is used
 
     # GCode functionality:
-    for line_dict in line_dict_list:
+    for line_dict in line_dicts:
         # absolute / relative position mode
         if "G90" in line_dict:
             virtual_machine["absolute_position"] = True
@@ -326,9 +1388,16 @@ def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict)
         if "G21" in line_dict:
             virtual_machine["units"] = "SI (mm)"
 
+        # arcs start at the current position
+        arc_command = "G2" if "G2" in line_dict else "G3" if "G3" in line_dict else None
+        if arc_command is not None:
+            if not is_position_fully_defined(virtual_machine):
+                raise ValueError("Position is not fully defined, cannot apply arc movement.")
+            arc_start = [virtual_machine[key] for key in ax_keys]
+
         # position & velocity
-        movement_commands = ["G0", "G1"]
-        for command in movement_commands:  # treat G0 and G1 the same
+        movement_commands = ["G0", "G1", "G2", "G3"]
+        for command in movement_commands:  # treat G0, G1 and the arc end points the same
             if command in line_dict:
                 # look for xyz movement commands and apply abs/rel
                 for key in pos_keys:
@@ -351,6 +1420,21 @@ def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict)
                 if "F" in line_dict[command]:
                     virtual_machine["p_vel"] = line_dict[command]["F"] / 60
 
+        # interpolate arcs with chords
+        arc_points = None
+        if arc_command is not None:
+            try:
+                arc_points = _interpolate_arc(
+                    start=arc_start,
+                    target=[virtual_machine[key] for key in ax_keys],
+                    arc=line_dict[arc_command],
+                    clockwise=arc_command == "G2",
+                    mm_per_arc_segment=virtual_machine["mm_per_arc_segment"],
+                )
+            except ValueError as e:
+                raise ValueError(f"Line {line_dict['line_number']}: {e}") from e
+            arc_points += [virtual_machine[f"_{key}"] for key in ax_keys]  # apply offset through nulling
+
         # set position
         if "G92" in line_dict:
             for key in line_dict["G92"]:
@@ -393,47 +1477,164 @@ def _dict_list_traveler(line_dict_list: List[dict], initial_machine_setup: dict)
                 + "' to fully define position."
             )
 
-        state_position = position(apply_pos_offset(virtual_machine))
-        # position(
-        #     virtual_machine["X"] + virtual_machine["_X"],
-        #     virtual_machine["Y"] + virtual_machine["_Y"],
-        #     virtual_machine["Z"] + virtual_machine["_Z"],
-        #     virtual_machine["E"] + virtual_machine["_E"],
-        # )
-
-        p_settings = state.p_settings(
-            speed=virtual_machine["p_vel"],
-            p_acc=virtual_machine["p_acc"],
-            jerk=virtual_machine["jerk"],
-            vX=virtual_machine["vX"],
-            vY=virtual_machine["vY"],
-            vZ=virtual_machine["vZ"],
-            vE=virtual_machine["vE"],
-            units=virtual_machine["units"],
+        settings = (
+            virtual_machine["p_acc"],
+            virtual_machine["jerk"],
+            virtual_machine["vX"],
+            virtual_machine["vY"],
+            virtual_machine["vZ"],
+            virtual_machine["vE"],
+            virtual_machine["p_vel"],
+            virtual_machine["units"],
         )
-        new_state = state(state_position=state_position, state_p_settings=p_settings)  # create new state
 
         # parse comment
-        new_state.comment = line_dict[";"].strip() if ";" in line_dict else None
+        comment = line_dict[";"].strip() if ";" in line_dict else None
 
         # if layer cue is requested, count and add layers
+        layer = None
         if "layer_cue" in initial_machine_setup:
-            if new_state.comment is not None and initial_machine_setup["layer_cue"] == new_state.comment:
+            if comment is not None and initial_machine_setup["layer_cue"] == comment:
                 layer_counter += 1
-            new_state.layer = layer_counter
+            layer = layer_counter
+
+        # one row per chord of an arc, all belonging to the same line
+        if arc_points is not None:
+            for pos in arc_points.tolist():
+                yield line_dict["line_number"], pos, settings, comment, layer, None
+
+        yield line_dict["line_number"], apply_pos_offset(virtual_machine), settings, comment, layer, pause_duration
+
+
+def _state_traveler(line_dicts: Iterable[dict], initial_machine_setup: dict) -> Iterator[state]:
+    """
+    Convert line dictionaries to states one by one, by running them through a virtual machine.
+
+    Every state is linked to its predecessor before it is yielded.
+
+    Args:
+        line_dicts: (iterable[dict]) dicts with commands, e.g. a generator from `_iter_gcode_lines`
+        initial_machine_setup: (dict) dict with initial machine setup [absolute_position, absolute_extrusion, units, initial_position...]
+
+    Yields:
+        state: (state) the state of each line, preceded by the initial state if the initial position is defined
+
+    """
+    last_state = None
+    for line_number, pos, settings, comment, layer, pause in _machine_traveler(
+        line_dicts=line_dicts, initial_machine_setup=initial_machine_setup
+    ):
+        new_state = state(state_position=position(pos), state_p_settings=state.p_settings(*settings))
+        new_state.line_number = line_number
+        new_state.comment = comment
+        new_state.layer = layer
+        new_state.pause = pause
+
+        # link to the previous state
+        if last_state is not None:
+            new_state.prev_state = last_state
+            last_state.next_state = new_state
+
+        last_state = new_state
+        yield new_state
+
+
+def compact_states(states: Iterable[state]) -> Iterator[state]:
+    """Fold states without movement into the next state with movement.
+
+    Comment-only, blank and setting-only lines produce states at the position of their predecessor, which result
+    in empty planner blocks. Such states are dropped and their line number, comment and layer are attached to
+    the next kept state as `folded_lines`, in file order. The kept states are relinked, so planner blocks and
+    lookahead scale with the number of moves instead of the number of lines. Every printing setting is already
+    contained in the following state, which makes the resulting trajectory identical.
+    The first and the last state as well as states with a pause are always kept.
+
+    Args:
+        states: (iterable[state]) linked states, e.g. from `iter_states`
+
+    Yields:
+        state: (state) the kept states, linked to their kept predecessor
+
+    Example:
+    ```python
+    states = list(state_generator.compact_states(state_generator.iter_states(filepath, setup.get_dict())))
+    ```
+    """
+    last_kept = None
+    folded = []
+
+    for this_state in states:
+        if last_kept is not None and this_state.pause is None and this_state.state_position == last_kept.state_position:
+            folded.append(this_state)
+            continue
+
+        if last_kept is not None:
+            if folded:
+                this_state.folded_lines = [(s.line_number, s.comment, s.layer) for s in folded]
+                folded = []
+            this_state.prev_state = last_kept
+            last_kept.next_state = this_state
+        last_kept = this_state
+        yield this_state
+
+    # keep the last state, the states before it are folded into it
+    if folded:
+        last_state = folded.pop()
+        if folded:
+            last_state.folded_lines = [(s.line_number, s.comment, s.layer) for s in folded]
+        last_state.prev_state = last_kept
+        last_kept.next_state = last_state
+        last_state.next_state = None
+        yield last_state
+
+
+def _count_unsupported_commands(line_dicts: Iterable[dict], command_counts: dict) -> Iterator[dict]:
+    """Pass line dicts through while counting the known but unsupported commands in them.
+
+    Args:
+        line_dicts: (iterable[dict]) dicts with commands
+        command_counts: (dict) counts per unsupported command, updated in place
+
+    Yields:
+        line_dict: (dict) the unchanged line dicts
+    """
+    for line_dict in line_dicts:
+        for key in line_dict:
+            if key in unsupported_commands:
+                command_counts[key] = command_counts.get(key, 0) + 1
+        yield line_dict
+
+
+def _warn_unsupported_commands(command_counts: dict) -> None:
+    """Warn the user about the unsupported commands found in the G-code.
 
-        new_state.line_number = line_dict["line_number"]
+    Args:
+        command_counts: (dict) counts per unsupported command
+    """
+    if len(command_counts) > 0:
+        commands_str = ", ".join([f"'{key}' ({value} time(s))" for key, value in command_counts.items()])
+        custom_print(
+            f"⚠️  {len(command_counts.keys())} known but unsupported command(s) found: {commands_str}",
+            lvl=1,
+        )
+    else:
+        custom_print("Great, the G-code does not contain any unsupported commands known to pyGCD 🎈.")
 
-        # add pause time to state
-        new_state.pause = pause_duration
 
-        # populate state list
-        if len(state_list) > 0:
-            new_state.prev_state = state_list[-1]
-            state_list[-1].next_state = new_state
+def _report_skipped_blocks(skipped_blocks: list) -> None:
+    """Summarize the skipped comment blocks without motion.
 
-        state_list.append(new_state)
-    return state_list
+    Args:
+        skipped_blocks: (list) (name, first_line, last_line) of every skipped block, None if nothing was skipped
+    """
+    if skipped_blocks:
+        n_lines = sum(last_line - first_line + 1 for _, first_line, last_line in skipped_blocks)
+        blocks_str = ", ".join(
+            f"'{name}' (lines {first_line}-{last_line})" for name, first_line, last_line in skipped_blocks
+        )
+        custom_print(
+            f"Skipped {len(skipped_blocks)} comment block(s) without motion with {n_lines} lines: {blocks_str}"
+        )
 
 
 def _check_for_unsupported_commands(line_dict_list: dict) -> dict:
@@ -447,40 +1648,217 @@ def _check_for_unsupported_commands(line_dict_list: dict) -> dict:
     """
     # search for unsupported commands
     custom_print("Searching for known but unsupported G-code commands...")
-    unsupported_commands_found = []
-    for line_dict in line_dict_list:
-        for key in line_dict.keys():
-            if key in unsupported_commands.keys():
-                unsupported_commands_found.append(key)
-
-    unsupported_command_counts = {
-        command: unsupported_commands_found.count(command) for command in unsupported_commands_found
-    }
-
-    if unsupported_commands_found != []:
-        commands_str = ", ".join([f"'{key}' ({value} time(s))" for key, value in unsupported_command_counts.items()])
-        custom_print(
-            f"⚠️  {len(unsupported_command_counts.keys())} known but unsupported command(s) found: {commands_str}",
-            lvl=1,
+    unsupported_command_counts = {}
+    for _ in _count_unsupported_commands(line_dicts=line_dict_list, command_counts=unsupported_command_counts):
+        pass
+
+    _warn_unsupported_commands(command_counts=unsupported_command_counts)
+
+    return unsupported_command_counts
+
+
+def _check_reader(reader: str) -> None:
+    """Raise a ValueError if the reader is unknown."""
+    if reader not in ["text", "mmap"]:
+        raise ValueError(f"Unknown reader '{reader}', available readers are 'text' and 'mmap'.")
+
+
+def _iter_line_dicts(
+    filepath: pathlib.Path,
+    initial_machine_setup: dict,
+    reader: str,
+    n_workers: int,
+    command_counts: dict,
+    skipped_blocks: list = None,
+) -> Iterator[dict]:
+    """Select the reader and yield the line dicts of a file while counting unsupported commands.
+
+    Args:
+        filepath: (Path) filepath to GCode
+        initial_machine_setup: (dict) dictionary with machine setup
+        reader: (str) "text" or "mmap", see `iter_states`, ignored for compiled .pgcd files
+        n_workers: (int) number of processes tokenizing the file, None uses all CPUs
+        command_counts: (dict) counts per unsupported command, updated in place
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion are skipped and
+            their (name, first_line, last_line) is appended
+
+    Yields:
+        line_dict: (dict) every line as dict
+    """
+    _check_reader(reader=reader)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    layer_cue = initial_machine_setup.get("layer_cue", None)
+    if pathlib.Path(filepath).suffix == ".pgcd":
+        from .compiled_gcode import load_compiled_gcode
+
+        with load_compiled_gcode(pgcd_path=filepath) as compiled:
+            compiled_lines = lines = compiled.iter_line_dicts()
+            if skipped_blocks is not None:
+                lines = _skip_metadata_line_dicts(line_dicts=lines, skipped_blocks=skipped_blocks)
+            try:
+                yield from _count_unsupported_commands(line_dicts=lines, command_counts=command_counts)
+            finally:  # suspended generators hold views of the arrays, the file cannot be unmapped before they end
+                lines.close()
+                compiled_lines.close()
+        return
+
+    if n_workers > 1:
+        lines = _iter_gcode_lines_parallel(
+            filepath=filepath, n_workers=n_workers, reader=reader, layer_cue=layer_cue, skipped_blocks=skipped_blocks
         )
+    elif reader == "mmap":
+        lines = _iter_gcode_lines_mmap(filepath=filepath, layer_cue=layer_cue, skipped_blocks=skipped_blocks)
     else:
-        custom_print("Great, the G-code does not contain any unsupported commands known to pyGCD 🎈.")
+        lines = _iter_gcode_lines(filepath=filepath, skipped_blocks=skipped_blocks)
+
+    yield from _count_unsupported_commands(line_dicts=lines, command_counts=command_counts)
 
-    return unsupported_command_counts
 
+def iter_states(
+    filepath: pathlib.Path,
+    initial_machine_setup: dict,
+    reader: str = "text",
+    n_workers: int = 1,
+    skipped_blocks: list = None,
+) -> Iterator[state]:
+    """Generate states from a GCode file one by one.
 
-def generate_states(filepath: pathlib.Path, initial_machine_setup: dict) -> List[state]:
+    Reading, tokenizing and the virtual machine are chained generators, so no intermediate list of line dicts is
+    held in memory. Unsupported commands are reported once the file is exhausted.
+
+    Args:
+        filepath: (Path) filepath to GCode or to a compiled .pgcd file, see `compiled_gcode.compile_gcode`
+        initial_machine_setup: (dict) dictionary with machine setup
+        reader: (str, default = "text") "text" creates a state for every line, "mmap" memory maps the file and only
+            creates states for lines with commands, layer cues and feature type comments
+        n_workers: (int, default = 1) number of processes tokenizing the file in chunks, None uses all CPUs.
+            The states are identical to the ones of a single process.
+        skipped_blocks: (list, default = None) if a list is given, comment blocks without motion like thumbnails and
+            config dumps are skipped in bulk instead of creating a state per line. The list is filled with a
+            summary (name, first_line, last_line) of every skipped block, see `metadata_blocks`
+
+    Yields:
+        state: (state) every state, linked to its predecessor
+
+    Example:
+    ```python
+    for state in state_generator.iter_states(filepath=Path("part.gcode"), initial_machine_setup=setup.get_dict()):
+        print(state.state_position)
+    ```
+    """
+    unsupported_command_counts = {}
+    line_dicts = _iter_line_dicts(
+        filepath=filepath,
+        initial_machine_setup=initial_machine_setup,
+        reader=reader,
+        n_workers=n_workers,
+        command_counts=unsupported_command_counts,
+        skipped_blocks=skipped_blocks,
+    )
+    yield from _state_traveler(line_dicts=line_dicts, initial_machine_setup=initial_machine_setup)
+
+    _warn_unsupported_commands(command_counts=unsupported_command_counts)
+    _report_skipped_blocks(skipped_blocks=skipped_blocks)
+
+
+def generate_states(
+    filepath: pathlib.Path,
+    initial_machine_setup: dict,
+    reader: str = "text",
+    n_workers: int = 1,
+    skipped_blocks: list = None,
+) -> List[state]:
     """Generate state list from GCode file.
 
     Args:
         filepath: (Path) filepath to GCode
         initial_machine_setup: (dict) dictionary with machine setup
+        reader: (str, default = "text") G-code reader, "text" or "mmap", see `iter_states`
+        n_workers: (int, default = 1) number of processes tokenizing the file, None uses all CPUs
+        skipped_blocks: (list, default = None) skip comment blocks without motion and record them, see `iter_states`
 
     Returns:
         states: (list[states]) all states in a list
     """
-    line_dict_list = _read_gcode_to_dict_list(filepath=filepath)
-    _check_for_unsupported_commands(line_dict_list=line_dict_list)
-    states = _dict_list_traveler(line_dict_list=line_dict_list, initial_machine_setup=initial_machine_setup)
+    return list(
+        iter_states(
+            filepath=filepath,
+            initial_machine_setup=initial_machine_setup,
+            reader=reader,
+            n_workers=n_workers,
+            skipped_blocks=skipped_blocks,
+        )
+    )
+
+
+def generate_state_table(
+    filepath: pathlib.Path,
+    initial_machine_setup: dict,
+    reader: str = "text",
+    n_workers: int = 1,
+    skipped_blocks: list = None,
+) -> StateTable:
+    """Generate a columnar state table from GCode file, without creating a `state` object per line.
+
+    Args:
+        filepath: (Path) filepath to GCode or to a compiled .pgcd file. The states stored in a .pgcd file are used
+            if they match the setup and no blocks are skipped, see `compiled_gcode.compile_gcode`
+        initial_machine_setup: (dict) dictionary with machine setup
+        reader: (str, default = "text") G-code reader, "text" or "mmap", see `iter_states`
+        n_workers: (int, default = 1) number of processes tokenizing the file and running the virtual machine
+            over its chunks, None uses all CPUs, see `_generate_state_table_parallel`
+        skipped_blocks: (list, default = None) skip comment blocks without motion and record them, see `iter_states`
+
+    Returns:
+        table: (StateTable) all states as columns, `table.to_states()` gives the same states as `generate_states`
+
+    Example:
+    ```python
+    table = state_generator.generate_state_table(filepath=Path("part.gcode"), initial_machine_setup=setup.get_dict())
+    speeds = table.get_settings_column("speed")
+    ```
+    """
+    if pathlib.Path(filepath).suffix == ".pgcd" and skipped_blocks is None:
+        from .compiled_gcode import load_compiled_gcode
+
+        with load_compiled_gcode(pgcd_path=filepath) as compiled:
+            table = compiled.get_state_table(initial_machine_setup=initial_machine_setup)
+            if table is not None:
+                custom_print(f"Loaded {len(table)} states stored in {compiled.filepath.name}.")
+                _warn_unsupported_commands(command_counts=compiled.count_unsupported_commands())
+                return table
+
+    _check_reader(reader=reader)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    unsupported_command_counts = {}
+    table = None
+    if n_workers > 1 and pathlib.Path(filepath).suffix != ".pgcd":
+        table = _generate_state_table_parallel(
+            filepath=pathlib.Path(filepath),
+            initial_machine_setup=initial_machine_setup,
+            reader=reader,
+            n_workers=n_workers,
+            command_counts=unsupported_command_counts,
+            skipped_blocks=skipped_blocks,
+        )
+    if table is None:
+        line_dicts = _iter_line_dicts(
+            filepath=filepath,
+            initial_machine_setup=initial_machine_setup,
+            reader=reader,
+            n_workers=n_workers,
+            command_counts=unsupported_command_counts,
+            skipped_blocks=skipped_blocks,
+        )
+        table = StateTable.from_rows(
+            _machine_traveler(line_dicts=line_dicts, initial_machine_setup=initial_machine_setup)
+        )
+
+    _warn_unsupported_commands(command_counts=unsupported_command_counts)
+    _report_skipped_blocks(skipped_blocks=skipped_blocks)
 
-    return states
+    return table
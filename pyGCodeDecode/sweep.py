@@ -0,0 +1,223 @@
+"""Simulate one G-code with many printer setups.
+
+The G-code is compiled once to a .pgcd file, see `compiled_gcode`, so the text is parsed only once. Every setup
+variant is then simulated from the compiled file in a process pool, the variants are independent of each other.
+The sweep returns one row of summary values per variant, like `simulation.save_summary`.
+For the acceleration or the jerk alone, `print_time_axis` plans all values at once in this process instead.
+"""
+
+import concurrent.futures
+import contextlib
+import copy
+import csv
+import itertools
+import os
+import pathlib
+import tempfile
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+from pyGCodeDecode.helpers import (
+    ProgressBar,
+    custom_print,
+    get_verbosity_level,
+    set_verbosity_level,
+)
+
+from .compiled_gcode import compile_gcode
+from .gcode_interpreter import setup, simulation
+from .planner_block import batch_print_times
+from .state_generator import generate_state_table
+
+SUMMARY_KEYS = ["t_end", "x_min", "y_min", "z_min", "x_max", "y_max", "z_max", "max_extrusion_travel_velocity"]
+
+
+def variant_grid(parameters: dict) -> List[dict]:
+    """Create the variants of all combinations of setup parameter values.
+
+    Args:
+        parameters: (dict) values of every varied setup parameter, e.g. {"p_acc": [500, 1000], "jerk": [8, 10]}
+
+    Returns:
+        variants: (list[dict]) one dict of setup properties per combination, the last parameter varies fastest
+    """
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[name] for name in names))]
+
+
+def _simulate_variant(
+    pgcd_path: pathlib.Path,
+    variant_setup: setup,
+    lookahead: bool,
+    averages: Union[List[str], None],
+    output_unit_system: str,
+    verbosity_level: int,
+) -> dict:
+    """Simulate a setup variant and summarize it, executed in a worker process.
+
+    Args:
+        pgcd_path: (Path) compiled G-code
+        variant_setup: (setup) setup of the variant
+        lookahead: (bool) use the lookahead planner, see `simulation`
+        averages: (list[str] or None) names of the averaged results, None for all
+        output_unit_system: (str) unit system of the lengths and velocities
+        verbosity_level: (int) verbosity level of the simulation
+
+    Returns:
+        summary: (dict) print time, extent and maximum velocity while extruding and the averaged results
+    """
+    parent_verbosity_level = get_verbosity_level()
+    try:
+        sim = simulation(
+            gcode_path=pgcd_path,
+            initial_machine_setup=variant_setup,
+            output_unit_system=output_unit_system,
+            verbosity_level=verbosity_level,
+            lookahead=lookahead,
+        )
+    finally:
+        set_verbosity_level(parent_verbosity_level)
+
+    summary = dict.fromkeys(SUMMARY_KEYS, np.nan)
+    summary["t_end"] = float(sim.blocklist[-1].get_segments()[-1].t_end) if len(sim.blocklist) > 0 else 0.0
+    if any(block.is_extruding for block in sim.blocklist):
+        extent = sim.extrusion_extent()
+        for i, axis in enumerate(("x", "y", "z")):
+            summary[f"{axis}_min"] = float(extent[0, i])
+            summary[f"{axis}_max"] = float(extent[1, i])
+        summary["max_extrusion_travel_velocity"] = float(sim.extrusion_max_vel())
+    for name in sim.results if averages is None else averages:
+        value = sim.results.get(name)
+        summary[name] = float(value) if value is not None else np.nan
+    return summary
+
+
+def simulation_sweep(
+    gcode_path: pathlib.Path,
+    initial_machine_setup: setup,
+    variants: Iterable[dict],
+    n_workers: int = None,
+    lookahead: bool = False,
+    averages: List[str] = None,
+    output_unit_system: str = "SI (mm)",
+    cache_dir: pathlib.Path = None,
+) -> List[dict]:
+    """Simulate a G-code with every setup variant, parsing the G-code only once.
+
+    Args:
+        gcode_path: (Path) G-code or compiled .pgcd file
+        initial_machine_setup: (setup) base setup, every variant overwrites some of its properties
+        variants: (iterable[dict]) setup properties of every variant, see `setup.set_property` and `variant_grid`
+        n_workers: (int, default = None) number of worker processes, None uses all CPUs, 1 simulates in this process
+        lookahead: (bool, default = False) use the lookahead planner, see `simulation`
+        averages: (list[str], default = None) names of the averaged results in `simulation.results` to report,
+            None reports all
+        output_unit_system: (str, default = "SI (mm)") unit system of the lengths and velocities
+        cache_dir: (Path, default = None) directory of the compiled G-code, reused if it exists already,
+            a temporary directory is used if None, see `compiled_gcode.compile_gcode`
+
+    Returns:
+        rows: (list[dict]) one row per variant in order, with the variant properties, the print time `t_end`,
+            the extent and maximum velocity while extruding (NaN without extrusion) and the averaged results
+
+    Example:
+    ```python
+    rows = sweep.simulation_sweep(
+        gcode_path=Path("part.gcode"),
+        initial_machine_setup=printer_setup,
+        variants=sweep.variant_grid({"p_acc": [500, 1000, 2000], "firmware": ["prusa", "marlin"]}),
+    )
+    ```
+    """
+    variants = [dict(variant) for variant in variants]
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(variants)))
+    verbosity_level = min(get_verbosity_level(), 1)  # warnings of the variants only
+
+    variant_setups = []
+    for variant in variants:
+        variant_setup = copy.deepcopy(initial_machine_setup)
+        variant_setup.set_property(variant)
+        variant_setups.append(variant_setup)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gcode_path = pathlib.Path(gcode_path)
+        if gcode_path.suffix == ".pgcd":
+            pgcd_path = gcode_path
+        else:
+            pgcd_path = compile_gcode(
+                gcode_path=gcode_path,
+                cache_dir=tmp_dir if cache_dir is None else cache_dir,
+                # the lookahead planner reads the stored states, variants of the printing settings can share them
+                initial_machine_setup=initial_machine_setup.check_initial_setup() if lookahead else None,
+            )
+
+        bar = ProgressBar(name=f"Sweep of {len(variants)} setups with {n_workers} workers")
+        arguments = (
+            itertools.repeat(pgcd_path),
+            variant_setups,
+            itertools.repeat(lookahead),
+            itertools.repeat(averages),
+            itertools.repeat(output_unit_system),
+            itertools.repeat(verbosity_level),
+        )
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+        with pool or contextlib.nullcontext():
+            summaries = map(_simulate_variant, *arguments) if pool is None else pool.map(_simulate_variant, *arguments)
+            rows = []
+            for variant, summary in zip(variants, summaries):
+                rows.append({**variant, **summary})
+                bar.update(len(rows) / len(variants))
+
+    custom_print(f"Simulated {len(rows)} setup variants of {gcode_path.name}.")
+    return rows
+
+
+def print_time_axis(
+    gcode_path: pathlib.Path, initial_machine_setup: setup, parameter: str, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the print time and layer times for many values of the acceleration or the jerk at once.
+
+    The G-code is parsed once and all values are planned together with the lookahead planner, without segments,
+    see `planner_block.batch_print_times`. The values replace the setting of every state, including settings of the
+    G-code like M204.
+
+    Args:
+        gcode_path: (Path) G-code or compiled .pgcd file
+        initial_machine_setup: (setup) printer setup
+        parameter: (string) "p_acc" or "jerk"
+        values: (np.ndarray) (K,) values of the parameter
+
+    Returns:
+        print_times: (np.ndarray) (K,) print time for every value
+        layers: (np.ndarray) (m,) layer of the states, 0 without layer cue
+        layer_times: (np.ndarray) (m, K) time spent in every layer for every value
+
+    Example:
+    ```python
+    accelerations = np.linspace(500, 5000, 50)
+    print_times, _, _ = sweep.print_time_axis(Path("part.gcode"), printer_setup, "p_acc", accelerations)
+    ```
+    """
+    setup_dict = initial_machine_setup.check_initial_setup()
+    table = generate_state_table(filepath=pathlib.Path(gcode_path), initial_machine_setup=setup_dict)
+    return batch_print_times(states=table, firmware=setup_dict["firmware"], parameter=parameter, values=values)
+
+
+def save_sweep(rows: List[dict], filepath: pathlib.Path, delimiter: str = ","):
+    """Save the rows of a sweep to a csv-file.
+
+    Args:
+        rows: (list[dict]) rows of `simulation_sweep`
+        filepath: (Path) file name
+        delimiter: (string, default = ",") select delimiter
+    """
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    pathlib.Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    with open(file=filepath, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=delimiter)
+        writer.writeheader()
+        writer.writerows(rows)
+    custom_print(f"💾 Sweep written to 👉 {str(filepath)}")
@@ -238,7 +238,11 @@ def write_submodel_times(
     )  # define control volume
     timetable = []
 
-    for block in simulation.blocklist:
+    # only blocks with segments touching the control volume can cross its faces inside of it
+    plane_lim = np.asarray(control_volume.get_plane_lim())
+    rows, _, _ = simulation.get_spatial_index().in_box(box_min=plane_lim[:, 1] - 1e-6, box_max=plane_lim[:, 0] + 1e-6)
+    for block_id in np.unique(simulation.segment_table.block_id[rows]).tolist():
+        block = simulation.blocklist[block_id]
         p_eval_A = _point_eval(block.state_A.state_position.get_vec(), control_volume.get_plane_lim())
         p_eval_B = _point_eval(block.state_B.state_position.get_vec(), control_volume.get_plane_lim())
 
@@ -5,9 +5,12 @@ Utils for the GCode Reader contains:
 - vector 4D
     - velocity
     - position
+- segment
+- SegmentTable, the columnar storage of segments
 """
 
-from typing import TYPE_CHECKING, List, Optional, Union
+import math
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -15,6 +18,63 @@ if TYPE_CHECKING:
     from pyGCodeDecode.state import state
 
 
+def _row_norms(vectors: np.ndarray) -> np.ndarray:
+    """Return the norm of every row, bitwise identical to `np.linalg.norm` of the single rows.
+
+    Args:
+        vectors: (np.ndarray) (n, m) vectors
+
+    Returns:
+        norms: (np.ndarray) (n,) norms
+    """
+    return np.sqrt(_row_dots(vectors, vectors))
+
+
+def _vector_norm(vector) -> np.float64:
+    """Return the norm of a short vector, bitwise identical to `np.linalg.norm` but with less overhead.
+
+    Args:
+        vector: (list, tuple or np.ndarray) the vector
+
+    Returns:
+        norm: (np.float64) norm of the vector
+    """
+    vector = np.asarray(vector)
+    if vector.dtype != np.float64:
+        return np.linalg.norm(vector)  # conversion and errors as usual
+    # np.linalg.norm uses the same dot product, math.sqrt is correctly rounded like np.sqrt
+    return np.float64(math.sqrt(vector.dot(vector)))
+
+
+def _isclose(a: float, b: float, rtol: float = 1e-05, atol: float = 1e-08) -> bool:
+    """Return True if two scalars are close, with the result of `np.isclose` but without its array overhead.
+
+    Args:
+        a: (float) first value
+        b: (float) reference value
+        rtol: (float, default = 1e-05) relative tolerance, relative to b
+        atol: (float, default = 1e-08) absolute tolerance
+
+    Returns:
+        isclose: (bool) True if |a - b| <= atol + rtol * |b|
+    """
+    return bool(a == b or abs(a - b) <= atol + rtol * abs(b))
+
+
+def _row_dots(vectors_a: np.ndarray, vectors_b: np.ndarray) -> np.ndarray:
+    """Return the dot product of every pair of rows, bitwise identical to `np.dot` of the single rows.
+
+    Args:
+        vectors_a: (np.ndarray) (n, m) vectors
+        vectors_b: (np.ndarray) (n, m) vectors
+
+    Returns:
+        dots: (np.ndarray) (n,) dot products
+    """
+    # matmul uses the same summation as np.dot, a sum over the elementwise product can differ in the last bit
+    return np.matmul(vectors_a[:, None, :], vectors_b[:, :, None]).reshape(-1)
+
+
 class seconds(float):
     """A float subclass representing a time duration in seconds.
 
@@ -33,6 +93,8 @@ class seconds(float):
 
     """Time class for storing time, behaves like a float with additional methods."""
 
+    __slots__ = ()
+
     def __new__(cls, value):
         """Create a new instance of seconds."""
         return float.__new__(cls, value)
@@ -43,11 +105,17 @@ class seconds(float):
 
     def __sub__(self, other) -> "seconds":
         """Subtract seconds or float and return a new seconds instance."""
-        return seconds(float(self) - float(other))
+        value = float.__sub__(self, other)  # fast path for floats, seconds and ints
+        if value is NotImplemented:
+            value = float(self) - float(other)
+        return float.__new__(seconds, value)
 
     def __add__(self, other) -> "seconds":
         """Add seconds or float and return a new seconds instance."""
-        return seconds(float(self) + float(other))
+        value = float.__add__(self, other)
+        if value is NotImplemented:
+            value = float(self) + float(other)
+        return float.__new__(seconds, value)
 
     def __repr__(self) -> str:
         """Return a string representation of the seconds object."""
@@ -71,6 +139,8 @@ class vector_4D:
     - eq
     """
 
+    __slots__ = ("x", "y", "z", "e")
+
     def __init__(self, *args):
         """Store 3D position + extrusion axis.
 
@@ -78,20 +148,12 @@ class vector_4D:
             args: coordinates as arguments x,y,z,e or (tuple or list) [x,y,z,e]
 
         """
-        self.x = None
-        self.y = None
-        self.z = None
-        self.e = None
-
-        if isinstance(args[0], (tuple, list, np.ndarray)) and len(args) == 1 and len(args[0]) == 4:
-            args = tuple(args[0])
-        if len(args) == 4:
-            self.x = args[0]
-            self.y = args[1]
-            self.z = args[2]
-            self.e = args[3]
-        else:
-            raise ValueError("4D object requires x,y,z,e or [x,y,z,e] as input.")
+        if len(args) != 4:
+            if len(args) == 1 and isinstance(args[0], (tuple, list, np.ndarray)) and len(args[0]) == 4:
+                args = tuple(args[0])
+            else:
+                raise ValueError("4D object requires x,y,z,e or [x,y,z,e] as input.")
+        self.x, self.y, self.z, self.e = args
 
     def __str__(self) -> str:
         """Return string representation."""
@@ -111,17 +173,9 @@ class vector_4D:
             add: (self) component wise addition
         """
         if isinstance(other, self.__class__):
-            x = self.x + other.x
-            y = self.y + other.y
-            z = self.z + other.z
-            e = self.e + other.e
-            return self.__class__(x, y, z, e)
-        elif (isinstance(other, np.ndarray) or isinstance(other, list) or isinstance(other, tuple)) and len(other) == 4:
-            x = self.x + other[0]
-            y = self.y + other[1]
-            z = self.z + other[2]
-            e = self.e + other[3]
-            return self.__class__(x, y, z, e)
+            return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z, self.e + other.e)
+        elif isinstance(other, (np.ndarray, list, tuple)) and len(other) == 4:
+            return self.__class__(self.x + other[0], self.y + other[1], self.z + other[2], self.e + other[3])
         else:
             raise ValueError(
                 "Addition with __add__ is only possible with other 4D vector, 1x4 'list', 1x4 'tuple' or 1x4 'numpy.ndarray'"
@@ -138,17 +192,9 @@ class vector_4D:
             sub: (self) component wise subtraction
         """
         if isinstance(other, self.__class__):
-            x = self.x - other.x
-            y = self.y - other.y
-            z = self.z - other.z
-            e = self.e - other.e
-            return self.__class__(x, y, z, e)
-        elif (isinstance(other, np.ndarray) or isinstance(other, list) or isinstance(other, tuple)) and len(other) == 4:
-            x = self.x - other[0]
-            y = self.y - other[1]
-            z = self.z - other[2]
-            e = self.e - other[3]
-            return self.__class__(x, y, z, e)
+            return self.__class__(self.x - other.x, self.y - other.y, self.z - other.z, self.e - other.e)
+        elif isinstance(other, (np.ndarray, list, tuple)) and len(other) == 4:
+            return self.__class__(self.x - other[0], self.y - other[1], self.z - other[2], self.e - other[3])
         else:
             raise ValueError(
                 "Addition with __sub__ is only possible with other 4D vector, 1x4 'list', 1x4 'tuple' or 1x4 'numpy.ndarray'"
@@ -163,14 +209,9 @@ class vector_4D:
         Returns:
             mul: (self) scalar multiplication, scaling
         """
-        if isinstance(other, (float, int, np.floating, np.integer)):
-            x = self.x * other
-            y = self.y * other
-            z = self.z * other
-            e = self.e * other
-        else:
-            raise TypeError("Multiplication of 4D vectors only supports float and int.")
-        return self.__class__(x, y, z, e)
+        if type(other) is float or isinstance(other, (float, int, np.floating, np.integer)):
+            return self.__class__(self.x * other, self.y * other, self.z * other, self.e * other)
+        raise TypeError("Multiplication of 4D vectors only supports float and int.")
 
     def __truediv__(self, other):
         """Scalar division functionality for 4D Vectors.
@@ -181,14 +222,9 @@ class vector_4D:
         Returns:
             div: (self) scalar division, scaling
         """
-        if isinstance(other, (float, int, np.floating, np.integer)):
-            x = self.x / other
-            y = self.y / other
-            z = self.z / other
-            e = self.e / other
-        else:
-            raise TypeError("Division of 4D Vectors only supports float and int.")
-        return self.__class__(x, y, z, e)
+        if type(other) is float or isinstance(other, (float, int, np.floating, np.integer)):
+            return self.__class__(self.x / other, self.y / other, self.z / other, self.e / other)
+        raise TypeError("Division of 4D Vectors only supports float and int.")
 
     def __eq__(self, other) -> bool:
         """Check for equality and return True if equal.
@@ -251,12 +287,14 @@ class vector_4D:
         Returns:
             norm: (float) length/norm of 3D or 4D vector
         """
-        return np.linalg.norm(self.get_vec(withExtrusion=withExtrusion))
+        return _vector_norm(self.get_vec(withExtrusion=withExtrusion))
 
 
 class position(vector_4D):
     """4D - Position object for (Cartesian) 3D printer."""
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         """Print out position."""
         return "Position: " + super().__str__()
@@ -304,19 +342,15 @@ class position(vector_4D):
         """
         if other is None:
             other = position(0, 0, 0, 0)
-        return np.linalg.norm(
+        return _vector_norm(
             np.subtract(self.get_vec(withExtrusion=withExtrusion), other.get_vec(withExtrusion=withExtrusion))
         )
 
     def __truediv__(self, other):
         """Divide position by seconds to get velocity."""
         if isinstance(other, seconds):
-            return velocity(
-                self.x / other.seconds,
-                self.y / other.seconds,
-                self.z / other.seconds,
-                self.e / other.seconds,
-            )
+            dt = other.seconds
+            return velocity(self.x / dt, self.y / dt, self.z / dt, self.e / dt)
         else:
             return super().__truediv__(other)
 
@@ -324,6 +358,8 @@ class position(vector_4D):
 class velocity(vector_4D):
     """4D - Velocity object for (Cartesian) 3D printer."""
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         """Print out velocity."""
         return "velocity: " + super().__str__()
@@ -381,19 +417,10 @@ class velocity(vector_4D):
         """Multiply velocity by a time to get position, or by scalar."""
         if isinstance(other, seconds):
             # velocity * seconds = position
-            return position(
-                self.x * other.seconds,
-                self.y * other.seconds,
-                self.z * other.seconds,
-                self.e * other.seconds,
-            )
+            dt = other.seconds
+            return position(self.x * dt, self.y * dt, self.z * dt, self.e * dt)
         elif isinstance(other, (float, int, np.floating, np.integer)):
-            return self.__class__(
-                self.x * other,
-                self.y * other,
-                self.z * other,
-                self.e * other,
-            )
+            return self.__class__(self.x * other, self.y * other, self.z * other, self.e * other)
         else:
             raise TypeError("Multiplication only supports seconds, float, or int.")
 
@@ -401,12 +428,8 @@ class velocity(vector_4D):
         """Divide velocity by scalar."""
         if isinstance(other, seconds):
             # velocity / seconds = acceleration
-            return acceleration(
-                self.x / other.seconds,
-                self.y / other.seconds,
-                self.z / other.seconds,
-                self.e / other.seconds,
-            )
+            dt = other.seconds
+            return acceleration(self.x / dt, self.y / dt, self.z / dt, self.e / dt)
         else:
             return super().__truediv__(other)
 
@@ -414,6 +437,8 @@ class velocity(vector_4D):
 class acceleration(vector_4D):
     """4D - Acceleration object for (Cartesian) 3D printer."""
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         """Print out acceleration."""
         return "acceleration: " + super().__str__()
@@ -422,19 +447,10 @@ class acceleration(vector_4D):
         """Multiply acceleration by a time to get velocity, or by scalar."""
         if isinstance(other, seconds):
             # acceleration * time = velocity
-            return velocity(
-                self.x * other.seconds,
-                self.y * other.seconds,
-                self.z * other.seconds,
-                self.e * other.seconds,
-            )
+            dt = other.seconds
+            return velocity(self.x * dt, self.y * dt, self.z * dt, self.e * dt)
         elif isinstance(other, (float, int, np.floating, np.integer)):
-            return self.__class__(
-                self.x * other,
-                self.y * other,
-                self.z * other,
-                self.e * other,
-            )
+            return self.__class__(self.x * other, self.y * other, self.z * other, self.e * other)
         else:
             raise TypeError("Multiplication only supports seconds, float, or int.")
 
@@ -455,12 +471,15 @@ class segment:
     - get_velocity: returns the calculated Velocity for all axis at a given point in time
     - get_position: returns the calculated Position for all axis at a given point in time
     - get_segm_len: returns the length of the segment.
+    - get_time_by_dist: returns the time at a distance from the segment begin
 
     **Class method**
     - create_initial: returns the artificial initial segment where everything is at standstill, intervall length = 0
     - self_check: returns True if all self checks have been successfull
     """
 
+    __slots__ = ("t_begin", "t_end", "pos_begin", "pos_end", "vel_begin", "vel_end", "_result")
+
     def __init__(
         self,
         t_begin: Union[float, seconds],
@@ -489,7 +508,7 @@ class segment:
         self.vel_end: velocity = vel_end
         # self.self_check()
 
-        self.result = {}
+        self._result = None  # allocated on first use, see `result`
 
     def __str__(self) -> str:
         """Create string from segment."""
@@ -523,14 +542,53 @@ class segment:
         if t < self.t_begin or t > self.t_end:
             raise ValueError("Segment not defined for this point in time.")
         else:
-            delt_t = self.t_end - self.t_begin
-            if delt_t == 0:
+            if self.t_end == self.t_begin:
                 return self.vel_begin
-            # linear interpolation of velocity in Segment
-            delt_vel = self.vel_end - self.vel_begin
-            slope = delt_vel / delt_t
-            current_vel = self.vel_begin + (slope * (t - self.t_begin))
-            return current_vel
+            return velocity(*self.lerp_velocity(t=t))
+
+    def lerp_velocity(self, t: Union[float, seconds]) -> List[float]:
+        """Interpolate the velocity linearly, without checking the time or creating vector objects.
+
+        The result is identical to `get_velocity`, which computes the same operations per axis with vectors.
+
+        Args:
+            t: (float) time within the segment
+
+        Returns:
+            vel: (list[4]) velocity x, y, z, e at time t
+        """
+        return self._lerp(t=t)[1]
+
+    def lerp_position(self, t: Union[float, seconds]) -> List[float]:
+        """Integrate the linearly interpolated velocity, without checking the time or creating vector objects.
+
+        The result is identical to `get_position`, which computes the same operations per axis with vectors.
+
+        Args:
+            t: (float) time within the segment
+
+        Returns:
+            pos: (list[4]) position x, y, z, e at time t
+        """
+        vel_begin, vel_current, delt_t_local = self._lerp(t=t)
+        return [
+            p_begin + (v_begin + v_current) * delt_t_local / 2.0
+            for p_begin, v_begin, v_current in zip(self.pos_begin.get_vec(withExtrusion=True), vel_begin, vel_current)
+        ]
+
+    def _lerp(self, t: Union[float, seconds]) -> tuple:
+        """Return the begin velocity, the interpolated velocity and the local time of the segment at time t."""
+        t_begin = float(self.t_begin)
+        delt_t = float(self.t_end) - t_begin
+        delt_t_local = float(t) - t_begin
+        vel_begin = self.vel_begin.get_vec(withExtrusion=True)
+        if delt_t == 0:
+            return vel_begin, vel_begin, delt_t_local
+        vel_current = [
+            v_begin + (v_end - v_begin) / delt_t * delt_t_local
+            for v_begin, v_end in zip(vel_begin, self.vel_end.get_vec(withExtrusion=True))
+        ]
+        return vel_begin, vel_current, delt_t_local
 
     def get_velocity_by_dist(self, dist: float) -> float:
         """Return the velocity magnitude at a certain local segment distance.
@@ -546,6 +604,28 @@ class segment:
 
         return float(v)
 
+    def get_time_by_dist(self, dist: float) -> seconds:
+        """Return the time at a certain local segment distance.
+
+        The speed changes linearly in time, so the distance is quadratic in time. The quadratic is solved in closed
+        form as t = 2 * dist / (v_begin + sqrt(v_begin^2 + 2 * a * dist)), which holds for acceleration,
+        deceleration and constant speed.
+
+        Args:
+            dist: (float) distance from segment start
+
+        Returns:
+            t: (seconds) time at the distance, at most the end of the segment
+        """
+        duration = float(self.t_end) - float(self.t_begin)
+        if dist <= 0 or duration == 0:
+            return seconds(self.t_begin)
+        v_begin = self.vel_begin.get_norm()
+        a = (self.vel_end.get_norm() - v_begin) / duration
+        v_sq = 2 * a * dist + v_begin * v_begin
+        t_local = 2 * dist / (v_begin + np.sqrt(max(v_sq, 0.0)))
+        return seconds(float(self.t_begin) + min(t_local, duration))
+
     def get_position(self, t: Union[float, seconds]) -> position:
         """Get current position of segment at a certain time.
 
@@ -560,11 +640,8 @@ class segment:
         if t < self.t_begin or t > self.t_end:
             raise ValueError(f"Segment not defined for this point in time. {t} -->({self.t_begin}, {self.t_end})")
         else:
-            current_vel = self.get_velocity(t=t)
             # displacement = average velocity * dt
-            displacement_vec = ((self.vel_begin + current_vel) * (t - self.t_begin) / 2.0).get_vec(withExtrusion=True)
-            position_val = self.pos_begin + displacement_vec
-            return position_val
+            return position(*self.lerp_position(t=t))
 
     def get_segm_len(self) -> float:
         """Return the length of the segment."""
@@ -597,11 +674,11 @@ class segment:
 
         if p_settings is not None:
             # max velocity
-            if self.vel_begin.get_norm() > p_settings.speed and not np.isclose(
+            if self.vel_begin.get_norm() > p_settings.speed and not _isclose(
                 self.vel_begin.get_norm(), p_settings.speed
             ):
                 raise ValueError(f"Target Velocity of {p_settings.speed} exceeded with {self.vel_begin.get_norm()}.")
-            if self.vel_end.get_norm() > p_settings.speed and not np.isclose(self.vel_end.get_norm(), p_settings.speed):
+            if self.vel_end.get_norm() > p_settings.speed and not _isclose(self.vel_end.get_norm(), p_settings.speed):
                 raise ValueError(f"Target Velocity of {p_settings.speed} exceeded with {self.vel_end.get_norm()}.")
 
             # max acceleration
@@ -619,7 +696,7 @@ class segment:
                 scaled_atol = base_atol * dt_scale
                 acc_norm = acc.get_norm()
 
-                if acc_norm > p_settings.p_acc and not np.isclose(
+                if acc_norm > p_settings.p_acc and not _isclose(
                     acc_norm, p_settings.p_acc, rtol=scaled_rtol, atol=scaled_atol
                 ):
                     raise ValueError(
@@ -636,35 +713,12 @@ class segment:
         """
         return self.pos_begin.e < self.pos_end.e
 
-    def _interpolate_time_to_space(self, scalar_begin, scalar_end, x) -> float:
-        """
-        Interpolate from linear time dependant to nonlinear space dependant.
-
-        Args:
-            scalar_begin: (float) begin value
-            scalar_end: (float) end value
-            x: (float) x position
-        """
-
-        def lin_scalar(t):
-            slope = (scalar_end - scalar_begin) / (self.t_end - self.t_begin)
-            return slope * t + scalar_begin
-
-        def get_time(x):
-            a = (self.vel_end - self.vel_begin).get_norm() / (self.t_end - self.t_begin)
-            if a > 0:
-                v_sq = 2 * a * x + self.vel_begin.get_norm() ** 2
-                t = (np.sqrt(v_sq) - self.vel_begin.get_norm()) / a if v_sq > 0 else 0
-                if v_sq <= 0:
-                    raise ValueError("Could not map time dependant scalar to space.")
-            elif a == 0:
-                t = x / self.vel_begin.get_norm()
-            return t
-
-        t = get_time(x)
-        scalar = lin_scalar(t)
-
-        return scalar
+    @property
+    def result(self) -> dict:
+        """Results of the segment by name, the dict is created on first access."""
+        if self._result is None:
+            self._result = {}
+        return self._result
 
     def get_result(self, key: str):
         """Return the requested result.
@@ -693,3 +747,335 @@ class segment:
         velocity_0 = velocity(0, 0, 0, 0)
         pos_0 = position(0, 0, 0, 0) if initial_position is None else initial_position
         return cls(t_begin=0, t_end=0, pos_begin=pos_0, vel_begin=velocity_0, pos_end=pos_0, vel_end=velocity_0)
+
+
+class segment_view(segment):
+    """Segment stored in a row of a `SegmentTable`.
+
+    The view only holds the table and the row index. Its attributes are read from and written to the table columns,
+    so all `segment` methods work on the table without creating a segment object per row in advance.
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "SegmentTable", index: int):
+        """Initialize a view of a table row.
+
+        Args:
+            table: (SegmentTable) the table
+            index: (int) row of the segment
+        """
+        self.table = table
+        self.index = index
+
+    @property
+    def t_begin(self) -> seconds:
+        """Begin of segment."""
+        return seconds(self.table.t_begin[self.index])
+
+    @t_begin.setter
+    def t_begin(self, value: Union[float, seconds]):
+        self.table.t_begin[self.index] = value
+
+    @property
+    def t_end(self) -> seconds:
+        """End of segment."""
+        return seconds(self.table.t_end[self.index])
+
+    @t_end.setter
+    def t_end(self, value: Union[float, seconds]):
+        self.table.t_end[self.index] = value
+
+    @property
+    def pos_begin(self) -> position:
+        """Beginning position of segment."""
+        return position(self.table.pos_begin[self.index])
+
+    @pos_begin.setter
+    def pos_begin(self, value: position):
+        self.table.pos_begin[self.index] = value.get_vec(withExtrusion=True)
+
+    @property
+    def pos_end(self) -> position:
+        """Ending position of segment."""
+        return position(self.table.pos_end[self.index])
+
+    @pos_end.setter
+    def pos_end(self, value: position):
+        self.table.pos_end[self.index] = value.get_vec(withExtrusion=True)
+
+    @property
+    def vel_begin(self) -> velocity:
+        """Beginning velocity of segment."""
+        return velocity(self.table.vel_begin[self.index])
+
+    @vel_begin.setter
+    def vel_begin(self, value: velocity):
+        self.table.vel_begin[self.index] = value.get_vec(withExtrusion=True)
+
+    @property
+    def vel_end(self) -> velocity:
+        """Ending velocity of segment."""
+        return velocity(self.table.vel_end[self.index])
+
+    @vel_end.setter
+    def vel_end(self, value: velocity):
+        self.table.vel_end[self.index] = value.get_vec(withExtrusion=True)
+
+    @property
+    def result(self) -> "_result_row":
+        """Results of the segment, stored in the result columns of the table."""
+        return _result_row(table=self.table, index=self.index)
+
+
+class _result_row:
+    """Dict-like access to the results of one table row."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "SegmentTable", index: int):
+        """Initialize the result access of a table row."""
+        self.table = table
+        self.index = index
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the result column exists."""
+        return key in self.table.results
+
+    def __getitem__(self, key: str):
+        """Return the result of the row, a list for results with several values."""
+        value = self.table.results[key][self.index]
+        return value.tolist() if value.ndim > 0 else float(value)
+
+    def __setitem__(self, key: str, value):
+        """Store the result of the row in the result column, the column is created on first use."""
+        self.table.set_result(name=key, index=self.index, value=value)
+
+
+class SegmentTable:
+    """Columnar storage of segments backed by NumPy arrays.
+
+    Instead of one `segment` object with two `seconds` and four `vector_4D` objects per segment,
+    every attribute is stored in a contiguous column:
+
+    - `t_begin`, `t_end`: float64 arrays (n,)
+    - `pos_begin`, `pos_end`, `vel_begin`, `vel_end`: float64 arrays (n, 4) with x, y, z, e
+    - `block_id`: int64 array (n,) with the index of the planner block of every segment, ascending
+    - `results`: dict of named result columns, float64 arrays (n,) or (n, m)
+
+    `segment_view` objects give the usual segment interface for single rows.
+    """
+
+    def __init__(
+        self,
+        t_begin: np.ndarray,
+        t_end: np.ndarray,
+        pos_begin: np.ndarray,
+        pos_end: np.ndarray,
+        vel_begin: np.ndarray,
+        vel_end: np.ndarray,
+        block_id: np.ndarray,
+    ):
+        """Initialize a segment table from its columns.
+
+        Args:
+            t_begin: (np.ndarray) begin of every segment
+            t_end: (np.ndarray) end of every segment
+            pos_begin: (np.ndarray) beginning position of every segment
+            pos_end: (np.ndarray) ending position of every segment
+            vel_begin: (np.ndarray) beginning velocity of every segment
+            vel_end: (np.ndarray) ending velocity of every segment
+            block_id: (np.ndarray) ascending index of the planner block of every segment
+        """
+        self.t_begin = t_begin
+        self.t_end = t_end
+        self.pos_begin = pos_begin
+        self.pos_end = pos_end
+        self.vel_begin = vel_begin
+        self.vel_end = vel_end
+        self.block_id = block_id
+        self.results = {}
+        n_blocks = int(block_id[-1]) + 1 if len(block_id) > 0 else 0
+        self.block_offsets = np.searchsorted(block_id, np.arange(n_blocks + 1))  # rows of block i: [i, i + 1)
+        self._views = None
+
+    @classmethod
+    def from_segments(cls, segments: List[segment], block_id: np.ndarray = None) -> "SegmentTable":
+        """Create a segment table from segment objects.
+
+        Args:
+            segments: (list[segment]) the segments
+            block_id: (np.ndarray, default = None) index of the planner block of every segment, default all zero
+
+        Returns:
+            table: (SegmentTable) the segment table
+        """
+        n = len(segments)
+        table = cls(
+            t_begin=np.fromiter((segm.t_begin for segm in segments), dtype=np.float64, count=n),
+            t_end=np.fromiter((segm.t_end for segm in segments), dtype=np.float64, count=n),
+            pos_begin=np.array([segm.pos_begin.get_vec(withExtrusion=True) for segm in segments], float).reshape(-1, 4),
+            pos_end=np.array([segm.pos_end.get_vec(withExtrusion=True) for segm in segments], float).reshape(-1, 4),
+            vel_begin=np.array([segm.vel_begin.get_vec(withExtrusion=True) for segm in segments], float).reshape(-1, 4),
+            vel_end=np.array([segm.vel_end.get_vec(withExtrusion=True) for segm in segments], float).reshape(-1, 4),
+            block_id=np.zeros(n, dtype=np.int64) if block_id is None else np.asarray(block_id, dtype=np.int64),
+        )
+        for index, segm in enumerate(segments):
+            for name, value in segm.result.items():
+                table.set_result(name=name, index=index, value=value)
+        return table
+
+    def __len__(self) -> int:
+        """Return the number of segments."""
+        return len(self.t_begin)
+
+    def __getitem__(self, index: int) -> segment_view:
+        """Return the view of a single row."""
+        return self.get_segments()[index]
+
+    def get_segments(self, block_id: int = None) -> List[segment_view]:
+        """Return the views of all segments or of the segments of one planner block.
+
+        Args:
+            block_id: (int, default = None) index of the planner block, None for all segments
+
+        Returns:
+            segments: (list[segment_view]) views of the rows, created once per table
+        """
+        if self._views is None:
+            self._views = [segment_view(table=self, index=index) for index in range(len(self))]
+        if block_id is None:
+            return self._views
+        return self._views[self.block_slice(block_id)]
+
+    def block_slice(self, block_id: int) -> slice:
+        """Return the rows of a planner block.
+
+        Args:
+            block_id: (int) index of the planner block
+
+        Returns:
+            rows: (slice) rows of the segments of the block
+        """
+        return slice(int(self.block_offsets[block_id]), int(self.block_offsets[block_id + 1]))
+
+    def get_durations(self) -> np.ndarray:
+        """Return the duration of every segment."""
+        return self.t_end - self.t_begin
+
+    def get_lengths(self) -> np.ndarray:
+        """Return the travel length of every segment, like `segment.get_segm_len`."""
+        return _row_norms(self.pos_end[:, :3] - self.pos_begin[:, :3])
+
+    def is_extruding(self) -> np.ndarray:
+        """Return True for every positively extruding segment, like `segment.is_extruding`."""
+        return self.pos_begin[:, 3] < self.pos_end[:, 3]
+
+    def interpolate(self, rows: np.ndarray, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolate the velocity linearly and integrate the position of rows at times, like `segment._lerp`.
+
+        The operations are the same as for a single segment, so the results are identical to `segment.get_velocity`
+        and `segment.get_position`.
+
+        Args:
+            rows: (np.ndarray) (N,) row of every time
+            t: (np.ndarray) (N,) times within the segments of the rows
+
+        Returns:
+            vel: (np.ndarray) (N, 4) velocity x, y, z, e at the times
+            pos: (np.ndarray) (N, 4) position x, y, z, e at the times
+        """
+        t_begin = self.t_begin[rows]
+        delt_t = (self.t_end[rows] - t_begin)[:, np.newaxis]
+        delt_t_local = (t - t_begin)[:, np.newaxis]
+        vel_begin = self.vel_begin[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vel = vel_begin + (self.vel_end[rows] - vel_begin) / delt_t * delt_t_local
+        vel = np.where(delt_t == 0, vel_begin, vel)  # segments without duration keep the begin velocity
+        pos = self.pos_begin[rows] + (vel_begin + vel) * delt_t_local / 2.0
+        return vel, pos
+
+    def get_times_by_dist(self, rows: np.ndarray, dist: np.ndarray) -> np.ndarray:
+        """Return the times of rows at local distances from the segment begin, like `segment.get_time_by_dist`.
+
+        Args:
+            rows: (np.ndarray) (N,) row of every distance
+            dist: (np.ndarray) (N,) distances from the begin of the segments of the rows
+
+        Returns:
+            t: (np.ndarray) (N,) times at the distances, at most the end of the segments
+        """
+        t_begin = self.t_begin[rows]
+        duration = self.t_end[rows] - t_begin
+        v_begin = _row_norms(self.vel_begin[rows, :3])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = (_row_norms(self.vel_end[rows, :3]) - v_begin) / duration
+            v_sq = 2 * a * dist + v_begin * v_begin
+            t_local = 2 * dist / (v_begin + np.sqrt(np.maximum(v_sq, 0.0)))
+        t_local = np.where((dist <= 0) | (duration == 0), 0.0, np.minimum(t_local, duration))
+        return t_begin + t_local
+
+    def set_result(self, name: str, index: Union[int, slice, np.ndarray], value):
+        """Store a result, the column is created on first use and filled with NaN.
+
+        Args:
+            name: (str) name of the result
+            index: (int, slice or np.ndarray) rows to set
+            value: (float, list or np.ndarray) result of the rows
+        """
+        column = self.results.get(name)
+        if column is None:
+            shape = np.shape(value) if isinstance(index, (int, np.integer)) else np.shape(value)[1:]
+            column = self.results[name] = np.full((len(self),) + shape, np.nan)
+        column[index] = value
+
+    def replace_blocks(self, first_block: int, n_blocks: int, table: "SegmentTable"):
+        """Replace the rows of consecutive planner blocks by the rows of another table, e.g. of a re-planned window.
+
+        The block ids of the other table count from `first_block`, the block ids of the following rows are shifted by
+        the change in the number of blocks. Existing views of the following rows stay valid and point to their
+        shifted rows.
+
+        Args:
+            first_block: (int) index of the first replaced planner block
+            n_blocks: (int) number of replaced planner blocks
+            table: (SegmentTable) segments of the new planner blocks
+        """
+        end_block = first_block + n_blocks
+        start, stop = int(self.block_offsets[first_block]), int(self.block_offsets[end_block])
+        n_new_blocks = len(table.block_offsets) - 1
+
+        def splice(column: np.ndarray, new_rows: np.ndarray) -> np.ndarray:
+            return np.concatenate((column[:start], new_rows, column[stop:]))
+
+        for name in ("t_begin", "t_end", "pos_begin", "pos_end", "vel_begin", "vel_end"):
+            setattr(self, name, splice(getattr(self, name), getattr(table, name)))
+        self.block_id = np.concatenate(
+            (self.block_id[:start], table.block_id + first_block, self.block_id[stop:] + (n_new_blocks - n_blocks))
+        )
+        self.block_offsets = np.concatenate(
+            (
+                self.block_offsets[:first_block],
+                table.block_offsets[:-1] + start,
+                self.block_offsets[end_block:] + (len(table) - (stop - start)),
+            )
+        )
+
+        # results missing in one of the tables are NaN
+        for name in set(self.results) | set(table.results):
+            column = self.results.get(name)
+            new_rows = table.results.get(name)
+            if column is None:
+                column = np.full((stop - start + len(self) - len(table),) + new_rows.shape[1:], np.nan)
+            if new_rows is None:
+                new_rows = np.full((len(table),) + column.shape[1:], np.nan)
+            self.results[name] = splice(column, new_rows)
+
+        if self._views is not None:
+            following = self._views[stop:]
+            if len(table) != stop - start:
+                for view in following:
+                    view.index += len(table) - (stop - start)
+            self._views = (
+                self._views[:start] + [segment_view(table=self, index=start + i) for i in range(len(table))] + following
+            )
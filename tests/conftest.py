@@ -0,0 +1,27 @@
+"""Shared fixtures of the tests."""
+
+import pathlib
+
+import pytest
+
+from pyGCodeDecode.gcode_interpreter import setup, simulation
+
+
+@pytest.fixture
+def prusa_mini_setup() -> setup:
+    """Return the prusa_mini setup of the test presets."""
+    return setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+
+
+@pytest.fixture
+def square_gcode(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write a square with a dwell, a retraction and a travel move, return its path."""
+    gcode_path = tmp_path / "square.gcode"
+    gcode_path.write_text("G90\nM83\nG1 F3000\nG1 X10 E1\nG1 Y10 E1\nG4 P200\nG1 X0 E1\nG1 Y0 E0.5\nG1 E-1\nG1 X5\n")
+    return gcode_path
+
+
+@pytest.fixture
+def square_simulation(square_gcode: pathlib.Path, prusa_mini_setup: setup) -> simulation:
+    """Return the simulation of the square with the prusa_mini setup."""
+    return simulation(gcode_path=square_gcode, initial_machine_setup=prusa_mini_setup, verbosity_level=0)
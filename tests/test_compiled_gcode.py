@@ -0,0 +1,192 @@
+"""Test for the compiled G-code module."""
+
+import pathlib
+
+import numpy as np
+
+from pyGCodeDecode.compiled_gcode import PGCD_MAGIC, compile_gcode, load_compiled_gcode
+from pyGCodeDecode.gcode_interpreter import setup
+from pyGCodeDecode.state_generator import (
+    _iter_gcode_lines,
+    generate_state_table,
+    generate_states,
+)
+
+
+def test_compiled_gcode(tmp_path: pathlib.Path):
+    """Test that a compiled G-code yields the same line dicts and states as the source."""
+    gcode_path = pathlib.Path("./tests/data/test_state_generator.gcode")
+    pgcd_path = compile_gcode(gcode_path=gcode_path, pgcd_path=tmp_path / "test.pgcd")
+    compiled = load_compiled_gcode(pgcd_path=pgcd_path, gcode_path=gcode_path)
+
+    # same line dicts as the tokenizer, comments are stored stripped
+    reference = []
+    for line_dict in _iter_gcode_lines(filepath=gcode_path):
+        if ";" in line_dict:
+            line_dict[";"] = line_dict[";"].strip()
+        reference.append(line_dict)
+    assert list(compiled.iter_line_dicts(chunk_size=4)) == reference
+    assert len(compiled) == len(reference)
+
+    # same states when simulating the compiled file
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"),
+        printer="test",
+        layer_cue="LAYER cue",
+    )
+    states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+    compiled_states = generate_states(filepath=pgcd_path, initial_machine_setup=test_setup.get_dict())
+    assert len(compiled_states) == len(states)
+    for state, compiled_state in zip(states, compiled_states):
+        assert compiled_state.state_position.get_vec(withExtrusion=True) == state.state_position.get_vec(
+            withExtrusion=True
+        )
+        assert compiled_state.state_p_settings == state.state_p_settings
+        assert compiled_state.line_number == state.line_number
+        assert compiled_state.layer == state.layer
+        assert compiled_state.pause == state.pause
+
+    # cache directory: named after the content hash and reused
+    cached_path = compile_gcode(gcode_path=gcode_path, cache_dir=tmp_path / "cache")
+    assert cached_path.name == f"{compiled.source_hash}.pgcd"
+    modified_time = cached_path.stat().st_mtime_ns
+    assert compile_gcode(gcode_path=gcode_path, cache_dir=tmp_path / "cache") == cached_path
+    assert cached_path.stat().st_mtime_ns == modified_time
+
+    # compiling again replaces the file, a mapped old file stays valid and no temporary files are left
+    with load_compiled_gcode(pgcd_path=pgcd_path) as mapped:
+        assert compile_gcode(gcode_path=gcode_path, pgcd_path=pgcd_path) == pgcd_path
+        assert list(mapped.iter_line_dicts()) == reference
+    assert mapped.commands is None and mapped._buffer.closed
+    assert list(tmp_path.glob("**/*.tmp")) == []
+    compiled.close()
+
+    # source does not match
+    changed_gcode = tmp_path / "changed.gcode"
+    changed_gcode.write_text(gcode_path.read_text() + "G1 X1\n")
+    try:
+        load_compiled_gcode(pgcd_path=pgcd_path, gcode_path=changed_gcode)
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "was not compiled from" in str(e)
+
+    # wrong format version and no compiled file
+    data = bytearray(pgcd_path.read_bytes())
+    data[4] = 99
+    outdated_path = tmp_path / "outdated.pgcd"
+    outdated_path.write_bytes(bytes(data))
+    try:
+        load_compiled_gcode(pgcd_path=outdated_path)
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "format version 99" in str(e)
+
+    invalid_path = tmp_path / "invalid.pgcd"
+    invalid_path.write_bytes(b"G1 X1" + bytes(len(PGCD_MAGIC) * 4))
+    try:
+        load_compiled_gcode(pgcd_path=invalid_path)
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "no compiled G-code" in str(e)
+
+
+def test_stored_states(tmp_path: pathlib.Path):
+    """Test that the stored states give the same state table as the virtual machine for other printing settings."""
+    gcode_path = tmp_path / "modes.gcode"
+    gcode_path.write_text(
+        "M204 P1250\nG28\nG90\nM82\nG1 X1 Y1 Z0.2 F1200\nM204 P900\n;LAYER_CHANGE\nG1 X5 E1.5 F2100\n"
+        "M203 X120 Y150\nM205 X8\nG91\nG1 X1 Y1 E0.2\nG90\nG92 E0\nM83\nG2 X10 Y5 I2 J0 E0.3\nG4 P250\n"
+        "G20\nG1 X0.5 F35\nG21\n;LAYER_CHANGE\nM204 P1250\nG1 Z0.4 F2100 ; move\nG29\n"
+    )
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"),
+        printer="prusa_mini",
+        layer_cue="LAYER_CHANGE",
+    ).check_initial_setup()
+    pgcd_path = compile_gcode(
+        gcode_path=gcode_path, pgcd_path=tmp_path / "modes.pgcd", initial_machine_setup=test_setup
+    )
+
+    # other printing settings are filled in, equal settings rows are merged like in the virtual machine
+    for variant in ({}, {"p_acc": 900.0, "jerk": 8, "units": "inch"}, {"X": 5.0}, {"layer_cue": None}):
+        variant_setup = {**test_setup, **variant}
+        table = generate_state_table(filepath=gcode_path, initial_machine_setup=variant_setup)
+        with load_compiled_gcode(pgcd_path=pgcd_path) as compiled:
+            stored_table = compiled.get_state_table(initial_machine_setup=variant_setup)
+            assert (stored_table is None) == ("X" in variant or "layer_cue" in variant)
+            assert compiled.count_unsupported_commands() == {"G28": 1, "G29": 1}
+        compiled_table = generate_state_table(filepath=pgcd_path, initial_machine_setup=variant_setup)
+        assert compiled_table.settings_rows == table.settings_rows
+        assert [type(value) for row in compiled_table.settings_rows for value in row] == [
+            type(value) for row in table.settings_rows for value in row
+        ]
+        for name in ("position", "settings_index", "line_number", "layer", "pause", "comment_index"):
+            assert np.array_equal(getattr(compiled_table, name), getattr(table, name), equal_nan=True), name
+        assert compiled_table.comments == table.comments
+
+    # a cached file without the states of a setup is compiled again
+    cached_path = compile_gcode(gcode_path=gcode_path, cache_dir=tmp_path / "cache")
+    with load_compiled_gcode(pgcd_path=cached_path) as compiled:
+        assert compiled.state_setup is None and compiled.get_state_table(initial_machine_setup=test_setup) is None
+    compile_gcode(gcode_path=gcode_path, cache_dir=tmp_path / "cache", initial_machine_setup=test_setup)
+    with load_compiled_gcode(pgcd_path=cached_path) as compiled:
+        assert compiled.state_setup["layer_cue"] == "LAYER_CHANGE"
+
+
+def test_close_early(tmp_path: pathlib.Path, monkeypatch):
+    """Test that the memory map is closed when the states of a compiled file are not read to the end."""
+    import sys
+
+    import pyGCodeDecode.compiled_gcode as compiled_gcode_module
+    from pyGCodeDecode.state_generator import iter_states
+
+    gcode_path = tmp_path / "early.gcode"
+    gcode_path.write_text("G90\nM83\n;TYPE:Skirt\n" + "".join(f"G1 X{i} Y{i % 3} E0.1 F1200\n" for i in range(50)))
+    pgcd_path = compile_gcode(gcode_path=gcode_path, pgcd_path=tmp_path / "early.pgcd")
+    test_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test")
+
+    loaded = []
+    unraisable = []
+    monkeypatch.setattr(
+        compiled_gcode_module,
+        "load_compiled_gcode",
+        lambda **kwargs: loaded.append(load_compiled_gcode(**kwargs)) or loaded[-1],
+    )
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+
+    # stream closed by the consumer, with and without the metadata filter
+    for skipped_blocks in [None, []]:
+        states = iter_states(
+            filepath=pgcd_path, initial_machine_setup=test_setup.get_dict(), skipped_blocks=skipped_blocks
+        )
+        next(states)
+        next(states)
+        states.close()
+        assert loaded[-1]._buffer.closed
+
+    # consumer fails partway
+    states = iter_states(filepath=pgcd_path, initial_machine_setup=test_setup.get_dict())
+    next(states)
+    try:
+        states.throw(KeyError("consumer"))
+        assert False, "Expected KeyError was not raised."
+    except KeyError:
+        assert loaded[-1]._buffer.closed
+
+    # decoding fails partway, the error is not replaced by failing to unmap the file
+    decode_lines = compiled_gcode_module._decode_lines
+
+    def failing_decode_lines(**kwargs):
+        for i, line_dict in enumerate(decode_lines(**kwargs)):
+            if i == 5:
+                raise ValueError("corrupt line")
+            yield line_dict
+
+    monkeypatch.setattr(compiled_gcode_module, "_decode_lines", failing_decode_lines)
+    try:
+        list(iter_states(filepath=pgcd_path, initial_machine_setup=test_setup.get_dict()))
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "corrupt line" in str(e)
+        assert loaded[-1]._buffer.closed
+    assert unraisable == []
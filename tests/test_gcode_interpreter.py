@@ -140,3 +140,217 @@ def test_simulation_class():
     t_ges = t_100mm * 2 + t_10mm * 4 + t_02mm
     t_end_sim = simulation.blocklist[-1].get_segments()[-1].t_end
     assert abs(t_ges - t_end_sim) < 0.001
+
+
+def test_update_timeline(tmp_path):
+    """Test the block timeline derived from the cumulative sum of the block durations."""
+    import numpy as np
+
+    from pyGCodeDecode.gcode_interpreter import setup, simulation, update_timeline
+
+    simulation_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+    gcode_path = tmp_path / "square.gcode"
+    gcode_path.write_text("G90\nM83\nG1 F3000\nG1 X10 E1\nG1 Y10 E1\nG4 P200\nG1 X0 E1\nG1 Y0 E1\n")
+    sim = simulation(gcode_path=gcode_path, initial_machine_setup=simulation_setup, verbosity_level=0)
+    blocklist = sim.blocklist
+    times = [(segm.t_begin, segm.t_end) for block in blocklist for segm in block.get_segments()]
+
+    # the blocks are back to back, and the timeline ends with the print time
+    t_begin = update_timeline(blocklist)
+    assert t_begin.tolist() == [block.t_begin for block in blocklist] + [times[-1][1]]
+    assert np.isclose(t_begin[-1], sum(block.duration for block in blocklist))
+
+    # a shift only changes the begin time of the block, its segments follow when accessed
+    blocklist[1].timeshift(delta_t=2.5)
+    assert blocklist[1].t_begin == t_begin[1] + 2.5
+    assert np.isclose(blocklist[1].get_segments()[0].t_begin, times[len(blocklist[0].get_segments())][0] + 2.5)
+
+    # updating the timeline closes the gap again and keeps all durations
+    update_timeline(blocklist)
+    assert np.allclose([(segm.t_begin, segm.t_end) for block in blocklist for segm in block.get_segments()], times)
+
+
+def test_update_states(tmp_path):
+    """Test the incremental update of a window of states against planning all states again."""
+    import numpy as np
+
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+    from pyGCodeDecode.state import state
+
+    simulation_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+    gcode_path = tmp_path / "retractions.gcode"
+    square = "G1 X{0} Y{0} E1\nG1 X{1} Y{0} E1\nG1 X{1} Y{1} E1\nG1 X{0} Y{1} E1\nG1 X{0} Y{0} E1\n"
+    gcode_path.write_text(
+        "G90\nM83\nG1 F3000\n"
+        + "".join(square.format(10 * i, 10 * i + 8) + "G1 E-1\nG1 F6000\nG4 P100\nG1 E1 F3000\n" for i in range(6))
+    )
+
+    def slower(this_state: state) -> state:
+        settings = this_state.state_p_settings.as_tuple()
+        new_state = state(
+            state_position=this_state.state_position,
+            state_p_settings=state.p_settings(*settings[:6], speed=settings[6] / 3, units=settings[7]),
+        )
+        new_state.pause = this_state.pause
+        return new_state
+
+    for lookahead in (False, True):
+        sim = simulation(
+            gcode_path=gcode_path, initial_machine_setup=simulation_setup, verbosity_level=0, lookahead=lookahead
+        )
+        reference = simulation(
+            gcode_path=gcode_path, initial_machine_setup=simulation_setup, verbosity_level=0, lookahead=lookahead
+        )
+        print_time = sim.blocklist[-1].get_segments()[-1].t_end
+
+        # slow down the third square, only the blocks between the neighboring retractions are planned again
+        start = next(i for i, this_state in enumerate(sim.states) if this_state.state_position.get_vec()[0] == 20)
+        new_states = [slower(this_state) for this_state in sim.states[start:][:4]]
+        first_block, end_block = sim.update_states(start=start, end=start + 4, new_states=new_states)
+        assert 0 < first_block < end_block < len(sim.blocklist) - 1
+        assert sim.blocklist[-1].get_segments()[-1].t_end > print_time
+
+        # remove a corner and insert it again
+        sim.update_states(start + 8, start + 9, [])
+        sim.update_states(start + 8, start + 8, [slower(reference.states[start + 8])])
+
+        # identical velocity profile, times and positions up to the rounding of the time offset
+        reference.refresh(new_state_list=list(sim.states))
+        assert [block.state_B for block in sim.blocklist] == [block.state_B for block in reference.blocklist]
+        assert [block.blocktype for block in sim.blocklist] == [block.blocktype for block in reference.blocklist]
+        table, reference_table = sim.segment_table, reference.segment_table
+        assert np.array_equal(table.block_id, reference_table.block_id)
+        assert np.array_equal(table.vel_begin, reference_table.vel_begin)
+        assert np.array_equal(table.vel_end, reference_table.vel_end)
+        for column in ("t_begin", "t_end", "pos_begin", "pos_end"):
+            assert np.allclose(getattr(table, column), getattr(reference_table, column), rtol=0, atol=1e-9)
+        assert [segm.index for block in sim.blocklist for segm in block.get_segments()] == list(range(len(table)))
+        assert np.allclose([block.t_begin for block in sim.blocklist], table.t_begin[table.block_offsets[:-1]])
+        assert not np.isnan(table.results["velocity"]).any()
+
+    try:
+        sim.update_states(5, 4, [])
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "Invalid range" in str(e)
+
+
+def test_get_values(square_simulation):
+    """Test the search of the segment at a time in any order and after a refresh."""
+    import numpy as np
+
+    from pyGCodeDecode.gcode_interpreter import unpack_blocklist
+
+    sim = square_simulation
+
+    def expected(t: float):
+        segm = next(segm for segm in unpack_blocklist(sim.blocklist) if segm.t_begin <= t <= segm.t_end)
+        return segm.get_velocity(t=t).get_vec(withExtrusion=True), segm.get_position(t=t).get_vec(withExtrusion=True)
+
+    t_end = unpack_blocklist(sim.blocklist)[-1].t_end
+    for t in np.random.default_rng(0).permutation(np.linspace(0, t_end, 101)).tolist():
+        vel, pos = sim.get_values(t=t)
+        assert np.allclose(vel, expected(t)[0], rtol=0, atol=1e-12)
+        assert np.allclose(pos, expected(t)[1], rtol=0, atol=1e-12)
+    assert np.allclose(sim.get_values(t=t_end)[1], [5.0, 0.0, 0.0, 2.5])
+    assert sim.get_values(t=1.0, output_unit_system="SI")[1] == [1e-3 * pos for pos in sim.get_values(t=1.0)[1]]
+
+    # the index is built again for the new trajectory
+    sim.refresh(new_state_list=sim.states[:-1])
+    assert np.allclose(sim.get_values(t=unpack_blocklist(sim.blocklist)[-1].t_end)[1], [0.0, 0.0, 0.0, 2.5])
+    try:
+        sim.get_values(t=t_end)
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "No segment" in str(e)
+
+
+def test_get_values_batch(square_simulation):
+    """Test the batch evaluation at many times against get_values."""
+    import numpy as np
+
+    sim = square_simulation
+
+    table = sim.segment_table
+    times = np.concatenate((np.random.default_rng(0).uniform(0, table.t_end[-1], 500), table.t_begin, table.t_end))
+    for output_unit_system in (None, "SI", "inch"):
+        vel, pos = sim.get_values_batch(times=times, output_unit_system=output_unit_system)
+        assert vel.shape == pos.shape == (len(times), 4)
+        values = [sim.get_values(t=t, output_unit_system=output_unit_system) for t in times.tolist()]
+        assert np.array_equal(vel, [value[0] for value in values])
+        assert np.array_equal(pos, [value[1] for value in values])
+    assert sim.get_values_batch(times=np.array([]))[0].shape == (0, 4)
+
+    try:
+        sim.get_values_batch(times=np.array([1.0, -1.0]))
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "-1.0" in str(e)
+
+
+def test_resample(tmp_path, square_simulation):
+    """Test the fixed rate samples in chunks and in files against the batch evaluation."""
+    import numpy as np
+
+    from pyGCodeDecode.gcode_interpreter import RESAMPLED_DTYPE
+
+    sim = square_simulation
+    t_end = sim.segment_table.t_end[-1]
+
+    chunks = list(sim.resample(rate=1000, chunk_size=300, output_unit_system="SI"))
+    assert [len(chunk[0]) for chunk in chunks[:-1]] == [300] * (len(chunks) - 1)
+    t, pos, vel, extruding = (np.concatenate(column) for column in zip(*chunks))
+    assert len(t) == int(np.floor(t_end * 1000)) + 1 and t[0] == 0 and t[-1] <= t_end
+    assert np.allclose(np.diff(t), 1e-3, rtol=0, atol=1e-12)
+    batch_vel, batch_pos = sim.get_values_batch(times=t, output_unit_system="SI")
+    assert np.array_equal(pos, batch_pos) and np.array_equal(vel, batch_vel)
+    assert extruding[0] and not extruding[-1]  # printing the square, then traveling
+
+    for filename in ("samples.npy", "samples.bin"):
+        sim.save_resampled(filepath=tmp_path / filename, rate=1000, chunk_size=300, output_unit_system="SI")
+        if filename.endswith(".npy"):
+            records = np.load(tmp_path / filename)
+        else:
+            records = np.fromfile(tmp_path / filename, dtype=RESAMPLED_DTYPE)
+        assert records.dtype == RESAMPLED_DTYPE
+        assert np.array_equal(records["t"], t) and np.array_equal(records["pos"], pos)
+        assert np.array_equal(records["vel"], vel) and np.array_equal(records["extruding"], extruding)
+
+    try:
+        next(sim.resample(rate=0))
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "rate" in str(e)
+
+
+def test_values_by_distance(square_simulation):
+    """Test the time and values after traveled distances against the traveled path."""
+    import numpy as np
+
+    sim = square_simulation
+    table = sim.segment_table
+
+    # the square and the travel back to x = 5
+    distances = np.concatenate((np.random.default_rng(0).uniform(0, 45, 500), [0, 10, 20, 25, 45]))
+    t = sim.time_at_distance(distances=distances)
+    vel, pos = sim.get_values_by_distance(distances=distances)
+    assert np.array_equal(pos, sim.get_values_batch(times=t)[1])
+    assert np.all(np.diff(t[np.argsort(distances)]) >= 0)
+    rows = np.searchsorted(table.t_end, t, side="left")
+    traveled = np.cumsum(table.get_lengths())[rows] - np.linalg.norm(table.pos_end[rows, :3] - pos[:, :3], axis=1)
+    assert np.allclose(traveled, distances, rtol=0, atol=1e-9)
+    assert np.allclose(pos[-4:, :2], [[10, 0], [10, 10], [5, 10], [5, 0]])
+    assert np.isclose(t[-1], table.t_end[-1], rtol=0, atol=1e-6)  # time is sensitive at the stop
+    assert np.array_equal(sim.time_at_distance(distances=[1e-3 * 25], output_unit_system="SI"), t[-2:-1])
+
+    # a planner block reaches its whole length at its end, also when decelerating
+    for block in sim.blocklist:
+        block_length = sum(segm.get_segm_len() for segm in block.get_segments())
+        if block_length > 0:
+            assert np.isclose(block.inverse_time_at_pos(block_length), block.get_segments()[-1].t_end)
+
+    try:
+        sim.time_at_distance(distances=[46.0])
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "46.0" in str(e)
@@ -12,6 +12,7 @@ import numpy as np
 from pyGCodeDecode.gcode_interpreter import generate_planner_blocks
 from pyGCodeDecode.junction_handling import (
     _get_handler_names,
+    batch_junction_velocities,
     get_handler,
     junction_handling,
 )
@@ -235,6 +236,58 @@ def test_junction_handling_state_connect():
     # TODO assert states are connected correctly
 
 
+def test_batch_junction_velocities(tmp_path):
+    """Test that the batch junction velocities are identical to the junction handler objects."""
+    from pyGCodeDecode.gcode_interpreter import setup
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"),
+        printer="prusa_mini",
+        layer_cue="LAYER cue",
+    )
+
+    # random walk with corners, reversals, z and extrusion only moves, repeated positions and setting changes
+    rng = np.random.default_rng(seed=0)
+    lines = ["G21", "G90", "M83", "G1 F3000"]
+    for i in range(2000):
+        choice = rng.integers(10)
+        x, y = rng.uniform(0, 100, size=2).round(3)
+        if choice < 5:
+            lines.append(f"G1 X{x} Y{y} E{rng.uniform(0, 2):.4f}")
+        elif choice == 5:
+            lines.append(f"G1 Z{rng.uniform(0, 1):.2f} F{rng.integers(600, 9000)}")
+        elif choice == 6:
+            lines.append(f"G1 E{rng.uniform(-1, 1):.3f}")
+        elif choice == 7:
+            lines.extend([f"G0 X{x} Y{y}", f"G1 X{x} Y{y}", "M400"])
+        elif choice == 8:
+            lines.append(f"M204 P{rng.integers(1, 2000)}")
+        else:
+            lines.append(f"M205 X{rng.integers(0, 15)}")
+    gcode_path = tmp_path / "random_walk.gcode"
+    gcode_path.write_text("\n".join(lines) + "\n")
+    states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+
+    # include the dummy states of the angle sweep, with and without a following move
+    stateA, stateB, stateC = _initialize_dummy_states(p_acc=1000, jerk=10, speed=50)
+    stateA.state_position = position(0, 0, 0, 0)
+    stateB.state_position = position(50, 0, 0, 0)
+    stateC.state_position = position(50 + 50 * math.cos(math.radians(35)), 50 * math.sin(math.radians(35)), 0, 0)
+    stateD, stateE, _ = _initialize_dummy_states(p_acc=1000, jerk=10, speed=50)
+    stateD.state_position = position(0, 0, 0, 0)
+    stateE.state_position = position(50, 0, 0, 0)
+    stateE.next_state = None
+
+    for firmware in _get_handler_names() + ["unknown"]:
+        handler = get_handler(firmware)
+        for test_states in (states, [stateA, stateB, stateC], [stateD, stateE]):
+            target_vels, junction_vels = batch_junction_velocities(states=test_states, firmware=firmware)
+            for i, this_state in enumerate(test_states):
+                junction = handler(state_A=this_state.prev_state if i > 0 else None, state_B=this_state)
+                assert target_vels[i].tolist() == junction.get_target_vel().get_vec(withExtrusion=True)
+                assert junction_vels[i] == junction.get_junction_vel(), f"{firmware}: junction {i} differs"
+
+
 if __name__ == "__main__":
     test_junction_handlings()
     plt.show()
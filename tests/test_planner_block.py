@@ -108,3 +108,217 @@ def test_planner_block():
     block_2.self_correction()
     # check if interface velocity has been corrected
     assert block_2.segments[-1].vel_end.get_norm() == block_2.next_block.segments[0].vel_begin.get_norm()
+
+
+def test_lookahead_planner(tmp_path):
+    """Test the two-pass lookahead planner on a long chain of tiny moves and against the self correction."""
+    import pathlib
+
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+
+    test_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+    p_acc = test_setup.get_dict()["p_acc"]
+
+    # 10 mm of 0.005 mm moves at 100 mm/s and a dwell, too deep for the recursive self correction
+    lines = ["G21", "G90", "M83", "G1 X0 Y0 F6000"]
+    lines += [f"G1 X{(i + 1) * 0.005:.3f} E0.0001" for i in range(2000)]
+    lines.append("G4 P100")
+    gcode_path = tmp_path / "fine_moves.gcode"
+    gcode_path.write_text("\n".join(lines) + "\n")
+
+    sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, verbosity_level=0, lookahead=True)
+    segments = [segm for block in sim.blocklist for segm in block.get_segments()]
+    for segm_0, segm_1 in zip(segments[:-1], segments[1:]):
+        assert segm_0.t_end == segm_1.t_begin
+        assert np.isclose(segm_0.vel_end.get_norm(), segm_1.vel_begin.get_norm(), rtol=0, atol=1e-9)
+    for block in sim.blocklist:
+        for segm in block.get_segments():
+            segm.self_check(p_settings=block.state_B.state_p_settings)
+
+    # accelerate to 100 mm/s, cruise and stop before the dwell
+    t_expected = 2 * 100 / p_acc + (10 - 100**2 / p_acc) / 100 + 0.1
+    assert np.isclose(segments[-1].t_end, t_expected)
+    assert sim.blocklist[-2].get_segments()[-1].vel_end.get_norm() == 0
+
+    # regular moves with corners give the same trajectory as the self correction
+    lines = ["G21", "G90", "M83", "G1 F3000"]
+    lines += [f"G1 X{10 * np.cos(i):.3f} Y{10 * np.sin(i):.3f} E0.1" for i in range(200)]
+    gcode_path.write_text("\n".join(lines) + "\n")
+    sims = [
+        simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, verbosity_level=0, lookahead=lookahead)
+        for lookahead in (False, True)
+    ]
+    assert len(sims[0].blocklist) == len(sims[1].blocklist)
+    for block_0, block_1 in zip(sims[0].blocklist, sims[1].blocklist):
+        assert block_0.blocktype == block_1.blocktype
+        assert np.isclose(block_0.get_segments()[-1].t_end, block_1.get_segments()[-1].t_end)
+
+
+def test_batch_planner_segments(tmp_path):
+    """Test the segments of all blocks at once against one move maker call per block."""
+    import pathlib
+
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+    from pyGCodeDecode.junction_handling import batch_junction_velocities
+    from pyGCodeDecode.planner_block import (
+        batch_block_profiles,
+        batch_planner_segments,
+        lookahead_junction_velocities,
+    )
+
+    # all four profiles: trapezoid, triangle, single up and single down
+    blocktype, speeds, durations, lengths = batch_block_profiles(
+        distance=[10, 30, 1, 1], v_begin=[0, 0, 0, 20], v_end=[0, 0, 20, 0], v_target=[10, 100, 100, 100], acc=100
+    )
+    assert blocktype.tolist() == [0, 1, 2, 3]
+    assert np.allclose(lengths.sum(axis=1), [10, 30, 1, 1])
+    assert np.allclose(speeds[:, [0, 3]], [[0, 0], [0, 0], [0, np.sqrt(200)], [np.sqrt(200), 0]])
+    assert np.allclose(durations[0], [0.1, 0.9, 0.1])
+
+    # corners, travels, retractions, zero moves and dwells
+    test_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+    rng = np.random.default_rng(seed=1)
+    lines = ["G21", "G90", "M83", "G1 X10 Y10 F6000"]
+    for i in range(300):
+        if i % 50 == 25:
+            lines.append("G4 P150")
+        elif i % 40 == 10:
+            lines.append("G1 E-0.8 F2400")
+        elif i % 30 == 5:
+            lines.append("G1 X10 Y10")
+        else:
+            x, y = rng.uniform(0, 100, size=2)
+            lines.append(f"G1 X{x:.3f} Y{y:.3f} E{rng.uniform(0, 0.3):.4f} F{rng.choice([600, 3000, 12000])}")
+    gcode_path = tmp_path / "mixed.gcode"
+    gcode_path.write_text("\n".join(lines) + "\n")
+    sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, verbosity_level=0, lookahead=True)
+    assert sim._states is None  # planned from the state table, the list of states is created on first access
+    planned_states = [block.state_B for block in sim.blocklist]
+
+    target_vels, junction_vels = batch_junction_velocities(states=sim.states, firmware=sim.firmware)
+    junction_vels = lookahead_junction_velocities(
+        states=sim.states, target_vels=target_vels, junction_vels=junction_vels
+    )
+    table, block_states, blocktypes = batch_planner_segments(
+        states=sim.states, target_vels=target_vels, junction_vels=junction_vels
+    )
+    blocks = []
+    for i, this_state in enumerate(sim.states):
+        block = planner_block(
+            state=this_state,
+            prev_block=blocks[-1] if len(blocks) > 0 else None,
+            target_vel=velocity(target_vels[i]),
+            junction_vel=junction_vels[i],
+        )
+        if len(block.get_segments()) > 0:
+            blocks.append(block)
+
+    assert sim.segment_table is sim.blocklist[0].get_segments()[0].table
+    assert [block.state_B for block in blocks] == [sim.states[i] for i in block_states]
+    assert [block.state_B for block in sim.blocklist] == [sim.states[i] for i in block_states]
+    assert [this_state.line_number for this_state in planned_states] == [
+        sim.states[i].line_number for i in block_states
+    ]
+
+    # the columns of the state table give the same results as the list of states
+    table_target_vels, table_junction_vels = batch_junction_velocities(states=sim.state_table, firmware=sim.firmware)
+    assert np.array_equal(table_target_vels, target_vels)
+    table_junction_vels = lookahead_junction_velocities(
+        states=sim.state_table, target_vels=table_target_vels, junction_vels=table_junction_vels
+    )
+    assert np.array_equal(table_junction_vels, junction_vels)
+    state_table_segments = batch_planner_segments(
+        states=sim.state_table, target_vels=target_vels, junction_vels=junction_vels
+    )
+    assert np.array_equal(state_table_segments[1], block_states) and state_table_segments[2] == blocktypes
+    assert np.array_equal(state_table_segments[0].t_end, table.t_end)
+    assert np.array_equal(state_table_segments[0].pos_end, table.pos_end)
+    assert [block.blocktype for block in blocks] == blocktypes == [block.blocktype for block in sim.blocklist]
+    segments = [segm for block in blocks for segm in block.get_segments()]
+    assert len(segments) == len(table)
+    for segm, view in zip(segments, table.get_segments()):
+        assert segm.t_begin == view.t_begin and segm.t_end == view.t_end
+        for key in ("pos_begin", "pos_end", "vel_begin", "vel_end"):
+            assert getattr(segm, key).get_vec(withExtrusion=True) == getattr(view, key).get_vec(withExtrusion=True)
+
+    # begin velocities which do not settle within the allowed passes
+    import pyGCodeDecode.planner_block as planner_block_module
+
+    max_profile_passes = planner_block_module._max_profile_passes
+    planner_block_module._max_profile_passes = 1
+    try:
+        batch_planner_segments(states=sim.states, target_vels=target_vels, junction_vels=junction_vels)
+        assert False, "Expected RuntimeError was not raised."
+    except RuntimeError as e:
+        assert "did not settle within 1 passes" in str(e)
+    finally:
+        planner_block_module._max_profile_passes = max_profile_passes
+
+
+def test_batch_print_times(tmp_path):
+    """Test the print times of many accelerations and jerks at once against one simulation per value."""
+    import copy
+    import pathlib
+
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+    from pyGCodeDecode.planner_block import batch_print_times
+    from pyGCodeDecode.state import StateTable
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini", layer_cue="LAYER"
+    )
+    rng = np.random.default_rng(seed=2)
+    lines = ["G21", "G90", "M83", "G1 X10 Y10 F6000"]
+    for i in range(200):
+        if i % 50 == 0:
+            lines.append(";LAYER")
+        if i % 40 == 10:
+            lines.append("G1 E-0.8 F2400")
+        elif i % 45 == 30:
+            lines.append("G4 P150")
+        else:
+            x, y = rng.uniform(0, 100, size=2)
+            lines.append(f"G1 X{x:.3f} Y{y:.3f} E{rng.uniform(0, 0.3):.4f} F{rng.choice([600, 3000, 12000])}")
+    gcode_path = tmp_path / "layers.gcode"
+    gcode_path.write_text("\n".join(lines) + "\n")
+
+    for firmware, parameter, values in (("prusa", "p_acc", [300, 1250, 4000]), ("junction_deviation", "jerk", [4, 8])):
+        test_setup.set_property({"firmware": firmware})
+        sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, verbosity_level=0)
+        print_times, layers, layer_times = batch_print_times(
+            states=sim.states, firmware=firmware, parameter=parameter, values=values
+        )
+        assert layers.tolist() == [0, 1, 2, 3, 4] and layer_times.shape == (5, len(values))
+        assert np.allclose(layer_times.sum(axis=0), print_times)
+        table_results = batch_print_times(
+            states=StateTable.from_states(sim.states), firmware=firmware, parameter=parameter, values=values
+        )
+        for result, table_result in zip((print_times, layers, layer_times), table_results):
+            assert np.array_equal(result, table_result)
+        for k, value in enumerate(values):
+            value_setup = copy.deepcopy(test_setup)
+            value_setup.set_property({parameter: value})
+            value_sim = simulation(
+                gcode_path=gcode_path, initial_machine_setup=value_setup, verbosity_level=0, lookahead=True
+            )
+            assert print_times[k] == value_sim.blocklist[-1].get_segments()[-1].t_end
+        assert np.all(np.diff(print_times) < 0)  # faster with more acceleration or jerk
+
+    try:
+        batch_print_times(states=sim.states, firmware="prusa", parameter="speed", values=[1])
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "speed" in str(e)
+
+    # begin velocities which do not settle within the allowed passes
+    import pyGCodeDecode.planner_block as planner_block_module
+
+    max_profile_passes = planner_block_module._max_profile_passes
+    planner_block_module._max_profile_passes = 1
+    try:
+        batch_print_times(states=sim.states, firmware="prusa", parameter="p_acc", values=[1250])
+        assert False, "Expected RuntimeError was not raised."
+    except RuntimeError as e:
+        assert "did not settle within 1 passes" in str(e)
+    finally:
+        planner_block_module._max_profile_passes = max_profile_passes
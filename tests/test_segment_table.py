@@ -0,0 +1,68 @@
+"""Test for the columnar segment table."""
+
+import numpy as np
+
+from pyGCodeDecode.gcode_interpreter import unpack_blocklist
+from pyGCodeDecode.result import acceleration_result, velocity_result
+from pyGCodeDecode.utils import SegmentTable, position, segment, segment_view, velocity
+
+
+def test_segment_table(square_simulation):
+    """Test the segment table of a simulation against the segment objects."""
+    sim = square_simulation
+    table = sim.segment_table
+
+    # the blocks use views of the table rows, in the order of unpack_blocklist
+    segments = unpack_blocklist(sim.blocklist)
+    assert len(table) == len(segments)
+    assert all(isinstance(segm, segment_view) for segm in segments)
+    assert [segm.index for segm in segments] == list(range(len(table)))
+    for block_id, block in enumerate(sim.blocklist):
+        assert [segm.index for segm in block.get_segments()] == list(range(len(table)))[table.block_slice(block_id)]
+        assert np.all(table.block_id[table.block_slice(block_id)] == block_id)
+
+    # columns equal to a table of plain segment objects, results equal to the per segment calculation
+    copies = [
+        segment(
+            t_begin=segm.t_begin,
+            t_end=segm.t_end,
+            pos_begin=segm.pos_begin,
+            vel_begin=segm.vel_begin,
+            pos_end=segm.pos_end,
+            vel_end=segm.vel_end,
+        )
+        for segm in segments
+    ]
+    for calculator in (acceleration_result(), velocity_result()):
+        for segm in copies:
+            calculator.calc_segm(segm)
+    copy_table = SegmentTable.from_segments(copies, block_id=table.block_id)
+    for column in ("t_begin", "t_end", "pos_begin", "pos_end", "vel_begin", "vel_end"):
+        assert np.array_equal(getattr(table, column), getattr(copy_table, column))
+    for name in ("acceleration", "velocity"):
+        assert np.array_equal(table.results[name], copy_table.results[name])
+        assert [segm.get_result(name) for segm in segments] == [segm.get_result(name) for segm in copies]
+    assert np.array_equal(table.get_lengths(), [segm.get_segm_len() for segm in copies])
+    assert np.array_equal(table.is_extruding(), [segm.is_extruding() for segm in copies])
+
+    # views write to the table
+    view = table[1]
+    view.move_segment_time(1.5)
+    assert table.t_begin[1] == copies[1].t_begin + 1.5 and table.t_end[1] == copies[1].t_end + 1.5
+    view.pos_end = position(1, 2, 3, 4)
+    view.vel_begin = velocity(5, 6, 7, 8)
+    assert table.pos_end[1].tolist() == [1, 2, 3, 4] and table.vel_begin[1].tolist() == [5, 6, 7, 8]
+    view.result["custom"] = [1.0, 2.0]
+    assert table.results["custom"].shape == (len(table), 2)
+    assert view.get_result("custom") == [1.0, 2.0] and np.isnan(table.results["custom"][0]).all()
+    try:
+        table[0].get_result("unknown")
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "unknown" in str(e)
+
+    # a shifted block moves its rows in the table
+    t_begin = table.t_begin[table.block_slice(2)].copy()
+    sim.blocklist[2].timeshift(delta_t=2.0)
+    sim.blocklist[2].get_segments()
+    assert np.array_equal(table.t_begin[table.block_slice(2)], t_begin + 2.0)
@@ -0,0 +1,69 @@
+"""Test for the spatial index of the segments."""
+
+import pathlib
+
+import numpy as np
+
+from pyGCodeDecode.gcode_interpreter import setup, simulation
+
+
+def test_spatial_index(tmp_path: pathlib.Path):
+    """Test the point, box and plane queries against checking all segments."""
+    simulation_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="prusa_mini")
+    rng = np.random.default_rng(0)
+    lines = ["G90", "M83", "G1 F3000"]
+    for layer in range(1, 4):
+        lines.append(f"G1 Z{0.2 * layer:.1f}")
+        for x, y in rng.uniform(0, 40, (30, 2)):
+            lines.append(f"G1 X{x:.3f} Y{y:.3f} E0.5")
+        lines.append("G1 E-1")
+    gcode_path = tmp_path / "layers.gcode"
+    gcode_path.write_text("\n".join(lines) + "\n")
+    sim = simulation(gcode_path=gcode_path, initial_machine_setup=simulation_setup, verbosity_level=0)
+    index = sim.get_spatial_index(cell_size=2.0)
+    assert sim.get_spatial_index() is index and sim.get_spatial_index(cell_size=3.0) is not index
+    index = sim.get_spatial_index(cell_size=2.0)
+
+    table = sim.segment_table
+    begin, end = table.pos_begin[:, :3], table.pos_end[:, :3]
+    direction = end - begin
+
+    # nearest segment of points on the part, off the part and far away
+    points = np.concatenate((rng.uniform(0, 40, (100, 3)), rng.uniform(-100, 140, (20, 3))))
+    rows, distances, t = index.nearest(points=points)
+    for point, row, distance in zip(points, rows, distances):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip(
+                np.nan_to_num(((point - begin) * direction).sum(axis=1) / (direction**2).sum(axis=1)), 0, 1
+            )
+        all_distances = np.linalg.norm(point - begin - fraction[:, np.newaxis] * direction, axis=1)
+        assert np.isclose(distance, all_distances.min(), rtol=0, atol=1e-12)
+        assert row == np.flatnonzero(np.isclose(all_distances, all_distances.min(), rtol=0, atol=1e-12))[0]
+    positions = sim.get_values_batch(times=t)[1][:, :3]
+    assert np.allclose(np.linalg.norm(positions - points, axis=1), distances, rtol=0, atol=1e-9)
+
+    # segments in a box, entering and leaving it
+    box_min, box_max = np.array([10.0, 12.0, 0.3]), np.array([25.0, 20.0, 0.5])
+    rows, t_in, t_out = index.in_box(box_min=box_min, box_max=box_max)
+    samples = begin[:, np.newaxis] + np.linspace(0, 1, 1001)[np.newaxis, :, np.newaxis] * direction[:, np.newaxis]
+    sampled = np.flatnonzero(np.all((samples >= box_min) & (samples <= box_max), axis=2).any(axis=1))
+    assert len(rows) > 0 and set(sampled) <= set(rows.tolist()) and np.all(np.diff(rows) > 0)
+    assert np.all(table.t_begin[rows] <= t_in) and np.all(t_in <= t_out) and np.all(t_out <= table.t_end[rows])
+    for times in (t_in, t_out):
+        positions = sim.get_values_batch(times=times)[1][:, :3]
+        assert np.all((positions >= box_min - 1e-9) & (positions <= box_max + 1e-9))
+    assert len(index.in_box(box_min=[100, 100, 100], box_max=[101, 101, 101])[0]) == 0
+
+    # layer plane with the segments in it and a plane crossed by the layer changes
+    rows, t_in, t_out = index.crossing_plane(origin=[0, 0, 0.4], normal=[0, 0, 1])
+    on_plane = np.isclose(begin[:, 2], 0.4, rtol=0, atol=1e-9) | np.isclose(end[:, 2], 0.4, rtol=0, atol=1e-9)
+    assert np.array_equal(rows, np.flatnonzero(((begin[:, 2] - 0.4) * (end[:, 2] - 0.4) <= 0) | on_plane))
+    layer = np.isclose(begin[rows, 2], end[rows, 2], rtol=0, atol=1e-9)
+    assert np.any(layer) and not np.all(layer)
+    assert np.array_equal(t_in[layer], table.t_begin[rows][layer])
+    assert np.array_equal(t_out[layer], table.t_end[rows][layer])
+    rows, t_in, t_out = index.crossing_plane(origin=[0, 0, 0.5], normal=[0, 0, -1])
+    assert len(rows) == 1 and t_in[0] == t_out[0]
+    assert np.isclose(sim.get_values_batch(times=t_in)[1][0, 2], 0.5)
+    rows, t_in, _ = index.crossing_plane(origin=[20, 0, 0], normal=[1, 0, 0])
+    assert np.allclose(sim.get_values_batch(times=t_in)[1][:, 0], 20)
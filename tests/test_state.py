@@ -0,0 +1,38 @@
+"""Test for the state module."""
+
+import copy
+import pickle
+
+from pyGCodeDecode.state import state
+
+
+def test_p_settings_interning():
+    """Test that equal printing settings share one immutable instance."""
+    settings_a = state.p_settings(p_acc=1250, jerk=8, vX=180, vY=180, vZ=12, vE=80, speed=35)
+    settings_b = state.p_settings(1250, 8, 180, 180, 12, 80, 35, "SI (mm)")
+    settings_c = state.p_settings(p_acc=1250, jerk=8, vX=180, vY=180, vZ=12, vE=80, speed=40)
+
+    assert settings_a is settings_b
+    assert settings_a is not settings_c
+    assert settings_a != settings_c
+    assert len({settings_a, settings_b, settings_c}) == 2
+
+    # values with a different type keep their own instance
+    settings_float = state.p_settings(p_acc=1250.0, jerk=8, vX=180, vY=180, vZ=12, vE=80, speed=35)
+    assert settings_float is not settings_a
+    assert isinstance(settings_float.p_acc, float)
+
+    # copies and pickles resolve to the interned instance
+    assert copy.deepcopy(settings_a) is settings_a
+    assert pickle.loads(pickle.dumps(settings_a)) is settings_a
+
+    # immutable
+    try:
+        settings_a.speed = 10
+        assert False, "Expected AttributeError was not raised."
+    except AttributeError:
+        assert settings_a.speed == 35
+
+    # derived values are cached per instance
+    assert settings_a.jd_delta == 0.414 * 8 * 8 / 1250
+    assert "jd_delta" in vars(settings_b)
@@ -109,3 +109,378 @@ def test_set_initial_position():
 
     # test for inital position at state 2 (line 3)
     assert states[2].state_position.get_vec(withExtrusion=True) == list(initial_pos)
+
+
+def test_tokenize_line():
+    """Test the single-pass tokenizer against the regex based argument extraction."""
+    from pyGCodeDecode.state_generator import (
+        _arg_extract,
+        _tokenize_line,
+        known_commands,
+    )
+
+    lines = [
+        "G1 X10 Y20.5 Z.2 E-0.8 F1800\n",
+        "G1X10Y20E.5\n",
+        "G0 F10800 ; travel\n",
+        "G92 E0\n",
+        "G92\n",
+        "G90 ; use absolute coordinates\n",
+        "M83\n",
+        "G20",
+        "M203 X200 Y200 Z12 E120 ; sets maximum feedrates\n",
+        "M204 P1250 R1250 T1250\n",
+        "M205 X8.00 Y8.00 Z0.40 E4.50\n",
+        "G4 P500 ; dwell\n",
+        "G10\n",
+        "G29 ; mesh bed leveling\n",
+        "G2 X10 Y10 I5 J0 E1 F300\n",
+        "G1 X10 ; G92 E0\n",
+        ";LAYER_CHANGE\n",
+        "\n",
+        "M104 S215 ; unknown command\n",
+        "G1 X1e-05 Y2\n",
+    ]
+    for line in lines:
+        assert _tokenize_line(line) == _arg_extract(string=line, key_dict=known_commands), line
+
+    # command words are matched as a whole: leading zeros are accepted and parameters of other commands are ignored
+    assert _tokenize_line("G01 X1 Y2\n") == {"G1": {"X": 1.0, "Y": 2.0}}
+    assert _tokenize_line("M205 S0 T0\n") == {"M205": {"S": 0.0}}
+
+
+def test_iter_states(tmp_path):
+    """Test that the streaming pipeline yields the same linked states as generate_states."""
+    import types
+
+    from pyGCodeDecode.gcode_interpreter import setup
+    from pyGCodeDecode.state_generator import iter_states
+
+    gcode_path = tmp_path / "stream.gcode"
+    gcode_path.write_text("G90\nM83\nG1 X10 Y10 F1200\n;LAYER_CHANGE\nG1 X20 E1\n\nG92 X0\nG1 X5\n")
+
+    test_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test")
+
+    stream = iter_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+    assert isinstance(stream, types.GeneratorType)
+    streamed = list(stream)
+    states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+
+    assert len(streamed) == len(states) == 9  # initial state and one state per line
+    for streamed_state, listed_state in zip(streamed, states):
+        assert streamed_state.line_number == listed_state.line_number
+        assert streamed_state.state_position.get_vec(withExtrusion=True) == listed_state.state_position.get_vec(
+            withExtrusion=True
+        )
+    for prev_state, next_state in zip(streamed[:-1], streamed[1:]):
+        assert next_state.prev_state is prev_state
+        assert prev_state.next_state is next_state
+    assert streamed[-1].state_position.get_vec(withExtrusion=True) == [25.0, 10.0, 0.0, 1.0]
+
+
+def test_mmap_reader(tmp_path):
+    """Test that the memory mapped reader yields the states of all relevant lines with the correct line numbers."""
+    from pyGCodeDecode.gcode_interpreter import setup
+
+    gcode_path = tmp_path / "mmap.gcode"
+    gcode_path.write_bytes(
+        b"; thumbnail begin 16x16 80\r\n; iVBORw0KGgoAAAANSUhEUgAAABAAAAAQ\r\n; thumbnail end\r\n"
+        b"G90\r\nM83 ; relative extrusion\r\n\r\nG1 X10 Y10 F1200\r\nM104 S215\r\n;LAYER_CHANGE\r\n"
+        b";TYPE:Perimeter\r\n;WIDTH:0.45\r\nG1 X20 E1\r\nG4 P500\r\n; G1 X99\r\nG1 Y20"
+    )
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+    text_states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+    mmap_states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader="mmap")
+
+    # only lines with known commands, the layer cue and feature types are kept
+    assert [state.line_number for state in mmap_states] == [None, 4, 5, 7, 9, 10, 12, 13, 15]
+    text_states_by_line = {state.line_number: state for state in text_states}
+    for mmap_state in mmap_states:
+        text_state = text_states_by_line[mmap_state.line_number]
+        assert mmap_state.state_position.get_vec(withExtrusion=True) == text_state.state_position.get_vec(
+            withExtrusion=True
+        )
+        assert mmap_state.layer == text_state.layer
+        assert mmap_state.pause == text_state.pause
+        assert mmap_state.comment == text_state.comment
+    for prev_state, next_state in zip(mmap_states[:-1], mmap_states[1:]):
+        assert next_state.prev_state is prev_state
+
+    # unknown reader -> error expected
+    try:
+        generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader="unknown")
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert str(e) == "Unknown reader 'unknown', available readers are 'text' and 'mmap'."
+
+
+def test_parallel_parsing(tmp_path, monkeypatch):
+    """Test that parsing the file in chunks in a process pool yields the same states as the serial path."""
+    import pyGCodeDecode.state_generator as state_generator
+    from pyGCodeDecode.gcode_interpreter import setup
+
+    gcode_path = tmp_path / "parallel.gcode"
+    layer = "".join(f"G1 X{i % 7}.5 Y{i % 5} E.1{i} F{1200 + i}\r\n" for i in range(20))
+    gcode_path.write_text("G90\nM83\nG92 E0\n" + "".join(f";LAYER_CHANGE\n;TYPE:Infill\n{layer}\n" for _ in range(30)))
+
+    monkeypatch.setattr(state_generator, "_min_chunk_size", 256)  # force many small chunks
+    assert len(state_generator._chunk_byte_ranges(filepath=gcode_path, n_chunks=8)) == 8
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+    for reader in ["text", "mmap"]:
+        serial_states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader=reader)
+        parallel_states = generate_states(
+            filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader=reader, n_workers=2
+        )
+        assert len(parallel_states) == len(serial_states)
+        for serial_state, parallel_state in zip(serial_states, parallel_states):
+            assert parallel_state.line_number == serial_state.line_number
+            assert parallel_state.layer == serial_state.layer
+            assert parallel_state.state_position.get_vec(withExtrusion=True) == serial_state.state_position.get_vec(
+                withExtrusion=True
+            )
+
+
+def test_parallel_state_table(tmp_path, monkeypatch):
+    """Test that running the virtual machine per chunk in a process pool yields the same table as the serial path."""
+    import numpy as np
+
+    import pyGCodeDecode.state_generator as state_generator
+    from pyGCodeDecode.gcode_interpreter import setup
+
+    gcode_path = tmp_path / "modal.gcode"
+    lines = ["G90", "M82", "G21", "G92 E0"]
+    for i in range(60):
+        lines.append(";LAYER_CHANGE")
+        lines.append(["G91", "G90", "M83", "M82", "G20", "G21", "G92 X1 E2", "G92 E0"][i % 8])
+        lines.append(f"M203 X{100 + i} E{20 + i % 3}" if i % 3 == 0 else f"M204 P{500 + i}")
+        lines.append(f"M205 X{5 + i % 4}")
+        lines.extend(f"G1 X{j % 7}.5 Y{i % 5} E.{j + 1} F{1200 + i} ; move {j}" for j in range(5))
+    gcode_path.write_text("\n".join(lines) + "\n")
+
+    monkeypatch.setattr(state_generator, "_min_chunk_size", 256)  # force chunk boundaries between the modal commands
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+    for reader in ["text", "mmap"]:
+        serial_table = state_generator.generate_state_table(
+            filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader=reader, n_workers=1
+        )
+        parallel_table = state_generator.generate_state_table(
+            filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader=reader, n_workers=2
+        )
+        assert len(parallel_table) == len(serial_table)
+        assert np.array_equal(parallel_table.position, serial_table.position)
+        assert np.array_equal(parallel_table.line_number, serial_table.line_number)
+        assert np.array_equal(parallel_table.layer, serial_table.layer)
+        assert np.array_equal(parallel_table.pause, serial_table.pause, equal_nan=True)
+        assert parallel_table.settings_rows == serial_table.settings_rows
+        assert np.array_equal(parallel_table.settings_index, serial_table.settings_index)
+        assert parallel_table.comments == serial_table.comments
+        assert np.array_equal(parallel_table.comment_index, serial_table.comment_index)
+
+
+def test_compact_states(tmp_path):
+    """Test folding non-moving states into the next moving state and planning with the compacted states."""
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+    from pyGCodeDecode.state_generator import compact_states, iter_states
+
+    gcode_path = tmp_path / "compact.gcode"
+    gcode_path.write_text(
+        "G90\nM83\n;LAYER_CHANGE\n;TYPE:Perimeter\nG1 X10 Y10 E1 F1200\nG1 F600\nG4 P500\n"
+        ";TYPE:Solid infill\n\nG1 X20 E1\nG1 Y20 E1\nM107\n; end\n"
+    )
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+
+    states = list(compact_states(iter_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())))
+
+    # initial state, the moves, the pause and the last state are kept
+    assert [state.line_number for state in states] == [None, 5, 7, 10, 11, 13]
+    assert states[1].folded_lines == [(1, None, 0), (2, None, 0), (3, "LAYER_CHANGE", 1), (4, "TYPE:Perimeter", 1)]
+    assert states[2].folded_lines == [(6, None, 1)]
+    assert states[3].folded_lines == [(8, "TYPE:Solid infill", 1), (9, None, 1)]
+    assert states[4].folded_lines is None
+    assert states[5].folded_lines == [(12, None, 1)]
+    for prev_state, next_state in zip(states[:-1], states[1:]):
+        assert next_state.prev_state is prev_state
+        assert prev_state.next_state is next_state
+    assert states[-1].next_state is None
+
+    # planning with compacted states yields the same trajectory
+    full_sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup)
+    compact_sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, compact=True)
+    assert len(compact_sim.states) < len(full_sim.states)
+    assert len(compact_sim.blocklist) == len(full_sim.blocklist)
+    for full_block, compact_block in zip(full_sim.blocklist, compact_sim.blocklist):
+        assert compact_block.e_type == full_block.e_type
+        assert compact_block.state_B.line_number == full_block.state_B.line_number
+        assert compact_block.segments[-1].t_end == full_block.segments[-1].t_end
+
+
+def test_state_table():
+    """Test the columnar state table against the list of states."""
+    import numpy as np
+
+    from pyGCodeDecode.gcode_interpreter import setup
+    from pyGCodeDecode.state import StateTable
+    from pyGCodeDecode.state_generator import generate_state_table
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+    gcode_path = pathlib.Path("./tests/data/test_state_generator.gcode")
+    states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+    table = generate_state_table(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+
+    assert len(table) == len(states)
+    assert table.position.shape == (len(states), 4)
+    assert len(table.settings_rows) < len(states)  # settings are deduplicated
+    assert np.array_equal(
+        table.get_settings_column("speed"), [state.state_p_settings.speed for state in states], equal_nan=True
+    )
+
+    for table_state, listed_state in zip(table.to_states(), states):
+        assert table_state.line_number == listed_state.line_number
+        assert table_state.state_position == listed_state.state_position
+        assert vars(table_state.state_p_settings) == vars(listed_state.state_p_settings)
+        assert table_state.comment == listed_state.comment
+        assert table_state.layer == listed_state.layer
+        assert table_state.pause == listed_state.pause
+        if listed_state.prev_state is not None:
+            assert table_state.prev_state.line_number == listed_state.prev_state.line_number
+
+    assert table[-1].line_number == states[-1].line_number
+
+    # table of state objects
+    listed_table = StateTable.from_states(states)
+    for column in ("position", "settings_index", "line_number", "layer", "pause", "comment_index"):
+        assert np.array_equal(getattr(listed_table, column), getattr(table, column), equal_nan=True)
+    assert listed_table.settings_rows == table.settings_rows and listed_table.comments == table.comments
+
+
+def test_arc_moves(tmp_path):
+    """Test the interpolation of G2/G3 arcs with chords."""
+    import math
+
+    from pyGCodeDecode.gcode_interpreter import setup
+
+    gcode_path = tmp_path / "arcs.gcode"
+    gcode_path.write_text(
+        "G90\nM83\nG1 X10 Y0 Z0 F1200\n"
+        "G2 X0 Y-10 I-10 J0 E1 ; quarter circle clockwise\n"
+        "G3 X10 Y0 R10 E1\n"
+        "G3 X10 Y0 I-10 J0 Z1\n"
+        "G2 X10.4 Y0 I0.2 J0\n"
+    )
+    test_setup = setup(presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test")
+    test_setup.set_property({"mm_per_arc_segment": 0.5})
+    states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+
+    def arc_states(line_number):
+        return [
+            state.state_position.get_vec(withExtrusion=True) for state in states if state.line_number == line_number
+        ]
+
+    # clockwise quarter circle around the origin: 5 * pi mm of travel -> 31 chords
+    quarter = arc_states(4)
+    assert len(quarter) == 31
+    assert quarter[-1] == [0, -10, 0, 1]  # ends exactly at the target
+    for x, y, _, _ in quarter:
+        assert math.isclose(math.hypot(x, y), 10)
+        assert x >= -1e-9 and y <= 1e-9  # fourth quadrant
+    assert all(e_prev < e_next for (*_, e_prev), (*_, e_next) in zip(quarter[:-1], quarter[1:]))
+    assert quarter[0][3] < 1 and math.isclose(quarter[0][3], 1 / 31)
+
+    # counter-clockwise with radius back to the start of the previous arc
+    radius_arc = arc_states(5)
+    assert len(radius_arc) == 31
+    assert all(math.isclose(math.hypot(x, y), 10) and x >= -1e-9 for x, y, _, _ in radius_arc)
+
+    # full helical circle, z rises linearly
+    helix = arc_states(6)
+    assert len(helix) == int(math.hypot(20 * math.pi, 1) / 0.5)
+    assert helix[-1][:3] == [10, 0, 1]
+    assert math.isclose(helix[len(helix) // 2][2], 0.5, rel_tol=0.05)
+
+    # short arcs are a single move
+    assert arc_states(7) == [[10.4, 0, 1, 2]]
+
+    # the state chain is still a valid linked list
+    for prev_state, next_state in zip(states[:-1], states[1:]):
+        assert prev_state.next_state is next_state and next_state.prev_state is prev_state
+
+    # arcs without center
+    gcode_path.write_text("G1 X10 Y0 Z0\nG2 X10 Y0 R5\n")
+    try:
+        generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict())
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "Line 2" in str(e)
+
+
+def test_skip_metadata_blocks(tmp_path, monkeypatch):
+    """Test skipping thumbnails and config dumps in bulk with all readers."""
+    import pyGCodeDecode.state_generator as state_generator
+    from pyGCodeDecode.compiled_gcode import compile_gcode
+    from pyGCodeDecode.gcode_interpreter import setup, simulation
+
+    thumbnail = "".join(f"; {'QUJD' * 19}{i:02d}\n" for i in range(40))
+    config = "".join(f"; perimeter_speed_{i} = 40\n; G1 X{i}\n" for i in range(20))
+    layer = "".join(f"G1 X{i % 7}.5 Y{i % 5} E.1{i} F{1200 + i}\n" for i in range(20))
+    gcode_path = tmp_path / "metadata.gcode"
+    gcode_path.write_text(
+        "; generated by PrusaSlicer\n\n; thumbnail begin 16x16 3040\n"  # lines 1-3
+        + thumbnail  # lines 4-43
+        + "; thumbnail end\n\n;thumbnail_QOI begin 16x16 12\n; AAAA\n; thumbnail_QOI end\n"  # lines 44-48
+        + "G90\nM83\n"  # lines 49-50
+        + "".join(f";LAYER_CHANGE\n;TYPE:Infill\n{layer}" for _ in range(15))  # lines 51-380
+        + "; prusaslicer_config = begin\n"  # line 381
+        + config  # lines 382-421
+        + "; prusaslicer_config = end\n"  # line 422
+    )
+    expected_blocks = [("thumbnail", 3, 44), ("thumbnail", 46, 48), ("prusaslicer_config", 381, 422)]
+    skipped_lines = {line for _, first, last in expected_blocks for line in range(first, last + 1)}
+
+    test_setup = setup(
+        presets_file=pathlib.Path("./tests/data/test_printer_setups.yaml"), printer="test", layer_cue="LAYER_CHANGE"
+    )
+    monkeypatch.setattr(state_generator, "_min_chunk_size", 256)  # force chunk boundaries inside the blocks
+    compiled_path = compile_gcode(gcode_path=gcode_path, pgcd_path=tmp_path / "metadata.pgcd")
+
+    for reader in ["text", "mmap"]:
+        all_states = generate_states(filepath=gcode_path, initial_machine_setup=test_setup.get_dict(), reader=reader)
+        expected_states = [state for state in all_states if state.line_number not in skipped_lines]
+        assert len(expected_states) < len(all_states)
+
+        for filepath, n_workers in [(gcode_path, 1), (gcode_path, 2), (compiled_path, 1)]:
+            skipped_blocks = []
+            states = generate_states(
+                filepath=filepath,
+                initial_machine_setup=test_setup.get_dict(),
+                reader=reader,
+                n_workers=n_workers,
+                skipped_blocks=skipped_blocks,
+            )
+            assert skipped_blocks == expected_blocks, (reader, filepath, n_workers)
+            if filepath == compiled_path:
+                continue  # the compiled file contains every line
+            assert [state.line_number for state in states] == [state.line_number for state in expected_states]
+            for state, expected_state in zip(states, expected_states):
+                assert state.layer == expected_state.layer
+                assert state.state_position.get_vec(withExtrusion=True) == expected_state.state_position.get_vec(
+                    withExtrusion=True
+                )
+
+    # same trajectory in the simulation
+    sim = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup)
+    sim_skipped = simulation(gcode_path=gcode_path, initial_machine_setup=test_setup, skip_metadata=True)
+    assert sim.skipped_blocks is None
+    assert sim_skipped.skipped_blocks == expected_blocks
+    assert sim_skipped.blocklist[-1].get_segments()[-1].t_end == sim.blocklist[-1].get_segments()[-1].t_end
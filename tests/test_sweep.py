@@ -0,0 +1,88 @@
+"""Test for the setup sweep."""
+
+import copy
+import csv
+import pathlib
+
+import numpy as np
+
+from pyGCodeDecode.cli import _main
+from pyGCodeDecode.gcode_interpreter import setup, simulation
+from pyGCodeDecode.sweep import (
+    print_time_axis,
+    save_sweep,
+    simulation_sweep,
+    variant_grid,
+)
+
+
+def test_simulation_sweep(tmp_path: pathlib.Path, square_gcode: pathlib.Path, prusa_mini_setup: setup):
+    """Test the sweep against one simulation per setup variant."""
+    variants = variant_grid({"p_acc": [500, 1000], "firmware": ["prusa", "marlin"]})
+    assert variants == [
+        {"p_acc": 500, "firmware": "prusa"},
+        {"p_acc": 500, "firmware": "marlin"},
+        {"p_acc": 1000, "firmware": "prusa"},
+        {"p_acc": 1000, "firmware": "marlin"},
+    ]
+
+    # same summary in the worker processes and in this process as with separate simulations
+    rows = simulation_sweep(gcode_path=square_gcode, initial_machine_setup=prusa_mini_setup, variants=variants)
+    assert rows == simulation_sweep(
+        gcode_path=square_gcode, initial_machine_setup=prusa_mini_setup, variants=variants, n_workers=1
+    )
+    assert prusa_mini_setup.p_acc == 1250 and prusa_mini_setup.firmware == "prusa"  # base setup is unchanged
+    for variant, row in zip(variants, rows):
+        variant_setup = copy.deepcopy(prusa_mini_setup)
+        variant_setup.set_property(variant)
+        sim = simulation(gcode_path=square_gcode, initial_machine_setup=variant_setup, verbosity_level=0)
+        extent = sim.extrusion_extent()
+        assert row["p_acc"] == variant["p_acc"] and row["firmware"] == variant["firmware"]
+        assert row["t_end"] == sim.blocklist[-1].get_segments()[-1].t_end
+        assert [row["x_min"], row["y_min"], row["z_min"]] == extent[0].tolist()
+        assert [row["x_max"], row["y_max"], row["z_max"]] == extent[1].tolist()
+        assert row["max_extrusion_travel_velocity"] == sim.extrusion_max_vel()
+    assert rows[0]["t_end"] > rows[2]["t_end"]  # faster with more acceleration
+
+    save_sweep(rows=rows, filepath=tmp_path / "sweep.csv")
+    with open(tmp_path / "sweep.csv", newline="") as file:
+        saved = list(csv.DictReader(file))
+    assert [float(row["t_end"]) for row in saved] == [row["t_end"] for row in rows]
+
+    # command line interface
+    _main(
+        [
+            "sweep",
+            str(square_gcode),
+            "-p",
+            "./tests/data/test_printer_setups.yaml",
+            "-pn",
+            "prusa_mini",
+            "-s",
+            "p_acc=500,1000",
+            "-s",
+            "firmware=prusa,marlin",
+            "-o",
+            str(tmp_path / "cli.csv"),
+            "-j",
+            "1",
+        ]
+    )
+    with open(tmp_path / "cli.csv", newline="") as file:
+        assert list(csv.DictReader(file)) == saved
+
+
+def test_print_time_axis(square_gcode: pathlib.Path, prusa_mini_setup: setup):
+    """Test the print times of an acceleration axis against the sweep."""
+    print_times, layers, layer_times = print_time_axis(
+        gcode_path=square_gcode, initial_machine_setup=prusa_mini_setup, parameter="p_acc", values=[500, 1000]
+    )
+    rows = simulation_sweep(
+        gcode_path=square_gcode,
+        initial_machine_setup=prusa_mini_setup,
+        variants=variant_grid({"p_acc": [500, 1000]}),
+        n_workers=1,
+        lookahead=True,
+    )
+    assert print_times.tolist() == [row["t_end"] for row in rows]
+    assert layers.tolist() == [0] and np.allclose(layer_times[0], print_times)
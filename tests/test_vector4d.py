@@ -38,3 +38,245 @@ def test_4d_vectors():
     assert np.isclose(acc.y, 1.0)
     assert np.isclose(acc.z, 1.0)
     assert np.isclose(acc.e, 1.0)
+
+
+def test_fast_paths():
+    """Test that the fast paths give the same results as the NumPy and vector based calculations."""
+    from pyGCodeDecode.utils import _isclose, segment
+
+    rng = np.random.default_rng(seed=0)
+    for values in rng.uniform(-300, 300, size=(1000, 8)) * 10.0 ** rng.integers(-6, 3, size=(1000, 8)):
+        pos = position(values[:4])
+        vel = velocity(*values[4:].tolist())
+        assert pos.get_norm() == np.linalg.norm(values[:3])
+        assert pos.get_norm(withExtrusion=True) == np.linalg.norm(values[:4])
+        assert pos.get_t_distance(other=position(values[4:])) == np.linalg.norm(values[:3] - values[4:7])
+        assert _isclose(values[0], values[1]) == np.isclose(values[0], values[1])
+        assert _isclose(values[0], values[0] * (1 + 1e-6)) == np.isclose(values[0], values[0] * (1 + 1e-6))
+
+        # interpolation against the vector operations of the segment
+        t_begin, duration = abs(values[:2]) / 100
+        segm = segment(
+            t_begin=t_begin, t_end=t_begin + duration, pos_begin=pos, vel_begin=vel, pos_end=pos, vel_end=vel * 0.5
+        )
+        t = seconds(t_begin + duration * 0.3)
+        slope = (segm.vel_end - segm.vel_begin) / (segm.t_end - segm.t_begin)
+        vel_t = segm.vel_begin + slope * (t - segm.t_begin)
+        pos_t = segm.pos_begin + ((segm.vel_begin + vel_t) * (t - segm.t_begin) / 2.0).get_vec(withExtrusion=True)
+        assert segm.get_velocity(t=t).get_vec(withExtrusion=True) == vel_t.get_vec(withExtrusion=True)
+        assert segm.get_position(t=t).get_vec(withExtrusion=True) == pos_t.get_vec(withExtrusion=True)
+        assert segm.lerp_position(t=t) == pos_t.get_vec(withExtrusion=True)
+
+    assert np.linalg.norm([3, 4, 0]) == position(3, 4, 0, 1).get_norm()  # integer vectors
+    assert type(seconds(1.5) + 1) is seconds and seconds(1.5) - np.float64(0.5) == 1.0
+    try:
+        position(1, 2, 3)
+        assert False, "Expected ValueError was not raised."
+    except ValueError as e:
+        assert "4D object" in str(e)
+
+
+def _reference_vector(vector_class: type, *args):
+    """Create a vector, as `vector_4D.__init__` did before the fast paths."""
+    vector = vector_class.__new__(vector_class)
+    vector.x = None
+    vector.y = None
+    vector.z = None
+    vector.e = None
+
+    if isinstance(args[0], (tuple, list, np.ndarray)) and len(args) == 1 and len(args[0]) == 4:
+        args = tuple(args[0])
+    if len(args) == 4:
+        vector.x = args[0]
+        vector.y = args[1]
+        vector.z = args[2]
+        vector.e = args[3]
+    else:
+        raise ValueError("4D object requires x,y,z,e or [x,y,z,e] as input.")
+    return vector
+
+
+def _reference_add(vector, other):
+    """Return vector + other, as calculated by `vector_4D.__add__` before the fast paths."""
+    if isinstance(other, vector.__class__):
+        x = vector.x + other.x
+        y = vector.y + other.y
+        z = vector.z + other.z
+        e = vector.e + other.e
+        return _reference_vector(vector.__class__, x, y, z, e)
+    elif (isinstance(other, np.ndarray) or isinstance(other, list) or isinstance(other, tuple)) and len(other) == 4:
+        x = vector.x + other[0]
+        y = vector.y + other[1]
+        z = vector.z + other[2]
+        e = vector.e + other[3]
+        return _reference_vector(vector.__class__, x, y, z, e)
+    raise ValueError("Addition is only possible with other 4D vector, 1x4 'list', 1x4 'tuple' or 1x4 'numpy.ndarray'")
+
+
+def _reference_sub(vector, other):
+    """Return vector - other, as calculated by `vector_4D.__sub__` before the fast paths."""
+    if isinstance(other, vector.__class__):
+        x = vector.x - other.x
+        y = vector.y - other.y
+        z = vector.z - other.z
+        e = vector.e - other.e
+        return _reference_vector(vector.__class__, x, y, z, e)
+    elif (isinstance(other, np.ndarray) or isinstance(other, list) or isinstance(other, tuple)) and len(other) == 4:
+        x = vector.x - other[0]
+        y = vector.y - other[1]
+        z = vector.z - other[2]
+        e = vector.e - other[3]
+        return _reference_vector(vector.__class__, x, y, z, e)
+    raise ValueError(
+        "Subtraction is only possible with other 4D vector, 1x4 'list', 1x4 'tuple' or 1x4 'numpy.ndarray'"
+    )
+
+
+def _reference_mul(vector, other):
+    """Return vector * other, as calculated by the `__mul__` methods before the fast paths."""
+    if isinstance(other, seconds) and isinstance(vector, (velocity, acceleration)):
+        result_class = position if isinstance(vector, velocity) else velocity
+        return _reference_vector(
+            result_class,
+            vector.x * other.seconds,
+            vector.y * other.seconds,
+            vector.z * other.seconds,
+            vector.e * other.seconds,
+        )
+    if isinstance(other, (float, int, np.floating, np.integer)):
+        x = vector.x * other
+        y = vector.y * other
+        z = vector.z * other
+        e = vector.e * other
+    else:
+        raise TypeError("Multiplication of 4D vectors only supports float and int.")
+    return _reference_vector(vector.__class__, x, y, z, e)
+
+
+def _reference_truediv(vector, other):
+    """Return vector / other, as calculated by the `__truediv__` methods before the fast paths."""
+    if isinstance(other, seconds) and isinstance(vector, (position, velocity)):
+        result_class = velocity if isinstance(vector, position) else acceleration
+        return _reference_vector(
+            result_class,
+            vector.x / other.seconds,
+            vector.y / other.seconds,
+            vector.z / other.seconds,
+            vector.e / other.seconds,
+        )
+    if isinstance(other, (float, int, np.floating, np.integer)):
+        x = vector.x / other
+        y = vector.y / other
+        z = vector.z / other
+        e = vector.e / other
+    else:
+        raise TypeError("Division of 4D Vectors only supports float and int.")
+    return _reference_vector(vector.__class__, x, y, z, e)
+
+
+def _reference_seconds_add(t, other):
+    """Return t + other, as calculated by `seconds.__add__` before the fast paths."""
+    return seconds(float(t) + float(other))
+
+
+def _reference_seconds_sub(t, other):
+    """Return t - other, as calculated by `seconds.__sub__` before the fast paths."""
+    return seconds(float(t) - float(other))
+
+
+def _reference_get_velocity(segm, t):
+    """Return the velocity of a segment at time t, as calculated by `segment.get_velocity` before the fast paths."""
+    t = seconds(t)
+    delt_t = _reference_seconds_sub(segm.t_end, segm.t_begin)
+    if delt_t == 0:
+        return segm.vel_begin
+    delt_vel = _reference_sub(segm.vel_end, segm.vel_begin)
+    slope = _reference_truediv(delt_vel, delt_t)
+    return _reference_add(segm.vel_begin, _reference_mul(slope, _reference_seconds_sub(t, segm.t_begin)))
+
+
+def _reference_get_position(segm, t):
+    """Return the position of a segment at time t, as calculated by `segment.get_position` before the fast paths."""
+    t = seconds(t)
+    current_vel = _reference_get_velocity(segm, t)
+    average_vel = _reference_add(segm.vel_begin, current_vel)
+    displacement = _reference_mul(average_vel, _reference_seconds_sub(t, segm.t_begin))
+    return _reference_add(segm.pos_begin, _reference_truediv(displacement, 2.0).get_vec(withExtrusion=True))
+
+
+def operation_pairs(pos_a: position, pos_b: position, vel: velocity, scalar, dt: seconds, segm, t: float) -> dict:
+    """Return every fast path and its implementation before the fast paths as (fast, reference) callables by name.
+
+    The pairs are compared in `test_fast_paths_against_reference` and timed in `benchmarks/benchmark_vector4d.py`.
+    """
+    from pyGCodeDecode.utils import _isclose
+
+    acc = acceleration(*vel.get_vec(withExtrusion=True))
+    vec = pos_b.get_vec(withExtrusion=True)
+    return {
+        "position from list": (lambda: position(vec), lambda: _reference_vector(position, vec)),
+        "position + position": (lambda: pos_a + pos_b, lambda: _reference_add(pos_a, pos_b)),
+        "position + list": (lambda: pos_a + vec, lambda: _reference_add(pos_a, vec)),
+        "position - position": (lambda: pos_a - pos_b, lambda: _reference_sub(pos_a, pos_b)),
+        "position - array": (lambda: pos_a - np.array(vec), lambda: _reference_sub(pos_a, np.array(vec))),
+        "position / seconds": (lambda: pos_a / dt, lambda: _reference_truediv(pos_a, dt)),
+        "velocity * seconds": (lambda: vel * dt, lambda: _reference_mul(vel, dt)),
+        "velocity * scalar": (lambda: vel * scalar, lambda: _reference_mul(vel, scalar)),
+        "velocity / seconds": (lambda: vel / dt, lambda: _reference_truediv(vel, dt)),
+        "velocity / scalar": (lambda: vel / scalar, lambda: _reference_truediv(vel, scalar)),
+        "acceleration * seconds": (lambda: acc * dt, lambda: _reference_mul(acc, dt)),
+        "position * scalar": (lambda: pos_a * scalar, lambda: _reference_mul(pos_a, scalar)),
+        "seconds + scalar": (lambda: dt + scalar, lambda: _reference_seconds_add(dt, scalar)),
+        "seconds - scalar": (lambda: dt - scalar, lambda: _reference_seconds_sub(dt, scalar)),
+        "get_norm": (lambda: vel.get_norm(), lambda: np.linalg.norm(vel.get_vec())),
+        "get_norm with extrusion": (
+            lambda: vel.get_norm(withExtrusion=True),
+            lambda: np.linalg.norm(vel.get_vec(withExtrusion=True)),
+        ),
+        "get_t_distance": (
+            lambda: pos_a.get_t_distance(other=pos_b),
+            lambda: np.linalg.norm(np.subtract(pos_a.get_vec(), pos_b.get_vec())),
+        ),
+        "isclose": (lambda: _isclose(pos_a.x, pos_b.x), lambda: bool(np.isclose(pos_a.x, pos_b.x))),
+        "get_velocity": (lambda: segm.get_velocity(t=t), lambda: _reference_get_velocity(segm, t)),
+        "get_position": (lambda: segm.get_position(t=t), lambda: _reference_get_position(segm, t)),
+        "lerp_position": (
+            lambda: segm.lerp_position(t=t),
+            lambda: _reference_get_position(segm, t).get_vec(withExtrusion=True),
+        ),
+    }
+
+
+def _exact(value):
+    """Return a comparable form of a result, which distinguishes the types, the sign of zero and every bit."""
+    if isinstance(value, (position, velocity, acceleration)):
+        return type(value), _exact(value.get_vec(withExtrusion=True))
+    if isinstance(value, list):
+        return [_exact(item) for item in value]
+    return type(value), float(value).hex()
+
+
+def test_fast_paths_against_reference():
+    """Test that every fast path gives exactly the result of its implementation before the fast paths."""
+    from pyGCodeDecode.utils import segment
+
+    rng = np.random.default_rng(seed=3)
+    for i in range(800):
+        values = rng.uniform(-300, 300, size=12) * 10.0 ** rng.integers(-6, 3, size=12)
+        pos_a = position(*values[:4].tolist())
+        if i % 3 == 0:  # close positions for isclose
+            pos_b = position(*(values[:4] * (1 + 10.0 ** rng.integers(-9, -4))).tolist())
+        else:
+            pos_b = position(values[4:8])
+        vel = velocity(*values[8:].tolist())
+        scalar = [float(values[0]), int(rng.integers(1, 100)), np.float64(values[1]), np.int64(rng.integers(1, 100))]
+        dt = seconds(abs(values[2]) / 100)
+        t_begin = abs(values[3]) / 100
+        duration = 0.0 if i % 20 == 0 else float(dt)
+        segm = segment(
+            t_begin=t_begin, t_end=t_begin + duration, pos_begin=pos_a, vel_begin=vel, pos_end=pos_b, vel_end=vel * 0.5
+        )
+        t = t_begin + duration * rng.uniform()
+        pairs = operation_pairs(pos_a=pos_a, pos_b=pos_b, vel=vel, scalar=scalar[i % 4], dt=dt, segm=segm, t=t)
+        for name, (fast, reference) in pairs.items():
+            assert _exact(fast()) == _exact(reference()), name